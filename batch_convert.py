@@ -1,147 +1,187 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-转换A2生物考纲章节到JSON格式
+转换生物考纲章节到JSON格式
+逐行读取考纲文本（只读一遍），根据 "NN Title" 章节标题自动分章，每读完一章就写出它的 JSON，
+不再需要手工维护每章的起止行号；AS 考纲和新增的章节同样适用
+
+章节标题需要紧跟着本章的第一个子章节（"NN.1 ..."，中间可以有导言）才会被确认，
+大写开头的学习目标（"2 ATP ..."）不会被误认为新的章节
+
+用法: python batch_convert.py ["docs/A2 syallbus analysis.txt" ...] [--output-dir output]
 """
 
+import argparse
 import json
 import os
 import re
 
-# A2章节信息（基于文件分析）
-A2_CHAPTERS = [
-    {"unit": "12", "title": "Energy and respiration", "start": 3, "end": 414},
-    {"unit": "13", "title": "Photosynthesis", "start": 415, "end": 681},
-    {"unit": "14", "title": "Homeostasis", "start": 682, "end": 1016},
-    {"unit": "15", "title": "Control and coordination", "start": 1017, "end": 1378},
-    {"unit": "16", "title": "Inheritance", "start": 1379, "end": 1869},
-    {"unit": "17", "title": "Selection and evolution", "start": 1870, "end": 2135},
-    {"unit": "18", "title": "Classification, biodiversity and conservation", "start": 2136, "end": 2560},
-    {"unit": "19", "title": "Genetic technology", "start": 2561, "end": 3016}
-]
+DEFAULT_SOURCE = "docs/A2 syallbus analysis.txt"
 
-def read_chapter_content(file_path, start_line, end_line):
-    with open(file_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-    
-    # 提取指定行范围（注意行号从1开始）
-    chapter_lines = lines[start_line-1:end_line]
-    return ''.join(chapter_lines)
+# 页眉页脚
+_PAGE_HEADER = re.compile(r'^(A Level|AS Level|subject)')
+# 章节标题，如 "12 Energy and respiration"
+_CHAPTER = re.compile(r'^(\d{1,2})\s+([A-Z].*)$')
+# 子章节，如 "12.1 Energy"
+_SECTION = re.compile(r'^(\d{1,2})\.(\d+)\s+(.+)')
+# 学习目标（数字开头，后接小写），如 "1 outline..." 或 "2 describe..."
+_OBJECTIVE = re.compile(r'^\d+\s+[a-z]')
+# 子项目，如 "a. ..."
+_SUB_ITEM = re.compile(r'^[a-z]\.\s+')
 
-def extract_sections_and_items(content, unit):
-    lines = content.strip().split('\n')
+class ChapterBuilder:
+    """一章的子章节 + 学习目标（与 AS 格式相同），逐行喂入"""
     
-    # A2格式：子章节 + 学习目标（与AS格式相同）
-    sections = []
-    current_section = None
-    current_item = None
-    current_content = []
+    def __init__(self, unit, title, start_line):
+        self.unit = unit
+        self.title = title
+        self.start_line = start_line
+        self.end_line = start_line
+        self.sections = []
+        self.current_section = None
+        self.current_item = None
+        self.current_content = []
     
-    for line in lines:
-        line = line.strip()
-        if not line or line.startswith('A Level') or line.startswith('subject'):
-            continue
-            
-        # 检查是否是章节标题
-        if re.match(rf'^{unit}\s+[A-Za-z]', line):
-            continue
+    def _save_item(self):
+        if self.current_item and self.current_content and self.current_section:
+            self.current_section["items"].append({
+                "title": self.current_item,
+                "content": self.current_content.copy()
+            })
+    
+    def add_line(self, line, line_number):
+        """line 已去掉首尾空白且不是页眉、空行或本章标题"""
+        self.end_line = line_number
         
         # 检查是否是子章节 (如 "12.1 Energy")
-        section_match = re.match(rf'^{unit}\.(\d+)\s+(.+)', line)
-        if section_match:
-            # 保存之前的item
-            if current_item and current_content:
-                if current_section:
-                    current_section["items"].append({
-                        "title": current_item,
-                        "content": current_content.copy()
-                    })
-            
-            # 保存之前的section
-            if current_section:
-                sections.append(current_section)
-            
-            # 开始新的section
-            current_section = {
+        section_match = _SECTION.match(line)
+        if section_match and section_match.group(1) == self.unit:
+            self._save_item()
+            if self.current_section:
+                self.sections.append(self.current_section)
+            self.current_section = {
                 "section": line,
                 "items": []
             }
-            current_item = None
-            current_content = []
-            continue
+            self.current_item = None
+            self.current_content = []
+            return
         
         # 检查是否是学习目标 (数字开头，但不是子项目)
-        if re.match(r'^\d+\s+[a-z]', line):  # 如 "1 outline..." 或 "2 describe..."
-            # 保存之前的item
-            if current_item and current_content:
-                if current_section:
-                    current_section["items"].append({
-                        "title": current_item,
-                        "content": current_content.copy()
-                    })
-            
-            # 开始新的item
-            current_item = line
-            current_content = []
-            continue
+        if _OBJECTIVE.match(line):
+            self._save_item()
+            self.current_item = line
+            self.current_content = []
+            return
         
         # 检查是否是内容行
-        if current_item and line:
+        if self.current_item:
             if line.startswith('•'):
                 line = line[1:].strip()
-            elif re.match(r'^[a-z]\.\s+', line):
-                line = line[2:].strip()  # 去掉 "o "
+            elif _SUB_ITEM.match(line):
+                line = line[2:].strip()  # 去掉 "a. "
             
             if line:
-                current_content.append(line)
+                self.current_content.append(line)
     
-    # 保存最后的item和section
-    if current_item and current_content:
-        if current_section:
-            current_section["items"].append({
-                "title": current_item,
-                "content": current_content.copy()
-            })
+    def finish(self):
+        """保存最后的 item 和 section，返回章节 JSON"""
+        self._save_item()
+        if self.current_section:
+            self.sections.append(self.current_section)
+            self.current_section = None
+        self.current_item = None
+        return {
+            "unit": self.unit,
+            "title": self.title,
+            "content": self.sections
+        }
+
+def iter_chapters(lines):
+    """
+    单遍扫描考纲文本行，按出现顺序产出 (ChapterBuilder, 章节 JSON)
     
-    if current_section:
-        sections.append(current_section)
+    新的章节标题先作为候选：随后出现该章的子章节时确认（标题和子章节之间的导言丢弃），
+    在此之前遇到当前章的子章节、学习目标或另一个标题时，候选及其后缓存的行都按当前章的普通行处理
+    """
+    chapter = None
+    pending = None  # (unit, title, 标题行, 行号, 缓存的 [(line, 行号), ...])
     
-    return sections
-
-def convert_chapter_to_json(chapter_info, source_file):
-    content = read_chapter_content(source_file, chapter_info["start"], chapter_info["end"])
-    sections = extract_sections_and_items(content, chapter_info["unit"])
+    def replay(buffered):
+        if chapter is not None:
+            for buffered_line, buffered_number in buffered:
+                chapter.add_line(buffered_line, buffered_number)
     
-    json_data = {
-        "unit": chapter_info["unit"],
-        "title": chapter_info["title"],
-        "content": sections
-    }
+    for line_number, raw in enumerate(lines, 1):
+        line = raw.strip()
+        if not line or _PAGE_HEADER.match(line):
+            continue
+        
+        heading = _CHAPTER.match(line)
+        if heading and chapter is not None and heading.group(1) == chapter.unit:
+            # 本章标题在换页后重复出现
+            continue
+        
+        if pending is not None:
+            unit, title, heading_line, start_line, buffered = pending
+            section = _SECTION.match(line)
+            if section and section.group(1) == unit:
+                if chapter is not None:
+                    yield chapter, chapter.finish()
+                chapter = ChapterBuilder(unit, title, start_line)
+                pending = None
+                chapter.add_line(line, line_number)
+                continue
+            if heading or _OBJECTIVE.match(line) or (section and chapter is not None and section.group(1) == chapter.unit):
+                pending = None
+                replay([(heading_line, start_line)] + buffered)
+            else:
+                buffered.append((line, line_number))
+                continue
+        
+        if heading:
+            pending = (heading.group(1), heading.group(2).strip(), line, line_number, [])
+            continue
+        if chapter is not None:
+            chapter.add_line(line, line_number)
     
-    return json_data
+    if pending is not None:
+        _, _, heading_line, start_line, buffered = pending
+        replay([(heading_line, start_line)] + buffered)
+    if chapter is not None:
+        yield chapter, chapter.finish()
 
-def main():
-    source_file = "docs/A2 syallbus analysis.txt"
-    output_dir = "output"
-    
+def chapter_filename(unit, title):
+    return f"{unit}_{title.replace(' ', '_').replace(',', '')}.json"
+
+def convert_syllabus(source_file, output_dir):
+    """读取一遍考纲文本，每识别完一章就写出 JSON，返回写出的文件路径列表"""
     os.makedirs(output_dir, exist_ok=True)
+    written = []
+    with open(source_file, 'r', encoding='utf-8') as f:
+        for chapter, json_data in iter_chapters(f):
+            print(f"正在转换第{chapter.unit}章: {chapter.title} (行 {chapter.start_line}-{chapter.end_line})")
+            filepath = os.path.join(output_dir, chapter_filename(chapter.unit, chapter.title))
+            with open(filepath, 'w', encoding='utf-8') as out:
+                json.dump(json_data, out, ensure_ascii=False, indent=2)
+            print(f"✅ 成功保存: {filepath}")
+            written.append(filepath)
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description='将考纲文本按章节转换为 JSON（自动识别章节标题）')
+    parser.add_argument('sources', nargs='*', default=[DEFAULT_SOURCE],
+                        help=f'考纲文本文件（默认 "{DEFAULT_SOURCE}"，AS 考纲同样适用）')
+    parser.add_argument('--output-dir', default='output', help='输出目录（默认 output）')
+    args = parser.parse_args()
     
-    for chapter in A2_CHAPTERS:
+    for source_file in args.sources:
         try:
-            print(f"正在转换第{chapter['unit']}章: {chapter['title']} (行 {chapter['start']}-{chapter['end']})")
-            
-            json_data = convert_chapter_to_json(chapter, source_file)
-            
-            filename = f"{chapter['unit']}_{chapter['title'].replace(' ', '_').replace(',', '').replace('and', 'and')}.json"
-            filepath = os.path.join(output_dir, filename)
-            
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(json_data, f, ensure_ascii=False, indent=2)
-            
-            print(f"✅ 成功保存: {filepath}")
-            
+            written = convert_syllabus(source_file, args.output_dir)
+            if not written:
+                print(f"⚠️  {source_file} 中没有识别到章节标题（如 \"12 Energy and respiration\"）")
         except Exception as e:
-            print(f"❌ 转换第{chapter['unit']}章时出错: {e}")
+            print(f"❌ 转换 {source_file} 时出错: {e}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+BM25 检索索引基准测试
+用合成大纲（synthetic_corpus.py）为全部 19 个章节各生成 --nodes 个节点的章节 JSON，报告：
+全量构建、无变化、只改动一个章节的增量更新耗时（并确认增量结果与全量重建逐字节一致），索引大小，
+以及打开索引和随机查询的耗时（合成词表很小，每个词的倒排都很长，是查询的最坏情况）
+
+用法: python benchmarks/bench_bm25_index.py [--nodes 5000] [--queries 200] [--top-k 5]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from bm25_index import Bm25Index, build_index, index_digest
+from chapters import CHAPTERS, sorted_chapters
+from pdf_to_final_mindmap import parse_hierarchy_store
+from synthetic_corpus import WORDS, generate_outline, outline_to_lines
+
+
+def write_chapter(path, nodes, seed):
+    store = parse_hierarchy_store(outline_to_lines(generate_outline(nodes, seed=seed)))
+    store.assign_sides()
+    with open(path, 'w', encoding='utf-8') as f:
+        store.write_json(f, compact=True)
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='bm25_index 的全量 / 增量构建耗时、索引大小和查询耗时')
+    parser.add_argument('--nodes', type=int, default=5000, help='每个章节的节点数（默认 5000）')
+    parser.add_argument('--queries', type=int, default=200, help='随机查询数（默认 200）')
+    parser.add_argument('--top-k', type=int, default=5)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        mindmaps = Path(tmp) / 'mindmaps'
+        mindmaps.mkdir()
+        index_dir = Path(tmp) / 'index'
+        chapters = sorted_chapters(CHAPTERS)
+        for seed, chapter in enumerate(chapters):
+            write_chapter(mindmaps / CHAPTERS[chapter][1], args.nodes, seed)
+        
+        info, full_time = timed(build_index, index_dir, mindmaps, None)
+        _, unchanged_time = timed(build_index, index_dir, mindmaps, None)
+        write_chapter(mindmaps / CHAPTERS[chapters[0]][1], args.nodes, len(chapters))
+        incremental, incremental_time = timed(build_index, index_dir, mindmaps, None)
+        digest = index_digest(index_dir)
+        build_index(index_dir, mindmaps, None, force=True)
+        status = '一致' if index_digest(index_dir) == digest else '不一致！'
+        size = sum(path.stat().st_size for path in index_dir.iterdir())
+        
+        print(f"{len(chapters)} 个章节 x {args.nodes} 个节点：{info['docs']} 个段落，{info['terms']} 个词，索引 {size} 字节")
+        print(f"全量构建 {full_time:.2f}s，无变化 {unchanged_time:.2f}s，改动 1 个章节 {incremental_time:.2f}s"
+              f"（重建 {incremental['rebuilt']} 个源文件，与全量重建{status}）")
+        
+        rng = random.Random(0)
+        queries = [' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 5))) for _ in range(args.queries)]
+        index, open_time = timed(Bm25Index, index_dir)
+        with index:
+            durations = sorted(timed(index.search, query, args.top_k)[1] * 1e3 for query in queries)
+        print(f"打开索引 {open_time * 1e3:.1f} ms；{len(queries)} 次查询：中位数 {statistics.median(durations):.2f} ms，"
+              f"p95 {durations[int(len(durations) * 0.95)]:.2f} ms，最慢 {durations[-1]:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ID 分配压力测试
+一个根节点下挂 N 个标签相同的子节点（最坏情况：每个子节点都与前面所有兄弟冲突），
+比较原先从 -1 开始逐个试探后缀的分配方式与 IdAllocator 后缀计数器的耗时，并确认分配结果一致
+
+变换：
+- upgrade:  upgrade_mindmap_data.upgrade_node（子节点没有 id，按标签生成）
+- format:   process_mindmaps_pipeline.upgrade_to_mindmap_format（同上）
+- fix_ids:  pdf_to_final_mindmap.fix_node_ids（子节点 id 全部相同，逐个改名）
+- fix_file: fix_duplicate_ids_in_file.fix_node_ids（同上，逐个打印的改名信息被丢弃）
+
+两种分配方式跑的是同一份遍历代码，只有传入的分配器不同。
+逐个试探的总开销是平方级的，节点数超过 --probe-max 时不再运行（只运行 IdAllocator）
+
+用法: python benchmarks/bench_id_allocator.py [--sizes 1000 5000 100000] [--probe-max 5000] [--repeat 3]
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import fix_duplicate_ids_in_file
+from id_allocator import IdAllocator
+from pdf_to_final_mindmap import fix_node_ids
+from process_mindmaps_pipeline import upgrade_to_mindmap_format
+from upgrade_mindmap_data import upgrade_node
+
+LABEL = 'Structure'
+
+
+class ProbingAllocator(IdAllocator):
+    """原先的分配方式：每次冲突都从 -1 开始逐个试探后缀（仅作对照）"""
+    
+    __slots__ = ()
+    
+    def allocate(self, *candidates):
+        for candidate in candidates:
+            if candidate not in self:
+                self.used.add(candidate)
+                return candidate
+        suffix = 1
+        node_id = f"{candidates[0]}-{suffix}"
+        while node_id in self:
+            suffix += 1
+            node_id = f"{candidates[0]}-{suffix}"
+        self.used.add(node_id)
+        return node_id
+
+
+def make_tree(size, with_ids):
+    """with_ids 为真时所有节点的 id 都是 'structure'，否则都没有 id"""
+    def make_node(children):
+        node = {'title': LABEL, 'children': children}
+        if with_ids:
+            node['id'] = 'structure'
+        return node
+    
+    return make_node([make_node([]) for _ in range(size)])
+
+
+def run_fix_file(tree, used_ids):
+    with contextlib.redirect_stdout(io.StringIO()):
+        fix_duplicate_ids_in_file.fix_node_ids(tree, None, used_ids)
+    return tree
+
+
+CASES = [
+    ('upgrade', False, lambda tree, used_ids: upgrade_node(tree, used_ids=used_ids)),
+    ('format', False, lambda tree, used_ids: upgrade_to_mindmap_format(tree, used_ids=used_ids)),
+    ('fix_ids', True, lambda tree, used_ids: (fix_node_ids(tree, None, used_ids), tree)[1]),
+    ('fix_file', True, run_fix_file),
+]
+
+
+def best_time(func, size, with_ids, allocator_class, repeat):
+    """返回 (最短耗时, 各节点的 id 列表)"""
+    best = None
+    ids = None
+    for _ in range(repeat):
+        tree = make_tree(size, with_ids)
+        gc.collect()
+        start = time.perf_counter()
+        result = func(tree, allocator_class())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        ids = [result['id']] + [child['id'] for child in result['children']]
+    return best, ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description='逐个试探后缀 vs IdAllocator 后缀计数器')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 100000], help='相同标签的兄弟节点数')
+    parser.add_argument('--probe-max', type=int, default=5000, help='逐个试探方式运行的最大节点数（默认 5000）')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    print(f"{'节点数':>8} {'变换':<9} {'逐个试探(s)':>12} {'计数器(s)':>10} {'加速比':>8}  结果")
+    for size in args.sizes:
+        for name, with_ids, func in CASES:
+            new_time, actual = best_time(func, size, with_ids, IdAllocator, args.repeat)
+            if size > args.probe_max:
+                print(f"{size:>8} {name:<9} {'跳过':>12} {new_time:>10.3f} {'-':>8}  "
+                      f"ID 唯一: {len(set(actual)) == len(actual)}")
+                continue
+            old_time, expected = best_time(func, size, with_ids, ProbingAllocator, args.repeat)
+            status = '一致' if actual == expected else '不一致！'
+            print(f"{size:>8} {name:<9} {old_time:>12.3f} {new_time:>10.3f} {old_time / new_time:>7.1f}x  {status}")
+
+
+if __name__ == "__main__":
+    main()
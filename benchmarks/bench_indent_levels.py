@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缩进级别计算的基准测试
+比较原来逐行重建 sorted(set(x_positions)) 的 calculate_indent_level 与 IndentColumns 的二分查找，
+并确认两者给出的级别一致
+
+用法: python benchmarks/bench_indent_levels.py [--sizes 1000 5000 20000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from indent_columns import IndentColumns
+
+
+def calculate_indent_level_scan(x_pos, x_positions):
+    """原 calculate_indent_level 的实现，作为对照"""
+    if not x_positions:
+        return 0
+    unique_x = sorted(set(x_positions))
+    if x_pos in unique_x:
+        return unique_x.index(x_pos)
+    closest_x = min(unique_x, key=lambda x: abs(x - x_pos))
+    if abs(x_pos - closest_x) > 10:
+        insert_pos = 0
+        for i, x in enumerate(unique_x):
+            if x_pos > x:
+                insert_pos = i + 1
+            else:
+                break
+        return insert_pos
+    return unique_x.index(closest_x)
+
+
+def make_x_positions(n, seed=0):
+    """模拟 PDF 行首坐标：若干缩进列加少量抖动"""
+    rng = random.Random(seed)
+    return [40 + rng.randint(0, 6) * 18 + rng.choice([0, 0, 0, 0.24, 0.5]) for _ in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='缩进级别计算基准测试')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 5000, 20000], help='行数')
+    args = parser.parse_args()
+    
+    print(f"{'行数':>8} {'逐行扫描(s)':>12} {'IndentColumns(s)':>17} {'加速比':>8}  结果")
+    for n in args.sizes:
+        x_positions = make_x_positions(n)
+        
+        start = time.perf_counter()
+        expected = [calculate_indent_level_scan(x, x_positions) for x in x_positions]
+        scan_time = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        model = IndentColumns(x_positions)
+        levels = [model.level(x) for x in x_positions]
+        model_time = time.perf_counter() - start
+        
+        status = '一致' if levels == expected else '❌ 不一致'
+        print(f"{n:>8} {scan_time:>12.3f} {model_time:>17.4f} {scan_time / model_time:>7.0f}x  {status}")
+
+
+if __name__ == "__main__":
+    main()
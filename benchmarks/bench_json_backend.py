@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON 后端基准测试
+用合成大纲（synthetic_corpus.py）构建升级后的思维导图 dict 树，比较 json_backend.py 各个可用后端
+把它写入文件的耗时和 Python 堆峰值（tracemalloc，单独运行一次，不计入耗时），
+并确认输出与 json.dump(..., ensure_ascii=False, indent=2)（--compact 时为紧凑格式）逐字节一致。
+
+store 一行是三个转换脚本实际使用的 NodeStore.write_json（直接从并行数组写出，不需要 dict 树），仅作参照；
+未安装的后端（orjson / msgspec）不运行
+
+用法: python benchmarks/bench_json_backend.py [--sizes 10000 100000] [--compact] [--repeat 3]
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from json_backend import available_backends, dump
+from pdf_to_final_mindmap import parse_hierarchy_store
+from synthetic_corpus import generate_outline, outline_to_lines
+
+
+def write_with(backend, store, tree, path, compact):
+    with open(path, 'w', encoding='utf-8') as f:
+        if backend == 'store':
+            store.write_json(f, compact=compact)
+        else:
+            dump(tree, f, compact=compact, backend=backend)
+
+
+def best_time(backend, store, tree, path, compact, repeat):
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        write_with(backend, store, tree, path, compact)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def peak_memory(backend, store, tree, path, compact):
+    gc.collect()
+    tracemalloc.start()
+    try:
+        write_with(backend, store, tree, path, compact)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='orjson / msgspec / 标准库 / 流式写出器的保存耗时')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000], help='合成大纲的节点数')
+    parser.add_argument('--compact', action='store_true', help='比较紧凑格式（默认比较 indent=2）')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    backends = available_backends() + ['store']
+    print(f"可用后端: {', '.join(available_backends())}（格式: {'紧凑' if args.compact else 'indent=2'}）")
+    with tempfile.TemporaryDirectory() as tmp:
+        reference_path = Path(tmp) / 'reference.json'
+        output_path = Path(tmp) / 'out.json'
+        for size in args.sizes:
+            store = parse_hierarchy_store(outline_to_lines(generate_outline(size)))
+            store.assign_sides()
+            tree = store.to_mindmap()
+            with open(reference_path, 'w', encoding='utf-8') as f:
+                if args.compact:
+                    json.dump(tree, f, ensure_ascii=False, separators=(',', ':'))
+                else:
+                    json.dump(tree, f, ensure_ascii=False, indent=2)
+            reference = reference_path.read_bytes()
+            
+            print(f"\n🌲 {size} 个节点，输出 {os.path.getsize(reference_path) / 1024 / 1024:.1f} MB")
+            rows = []
+            for backend in backends:
+                elapsed = best_time(backend, store, tree, output_path, args.compact, args.repeat)
+                status = '一致' if output_path.read_bytes() == reference else '不一致！'
+                peak = peak_memory(backend, store, tree, output_path, args.compact)
+                rows.append((backend, elapsed, peak, status))
+            stdlib_time = next(elapsed for backend, elapsed, _, _ in rows if backend == 'json')
+            print(f"{'后端':<8} {'耗时(s)':>9} {'相对 json':>10} {'堆峰值(MB)':>11}  结果")
+            for backend, elapsed, peak, status in rows:
+                print(f"{backend:<8} {elapsed:>9.3f} {stdlib_time / elapsed:>9.1f}x {peak / 1024 / 1024:>11.1f}  {status}")
+
+
+if __name__ == "__main__":
+    main()
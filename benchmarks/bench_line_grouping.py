@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+字符 → 文本行分组的基准测试
+在合成的大页面上比较原来的 dict 分组（round(y0, 1) 作键）与 line_grouping 的
+numpy / 纯 Python 聚类实现，并确认基线整齐的页面上三者输出一致
+
+用法: python benchmarks/bench_line_grouping.py [--lines 2000] [--chars-per-line 80] [--repeat 5]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from line_grouping import group_page_chars, np
+
+
+def group_with_dict(chars):
+    """原 extract_text_from_pdf 中的分组方式，作为对照"""
+    lines = []
+    y_groups = {}
+    for char in chars:
+        y_key = round(char['y0'], 1)
+        if y_key not in y_groups:
+            y_groups[y_key] = []
+        y_groups[y_key].append(char)
+    
+    for y_key in sorted(y_groups.keys(), reverse=True):
+        chars_in_line = sorted(y_groups[y_key], key=lambda c: c['x0'])
+        first_char_x = chars_in_line[0]['x0']
+        line_text = ''.join([char['text'] for char in chars_in_line])
+        if line_text.strip():
+            lines.append((first_char_x, line_text))
+    return lines
+
+
+def make_page(n_lines, chars_per_line, seed=0):
+    """生成基线整齐的合成页面：每行字符 y0 相同，字符顺序打乱"""
+    rng = random.Random(seed)
+    chars = []
+    for line in range(n_lines):
+        y0 = 10000.0 - line * 12.5
+        x = 40.0 + rng.choice([0, 18, 36, 54])
+        for _ in range(chars_per_line):
+            chars.append({'text': rng.choice('abcdefghijklmnopqrstuvwxyz '), 'x0': x, 'y0': y0})
+            x += 5.25
+    rng.shuffle(chars)
+    return chars
+
+
+def best_time(func, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='字符分组基准测试')
+    parser.add_argument('--lines', type=int, default=2000, help='页面行数')
+    parser.add_argument('--chars-per-line', type=int, default=80, help='每行字符数')
+    parser.add_argument('-r', '--repeat', type=int, default=5, help='重复次数（取最短耗时）')
+    args = parser.parse_args()
+    
+    chars = make_page(args.lines, args.chars_per_line)
+    print(f"📄 合成页面: {args.lines} 行, {len(chars)} 个字符")
+    
+    baseline_time, expected = best_time(lambda: group_with_dict(chars), args.repeat)
+    print(f"{'实现':<12} {'耗时(s)':>10} {'相对 dict':>10}  结果")
+    print(f"{'dict':<12} {baseline_time:>10.4f} {1:>9.2f}x  基准")
+    
+    variants = [('python', False)]
+    if np is not None:
+        variants.insert(0, ('numpy', True))
+    else:
+        print("⚠️  未安装 numpy，跳过向量化实现")
+    
+    for name, use_numpy in variants:
+        elapsed, lines = best_time(lambda: group_page_chars(chars, use_numpy=use_numpy), args.repeat)
+        status = '一致' if lines == expected else '❌ 不一致'
+        print(f"{name:<12} {elapsed:>10.4f} {baseline_time / elapsed:>9.2f}x  {status}")
+
+
+if __name__ == "__main__":
+    main()
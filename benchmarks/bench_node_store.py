@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+NodeStore 内存基准测试
+比较节点 dict 树与 NodeStore（node_store.py）两种表示走完 解析 → 升级 / 规范化 → 保存 的内存和耗时：
+
+- dicts-normalize: parse_hierarchy → normalize_mindmap → json.dump（pdf_to_final_mindmap.py 原来的做法）
+- store-normalize: parse_hierarchy_store → normalize_store → write_json（现在的做法）
+- dicts-upgrade:   parse_hierarchy → upgrade_to_mindmap_format → json.dump（process_mindmaps_pipeline.py 原来的做法）
+- store-upgrade:   parse_hierarchy_store → assign_sides → write_json（现在的做法）
+
+每种模式在独立子进程中运行：先生成合成行（synthetic_corpus.py，各模式相同），
+记下此时的 RSS 作为基数（并重置峰值），报告解析后的 RSS 增量和整个过程的峰值 RSS 增量，
+并比较输出文件的摘要确认两种表示的结果逐字节一致（仅支持 Linux，RSS 读自 /proc）
+
+用法: python benchmarks/bench_node_store.py --nodes 1000000
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+MODES = ['dicts-normalize', 'store-normalize', 'dicts-upgrade', 'store-upgrade']
+
+
+def current_rss():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def reset_peak_rss():
+    """把峰值 RSS（VmHWM）重置为当前 RSS，生成合成行时的峰值不计入"""
+    with open('/proc/self/clear_refs', 'w') as f:
+        f.write('5')
+
+
+def peak_rss():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) * 1024
+    raise RuntimeError("无法读取 VmHWM")
+
+
+def run_child(nodes, mode, output_path):
+    """子进程：按指定模式处理合成行，输出内存、耗时和结果摘要"""
+    from mindmap_normalizer import normalize_mindmap, normalize_store
+    from pdf_to_final_mindmap import parse_hierarchy, parse_hierarchy_store
+    from process_mindmaps_pipeline import upgrade_to_mindmap_format
+    from synthetic_corpus import generate_outline, outline_to_lines
+    
+    lines = outline_to_lines(generate_outline(nodes))
+    reset_peak_rss()
+    base = current_rss()
+    times = {}
+    
+    start = time.perf_counter()
+    if mode.startswith('store'):
+        tree = parse_hierarchy_store(lines)
+    else:
+        tree = parse_hierarchy(lines)
+    times['parse'] = time.perf_counter() - start
+    parsed = current_rss() - base
+    
+    start = time.perf_counter()
+    if mode == 'store-normalize':
+        normalize_store(tree)
+    elif mode == 'store-upgrade':
+        tree.assign_sides()
+    elif mode == 'dicts-normalize':
+        tree, _, _ = normalize_mindmap(tree)
+    else:
+        tree = upgrade_to_mindmap_format(tree)
+    times['upgrade'] = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    with open(output_path, 'w', encoding='utf-8') as f:
+        if mode.startswith('store'):
+            tree.write_json(f)
+        else:
+            json.dump(tree, f, ensure_ascii=False, indent=2)
+    times['save'] = time.perf_counter() - start
+    
+    peak = peak_rss() - base
+    
+    digest = hashlib.sha256()
+    with open(output_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    print(json.dumps({'parsed': parsed, 'peak': peak, 'times': times, 'digest': digest.hexdigest()}))
+
+
+def measure(nodes, mode):
+    with tempfile.TemporaryDirectory() as tmp:
+        output = subprocess.run(
+            [sys.executable, __file__, '--nodes', str(nodes), '--child', mode, '--output', str(Path(tmp) / 'out.json')],
+            check=True, stdout=subprocess.PIPE).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='节点 dict 树 vs NodeStore 的内存和耗时')
+    parser.add_argument('--nodes', type=int, default=1000000, help='合成大纲的节点数（默认 1000000）')
+    parser.add_argument('--child', choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument('--output', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        run_child(args.nodes, args.child, args.output)
+        return
+    
+    print(f"🌲 {args.nodes} 个节点")
+    print(f"{'模式':<16} {'解析后(MB)':>11} {'峰值(MB)':>10} {'解析(s)':>8} {'升级(s)':>8} {'保存(s)':>8}  结果")
+    expected = {}
+    for mode in MODES:
+        result = measure(args.nodes, mode)
+        kind = mode.split('-')[1]
+        if kind not in expected:
+            expected[kind] = result['digest']
+            status = '基准'
+        else:
+            status = '一致' if result['digest'] == expected[kind] else '不一致！'
+        times = result['times']
+        print(f"{mode:<16} {result['parsed'] / 1024 / 1024:>11.1f} {result['peak'] / 1024 / 1024:>10.1f} "
+              f"{times['parse']:>8.2f} {times['upgrade']:>8.2f} {times['save']:>8.2f}  {status}")
+
+
+if __name__ == "__main__":
+    main()
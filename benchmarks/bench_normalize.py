@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规范化基准测试
+比较 upgrade_mindmap_data → fix_node_ids → validate_final_data 三步串行与
+mindmap_normalizer.normalize_mindmap 单次遍历的耗时，并确认两者输出、问题列表和节点数完全一致
+
+输入为合成大纲经 parse_hierarchy 得到的树，分三种形态：
+- parsed:  解析器生成的 id（只有合并的断行节点需要生成 id）
+- no-ids:  去掉全部 id，每个节点都走 id 生成路径
+- dup-ids: 每个节点的 id 都设为标签的 slug，大量节点走去重改名路径
+
+用法: python benchmarks/bench_normalize.py [--sizes 10000 100000] [--repeat 3]
+"""
+
+import argparse
+import copy
+import gc
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / 'scripts'))
+
+from mindmap_normalizer import normalize_mindmap
+from pdf_to_final_mindmap import fix_node_ids, parse_hierarchy, validate_final_data
+from synthetic_corpus import generate_outline, outline_to_lines
+from upgrade_mindmap_data import slugify, upgrade_mindmap_data
+
+VARIANTS = ['parsed', 'no-ids', 'dup-ids']
+
+
+def make_tree(nodes, variant):
+    root_nodes = parse_hierarchy(outline_to_lines(generate_outline(nodes)))
+    stack = list(root_nodes)
+    while stack:
+        node = stack.pop()
+        if variant == 'no-ids':
+            del node['id']
+        elif variant == 'dup-ids':
+            node['id'] = slugify(node['title'])
+        stack.extend(node['children'])
+    return root_nodes
+
+
+def three_step(root_nodes):
+    data = upgrade_mindmap_data(root_nodes)
+    used_ids = set()
+    for node in data:
+        fix_node_ids(node, None, used_ids)
+    issues, node_count = validate_final_data(data)
+    return data, issues, node_count
+
+
+def best_time(func, tree, repeat):
+    """每次运行前复制输入（fix_node_ids 会就地改名），返回 (最短耗时, 结果)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        data = copy.deepcopy(tree)
+        gc.collect()
+        start = time.perf_counter()
+        result = func(data)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='三步规范化 vs 单次遍历规范化')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    print(f"{'节点数':>9} {'形态':<8} {'三步(s)':>9} {'单次(s)':>9} {'加速比':>7}  结果")
+    for nodes in args.sizes:
+        for variant in VARIANTS:
+            tree = make_tree(nodes, variant)
+            old_time, expected = best_time(three_step, tree, args.repeat)
+            new_time, actual = best_time(normalize_mindmap, tree, args.repeat)
+            status = '一致' if actual == expected else '不一致！'
+            print(f"{nodes:>9} {variant:<8} {old_time:>9.3f} {new_time:>9.3f} {old_time / new_time:>6.2f}x  {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按页并行提取的基准测试
+对同一个 PDF 的前 N 页分别做串行 / 并行提取，确认结果一致并报告加速比
+
+用法: python benchmarks/bench_page_parallel.py <PDF文件> [--jobs N] [--repeat R]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from pdf_line_extractor import count_pages, extract_lines
+
+
+def best_time(func, repeat):
+    """运行 repeat 次，返回 (最短耗时, 最后一次结果)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def page_counts(total):
+    """1, 2, 4, 8 ... 直到总页数"""
+    counts = []
+    n = 1
+    while n < total:
+        counts.append(n)
+        n *= 2
+    counts.append(total)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='按页并行提取基准测试')
+    parser.add_argument('pdf_path', help='PDF 文件')
+    parser.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='并行进程数')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='每组重复次数（取最短耗时）')
+    args = parser.parse_args()
+    
+    total = count_pages(args.pdf_path)
+    print(f"📄 {args.pdf_path}: {total} 页，并行进程数 {args.jobs}")
+    print(f"{'页数':>6} {'串行(s)':>10} {'并行(s)':>10} {'加速比':>8}  结果")
+    
+    for n in page_counts(total):
+        pages = list(range(n))
+        serial_time, serial_lines = best_time(lambda: extract_lines(args.pdf_path, 1, pages), args.repeat)
+        parallel_time, parallel_lines = best_time(lambda: extract_lines(args.pdf_path, args.jobs, pages), args.repeat)
+        status = '一致' if serial_lines == parallel_lines else '❌ 不一致'
+        print(f"{n:>6} {serial_time:>10.3f} {parallel_time:>10.3f} {serial_time / parallel_time:>7.2f}x  {status}")
+
+
+if __name__ == "__main__":
+    main()
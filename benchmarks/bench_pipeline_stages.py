@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pipeline 各阶段基准测试
+在合成语料（synthetic_corpus.py）上分别计时两个 pipeline 的每个阶段：
+
+- PDF pipeline（pdf_to_final_mindmap.py）: extract → parse → normalize → serialise（在 NodeStore 上进行），
+  以及处理 dict 树的 upgrade / fix_ids / validate 三步（upgrade_mindmap_data.py 等独立工具使用）
+- txt pipeline（convert_txt_to_mindmap.py）: txt_parse → txt_upgrade
+
+每个规模重复 --repeat 次，各阶段取最短耗时。超过 --max-pdf-nodes 的规模不生成 PDF，
+跳过 extract 阶段，parse 直接使用与提取结果一致的合成行。
+
+结果写入 JSON（默认 benchmarks/results/），并与基线（默认 benchmarks/baselines/pipeline_stages.json）
+对比：某阶段比基线慢超过 --threshold 且绝对差值超过 --min-delta 时记为回退，退出码为 1
+
+用法:
+    python benchmarks/bench_pipeline_stages.py --sizes 100 1000 10000 100000
+    python benchmarks/bench_pipeline_stages.py --sizes 1000000 --repeat 1
+    python benchmarks/bench_pipeline_stages.py --save-baseline   # 把本次结果保存为基线
+"""
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from convert_txt_to_mindmap import parse_txt_store
+from pdf_engines import DEFAULT_ENGINE, ENGINES
+from mindmap_normalizer import normalize_store
+from pdf_to_final_mindmap import extract_text_from_pdf, fix_node_ids, parse_hierarchy_store, validate_final_data
+from synthetic_corpus import generate_outline, outline_to_lines, write_corpus
+from upgrade_mindmap_data import upgrade_mindmap_data
+
+STAGES = ['extract', 'parse', 'upgrade', 'fix_ids', 'validate', 'normalize', 'serialise',
+          'txt_parse', 'txt_upgrade']
+RESULTS_DIR = BENCH_DIR / 'results'
+DEFAULT_BASELINE = BENCH_DIR / 'baselines' / 'pipeline_stages.json'
+RESULT_FORMAT = 1
+
+
+def timed(func, *args):
+    # 先回收上一阶段留下的垃圾，避免把别的阶段的 GC 停顿算进本阶段
+    gc.collect()
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def fix_all_ids(data):
+    used_ids = set()
+    for node in (data if isinstance(data, list) else [data]):
+        fix_node_ids(node, None, used_ids)
+
+
+def serialise(store, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        store.write_json(f)
+
+
+def run_pdf_pipeline(pdf_path, lines, json_path, engine):
+    """运行一遍 PDF pipeline，返回 {阶段: 耗时}"""
+    times = {}
+    if pdf_path is not None:
+        times['extract'], extracted = timed(lambda: extract_text_from_pdf(pdf_path, engine=engine))
+        if engine != 'pdfium' and extracted != lines:
+            raise RuntimeError("合成 PDF 的提取结果与预期行不一致")
+    times['parse'], store = timed(parse_hierarchy_store, lines)
+    # dict 树的三步使用同一份解析结果的 dict 形式（转换不计时）
+    times['upgrade'], data = timed(upgrade_mindmap_data, store.to_title_dicts())
+    times['fix_ids'], _ = timed(fix_all_ids, data)
+    times['validate'], _ = timed(validate_final_data, data)
+    times['normalize'], _ = timed(normalize_store, store)
+    times['serialise'], _ = timed(serialise, store, json_path)
+    return times
+
+
+def run_txt_pipeline(txt_path):
+    times = {}
+    times['txt_parse'], store = timed(parse_txt_store, txt_path)
+    times['txt_upgrade'], _ = timed(store.assign_sides)
+    return times
+
+
+def bench_size(nodes, args, workdir):
+    """对一个规模运行全部阶段，返回 {阶段: 最短耗时}"""
+    outline = generate_outline(nodes, args.depth, args.fanout, args.seed)
+    lines = outline_to_lines(outline)
+    txt_path = workdir / f"synthetic_{nodes}.txt"
+    write_corpus(txt_path, outline, 'txt')
+    pdf_path = None
+    if nodes <= args.max_pdf_nodes:
+        pdf_path = workdir / f"synthetic_{nodes}.pdf"
+        write_corpus(pdf_path, outline, 'pdf')
+    json_path = workdir / f"synthetic_{nodes}.json"
+    
+    best = {}
+    for _ in range(args.repeat):
+        times = run_pdf_pipeline(pdf_path, lines, json_path, args.engine)
+        times.update(run_txt_pipeline(txt_path))
+        for stage, elapsed in times.items():
+            best[stage] = min(elapsed, best.get(stage, elapsed))
+    return {stage: best[stage] for stage in STAGES if stage in best}
+
+
+def compare(results, baseline, threshold, min_delta):
+    """与基线对比，返回回退列表 [(规模, 阶段, 基线耗时, 本次耗时), ...]"""
+    regressions = []
+    base_results = baseline.get('results', {})
+    print(f"\n📊 与基线对比（{baseline.get('created', '?')}）:")
+    print(f"{'规模':>9} {'阶段':<12} {'基线(s)':>10} {'本次(s)':>10} {'变化':>8}")
+    for size, entry in results.items():
+        base_entry = base_results.get(size)
+        if not base_entry:
+            continue
+        for stage, elapsed in entry['stages'].items():
+            base = base_entry['stages'].get(stage)
+            if base is None:
+                continue
+            change = (elapsed - base) / base if base > 0 else 0.0
+            regressed = change > threshold and elapsed - base > min_delta
+            flag = '  ⚠️ 回退' if regressed else ''
+            print(f"{size:>9} {stage:<12} {base:>10.4f} {elapsed:>10.4f} {change:>+7.0%}{flag}")
+            if regressed:
+                regressions.append((size, stage, base, elapsed))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Pipeline 各阶段基准测试（合成语料）')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 100000],
+                        help='节点数（默认 100 1000 10000 100000，可加到 1000000）')
+    parser.add_argument('--depth', type=int, default=6, help='最大深度（默认 6）')
+    parser.add_argument('--fanout', type=int, default=8, help='每个节点最多的子节点数（默认 8）')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help='重复次数，各阶段取最短耗时（默认 3）')
+    parser.add_argument('--engine', choices=list(ENGINES), default=DEFAULT_ENGINE, help='extract 阶段的提取引擎')
+    parser.add_argument('--max-pdf-nodes', type=int, default=20000,
+                        help='超过该节点数时不生成 PDF、跳过 extract 阶段（默认 20000）')
+    parser.add_argument('-o', '--output', help='结果 JSON（默认 benchmarks/results/pipeline_stages-<时间>.json）')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='基线 JSON')
+    parser.add_argument('--save-baseline', action='store_true', help='把本次结果保存为基线')
+    parser.add_argument('--threshold', type=float, default=0.25, help='回退阈值（相对基线变慢的比例，默认 0.25）')
+    parser.add_argument('--min-delta', type=float, default=0.005,
+                        help='回退的最小绝对差值，单位秒（默认 0.005，忽略小规模的计时噪声）')
+    args = parser.parse_args(argv)
+    
+    params = {'depth': args.depth, 'fanout': args.fanout, 'seed': args.seed,
+              'repeat': args.repeat, 'engine': args.engine}
+    results = {}
+    print(f"{'规模':>9} " + ' '.join(f"{stage:>11}" for stage in STAGES))
+    with tempfile.TemporaryDirectory() as tmp:
+        for nodes in args.sizes:
+            stages = bench_size(nodes, args, Path(tmp))
+            results[str(nodes)] = {'nodes': nodes, 'stages': stages}
+            print(f"{nodes:>9} " + ' '.join(f"{stages[stage]:>11.4f}" if stage in stages else f"{'-':>11}"
+                                             for stage in STAGES))
+    
+    report = {
+        'format': RESULT_FORMAT,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'params': params,
+        'results': results,
+    }
+    output = Path(args.output) if args.output else \
+        RESULTS_DIR / f"pipeline_stages-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+    print(f"\n✅ 结果已保存: {output}")
+    
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"✅ 已保存为基线: {baseline_path}")
+        return 0
+    
+    if not baseline_path.exists():
+        print(f"ℹ️  没有基线文件 {baseline_path}，使用 --save-baseline 创建")
+        return 0
+    
+    baseline = json.loads(baseline_path.read_text(encoding='utf-8'))
+    if baseline.get('params') != params:
+        print(f"⚠️  基线参数 {baseline.get('params')} 与本次 {params} 不同，对比结果仅供参考")
+    regressions = compare(results, baseline, args.threshold, args.min_delta)
+    if regressions:
+        print(f"\n❌ {len(regressions)} 个阶段相对基线回退")
+        return 1
+    print("\n✅ 没有发现回退")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+联想搜索索引基准测试
+在章节目录（默认 public/mindmaps）的副本上运行 search_index.update_search_index，报告全量构建、
+只改动一个章节后的增量更新耗时（并确认增量结果与全量重建逐字节一致）、索引的 JSON / gzip 大小，
+以及模拟逐字输入的查询耗时：随机抽取节点 label，对前两个词的每个前缀（"g"、"go"、... "golgi b"）各查询一次
+
+用法: python benchmarks/bench_search_index.py [--mindmaps-dir public/mindmaps] [--samples 200]
+"""
+
+import argparse
+import gzip
+import json
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+from chapters import CHAPTERS, sorted_chapters
+from search_index import SEARCH_INDEX_FILENAME, SearchIndex, update_search_index
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def typing_queries(index, samples, seed=0):
+    """随机 label 前两个词逐字输入时产生的查询"""
+    rng = random.Random(seed)
+    labels = [label for entry in index.chapters.values() for label in entry['labels'] if label.strip()]
+    queries = []
+    for label in rng.sample(labels, min(samples, len(labels))):
+        text = ' '.join(label.split()[:2])
+        queries.extend(text[:length] for length in range(1, len(text) + 1) if not text[length - 1].isspace())
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description='search_index 的构建 / 增量更新耗时、索引大小和查询耗时')
+    parser.add_argument('--mindmaps-dir', default=str(PROJECT_ROOT / 'public' / 'mindmaps'), help='章节 JSON 所在目录')
+    parser.add_argument('--samples', type=int, default=200, help='模拟输入的 label 数')
+    parser.add_argument('--limit', type=int, default=10, help='每次查询返回的结果数')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp)
+        present = [chapter for chapter in sorted_chapters(CHAPTERS)
+                   if (Path(args.mindmaps_dir) / CHAPTERS[chapter][1]).exists()]
+        if not present:
+            print(f"❌ {args.mindmaps_dir} 中没有章节文件")
+            return
+        for chapter in present:
+            shutil.copy(Path(args.mindmaps_dir) / CHAPTERS[chapter][1], work)
+        index_path = work / SEARCH_INDEX_FILENAME
+        
+        info, full_time = timed(update_search_index, work)
+        _, unchanged_time = timed(update_search_index, work)
+        # 改动一个章节：增量更新只重新切词这一章
+        changed = work / CHAPTERS[present[0]][1]
+        with open(changed, encoding='utf-8') as f:
+            data = json.load(f)
+        data[0]['label'] += ' incremental benchmark'
+        with open(changed, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        incremental, incremental_time = timed(update_search_index, work)
+        incremental_bytes = index_path.read_bytes()
+        update_search_index(work, force=True)
+        status = '一致' if index_path.read_bytes() == incremental_bytes else '不一致！'
+        
+        raw = index_path.read_bytes()
+        print(f"章节 {info['chapters']} 个，词 {info['terms']} 个，索引 {len(raw)} 字节（gzip {len(gzip.compress(raw, 9))} 字节）")
+        print(f"全量构建 {full_time * 1e3:.1f} ms，无变化 {unchanged_time * 1e3:.1f} ms，"
+              f"改动 1 个章节 {incremental_time * 1e3:.1f} ms（重新切词 {incremental['reindexed']} 个章节，与全量重建{status}）")
+        
+        index, load_time = timed(SearchIndex.load, index_path)
+        queries = typing_queries(index, args.samples)
+        durations = []
+        for query in queries:
+            _, elapsed = timed(index.search, query, args.limit)
+            durations.append(elapsed * 1e6)
+        durations.sort()
+        print(f"加载 {load_time * 1e3:.1f} ms；{len(queries)} 次查询：中位数 {statistics.median(durations):.0f} us，"
+              f"p95 {durations[int(len(durations) * 0.95)]:.0f} us，最慢 {durations[-1]:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
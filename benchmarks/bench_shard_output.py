@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分片输出基准测试
+用合成大纲（synthetic_corpus.py）构建 NodeStore，运行 shard_output.write_shards，报告耗时、每个节点的耗时
+（应当随节点数基本不变，即线性）、整章紧凑 JSON 与骨架的大小、分片数和最大分片，
+并用 manifest.json 把骨架和分片重新拼回完整的树，确认与 NodeStore.to_mindmap() 一致
+
+用法: python benchmarks/bench_shard_output.py [--sizes 10000 100000 1000000] [--skeleton-depth 2] [--shard-bytes 65536]
+"""
+
+import argparse
+import io
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from pdf_to_final_mindmap import parse_hierarchy_store
+from shard_output import (DEFAULT_SHARD_BYTES, DEFAULT_SKELETON_DEPTH, SHARD_MANIFEST_FILENAME,
+                          SKELETON_FILENAME, shard_dir, write_shards)
+from synthetic_corpus import generate_outline, outline_to_lines
+
+
+def reassemble(directory):
+    """按 manifest.json 把分片中的分支挂回延迟节点，返回完整的森林"""
+    with open(directory / SHARD_MANIFEST_FILENAME, encoding='utf-8') as f:
+        manifest = json.load(f)
+    shards = {}
+    for entry in manifest['shards']:
+        with open(directory / entry['file'], encoding='utf-8') as f:
+            shards[entry['file']] = json.load(f)
+    with open(directory / SKELETON_FILENAME, encoding='utf-8') as f:
+        roots = json.load(f)
+    stack = list(roots)
+    while stack:
+        node = stack.pop()
+        branch = manifest['branches'].get(node['id'])
+        if branch is not None:
+            node['children'] = shards[branch['shard']][node['id']]
+        stack.extend(node['children'])
+    return roots
+
+
+def main():
+    parser = argparse.ArgumentParser(description='write_shards 的耗时、分片大小和正确性')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000], help='合成大纲的节点数')
+    parser.add_argument('--skeleton-depth', type=int, default=DEFAULT_SKELETON_DEPTH)
+    parser.add_argument('--shard-bytes', type=int, default=DEFAULT_SHARD_BYTES)
+    args = parser.parse_args()
+    
+    print(f"骨架层数 {args.skeleton_depth}，分片目标 {args.shard_bytes} 字节")
+    print(f"{'节点数':>8} {'耗时(s)':>8} {'us/节点':>8} {'整章(字节)':>11} {'骨架(字节)':>10} {'分支':>7} {'分片':>6} {'最大分片':>9}  结果")
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = Path(tmp) / 'chapter.json'
+        for size in args.sizes:
+            store = parse_hierarchy_store(outline_to_lines(generate_outline(size)))
+            store.assign_sides()
+            buffer = io.StringIO()
+            store.write_json(buffer, compact=True)
+            full_bytes = len(buffer.getvalue().encode('utf-8'))
+            
+            start = time.perf_counter()
+            info = write_shards(store, json_path, args.skeleton_depth, args.shard_bytes)
+            elapsed = time.perf_counter() - start
+            
+            status = '一致' if reassemble(shard_dir(json_path)) == store.to_mindmap() else '不一致！'
+            print(f"{size:>8} {elapsed:>8.2f} {elapsed / size * 1e6:>8.2f} "
+                  f"{full_bytes:>11} {info['skeleton_bytes']:>10} {info['branches']:>7} {info['shards']:>6} "
+                  f"{info['largest_shard']:>9}  {status}")
+
+
+if __name__ == "__main__":
+    main()
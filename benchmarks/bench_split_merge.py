@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+断行合并基准测试
+一个父节点下挂 N 个无子节点的兄弟节点，其中 --ratio 比例的节点是上一行的续行（大量合并范围），
+比较原先在原列表上逐个范围 del + insert 的做法与 merge_split_siblings 单次重建新列表的耗时，
+并确认合并结果一致、merge_split_siblings 没有修改输入
+
+用法: python benchmarks/bench_split_merge.py [--sizes 10000 100000] [--ratio 0.5] [--repeat 3]
+"""
+
+import argparse
+import gc
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / 'scripts'))
+
+from synthetic_corpus import WORDS
+from upgrade_mindmap_data import detect_split_nodes, merge_split_nodes, merge_split_siblings
+
+
+def in_place_merge(children):
+    """原先 upgrade_node 的做法（仅作对照）：从后往前对每个范围 del + insert，直接修改 children"""
+    for start, end in reversed(detect_split_nodes(children)):
+        merged = merge_split_nodes(children, start, end)
+        del children[start:end + 1]
+        children.insert(start, merged)
+    return children
+
+
+def make_siblings(size, ratio):
+    """ratio 比例的节点以 ')>' 开头（续行），其余为普通标题"""
+    siblings = []
+    step = max(1, round(1 / ratio)) if ratio > 0 else 0
+    for i in range(size):
+        word = WORDS[i % len(WORDS)]
+        title = f")> {word} {i}" if step and i % step == step - 1 else f"{word} {i}"
+        siblings.append({'id': f'node-{i}', 'title': title, 'children': []})
+    return siblings
+
+
+def best_time(func, siblings, repeat):
+    """每次在输入的浅拷贝上运行（原做法会修改列表），返回 (最短耗时, 结果)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        data = list(siblings)
+        gc.collect()
+        start = time.perf_counter()
+        result = func(data)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='逐个范围 del + insert vs 单次重建')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000], help='兄弟节点数')
+    parser.add_argument('--ratio', type=float, default=0.5, help='续行节点的比例（默认 0.5）')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    print(f"{'节点数':>8} {'合并范围':>8} {'del+insert(s)':>14} {'单次重建(s)':>12} {'加速比':>8}  结果")
+    for size in args.sizes:
+        siblings = make_siblings(size, args.ratio)
+        merges = len(detect_split_nodes(siblings))
+        old_time, expected = best_time(in_place_merge, siblings, args.repeat)
+        new_time, actual = best_time(merge_split_siblings, siblings, args.repeat)
+        # 在原列表上再运行一次，确认列表和节点都没有被修改
+        snapshot = [dict(node) for node in siblings]
+        merge_split_siblings(siblings)
+        untouched = siblings == snapshot
+        status = '一致' if actual == expected and untouched else '不一致！'
+        print(f"{size:>8} {merges:>8} {old_time:>14.3f} {new_time:>12.3f} {old_time / new_time:>7.1f}x  {status}")
+
+
+if __name__ == "__main__":
+    main()
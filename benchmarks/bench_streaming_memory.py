@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式解析的内存基准测试
+分别以一次性提取、流式 two-pass、流式 sample 三种模式提取并解析同一个 PDF，
+每种模式在独立子进程中运行，报告各自的峰值 RSS、耗时，以及解析结果是否与一次性提取一致
+
+用法: python benchmarks/bench_streaming_memory.py <PDF文件>
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+
+MODES = ['full', 'two-pass', 'sample']
+
+
+def run_child(pdf_path, mode):
+    """子进程：按指定模式提取 + 解析，输出结果摘要"""
+    from pdf_to_final_mindmap import extract_text_from_pdf, parse_hierarchy
+    from pdf_line_extractor import open_line_stream
+    
+    if mode == 'full':
+        root_nodes = parse_hierarchy(extract_text_from_pdf(pdf_path))
+    else:
+        indent_model, lines = open_line_stream(pdf_path, calibration=mode)
+        root_nodes = parse_hierarchy(lines, indent_model)
+    
+    digest = hashlib.sha256(json.dumps(root_nodes, ensure_ascii=False).encode('utf-8')).hexdigest()
+    print(json.dumps({'digest': digest}))
+
+
+def measure(pdf_path, mode):
+    """在独立子进程中运行一种模式，返回 (峰值 RSS 字节数, 耗时, 结果摘要)"""
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, __file__, pdf_path, '--child', mode], stdout=subprocess.PIPE)
+    output = proc.stdout.read()
+    _, status, rusage = os.wait4(proc.pid, 0)
+    elapsed = time.perf_counter() - start
+    if status != 0:
+        raise RuntimeError(f"{mode} 模式运行失败")
+    # Linux 上 ru_maxrss 以 KB 为单位，macOS 上以字节为单位
+    peak = rusage.ru_maxrss if sys.platform == 'darwin' else rusage.ru_maxrss * 1024
+    return peak, elapsed, json.loads(output)['digest']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='流式解析内存基准测试')
+    parser.add_argument('pdf_path', help='PDF 文件（建议使用最大的章节）')
+    parser.add_argument('--child', choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    
+    if args.child:
+        run_child(args.pdf_path, args.child)
+        return
+    
+    print(f"📄 {args.pdf_path}")
+    print(f"{'模式':<10} {'峰值 RSS(MB)':>13} {'耗时(s)':>9}  结果")
+    expected = None
+    for mode in MODES:
+        peak, elapsed, digest = measure(args.pdf_path, mode)
+        if expected is None:
+            expected = digest
+            status = '基准'
+        else:
+            status = '一致' if digest == expected else '与一次性提取不同'
+        print(f"{mode:<10} {peak / 1024 / 1024:>13.1f} {elapsed:>9.2f}  {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+预计算布局基准测试
+用合成大纲（synthetic_corpus.py）构建 NodeStore，运行 tree_layout.layout_store，报告耗时和每个节点的耗时
+（应当随节点数基本不变，即线性），另外测一条超过递归深度限制的单链和一个只有一层的宽树。
+节点数不超过 --check-max 时逐对检查节点框（加上 V_GAP）是否重叠
+
+用法: python benchmarks/bench_tree_layout.py [--sizes 1000 10000 100000] [--check-max 2000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from pdf_to_final_mindmap import parse_hierarchy_store
+from synthetic_corpus import generate_outline, outline_to_lines
+from tree_layout import V_GAP, layout_outline, layout_store
+
+
+def count_overlaps(layout):
+    """节点框（上下各留 V_GAP / 2 的间距）两两重叠的次数"""
+    boxes = [(x - w / 2, x + w / 2, y - h / 2 - V_GAP / 2 + 0.01, y + h / 2 + V_GAP / 2 - 0.01)
+             for x, y, w, h in zip(layout.x, layout.y, layout.width, layout.height)]
+    boxes.sort()
+    overlaps = 0
+    for i, (left, right, top, bottom) in enumerate(boxes):
+        for other_left, other_right, other_top, other_bottom in boxes[i + 1:]:
+            if other_left >= right:
+                break
+            if other_top < bottom and top < other_bottom:
+                overlaps += 1
+    return overlaps
+
+
+def run(name, size, build, check_max):
+    start = time.perf_counter()
+    layout = build()
+    elapsed = time.perf_counter() - start
+    min_x, min_y, max_x, max_y = layout.bounds()
+    status = f"{count_overlaps(layout)} 处重叠" if size <= check_max else '未检查'
+    print(f"{name:>8} {size:>8} {elapsed:>8.3f} {elapsed / size * 1e6:>8.2f} "
+          f"{round(max_x - min_x):>9} {round(max_y - min_y):>10}  {status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='layout_store 的耗时（每节点耗时应基本不变）和节点框重叠检查')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help='合成大纲的节点数')
+    parser.add_argument('--chain', type=int, default=20000, help='单链的节点数（默认 20000，超过递归深度限制）')
+    parser.add_argument('--check-max', type=int, default=2000, help='节点数不超过该值时检查重叠（逐对比较）')
+    args = parser.parse_args()
+    
+    print(f"{'形状':>8} {'节点数':>8} {'耗时(s)':>8} {'us/节点':>8} {'宽(px)':>9} {'高(px)':>10}  结果")
+    for size in args.sizes:
+        store = parse_hierarchy_store(outline_to_lines(generate_outline(size)))
+        store.assign_sides()
+        run('合成大纲', size, lambda: layout_store(store), args.check_max)
+    
+    chain = args.chain
+    run('单链', chain, lambda: layout_outline(list(range(chain)), ['node'] * chain, ['right'] * chain),
+        args.check_max)
+    wide = max(args.sizes)
+    run('宽树', wide, lambda: layout_outline([0] + [1] * (wide - 1), ['node'] * wide,
+                                             ['left' if i % 2 else 'right' for i in range(wide)]),
+        args.check_max)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+树遍历基准测试
+比较原先的递归实现与基于 tree_walk 显式栈遍历的实现（upgrade_mindmap_data、
+process_mindmaps_pipeline.upgrade_to_mindmap_format、fix_node_ids、validate_final_data），
+并确认两者输出完全一致
+
+两种树形：
+- wide: 合成大纲（最深 6 层、每个节点最多 8 个子节点）经 parse_hierarchy 得到的树
+- deep: 单链，深度远超 Python 递归深度限制（模拟缩进错乱的 PDF），递归实现会抛出 RecursionError
+
+比较和复制输入时都不能依赖递归（copy.deepcopy、== 在深树上同样会溢出），
+因此这里用 tree_walk 复制树、把树展开成先序节点列表后再比较
+
+用法: python benchmarks/bench_tree_walk.py [--sizes 10000 100000] [--depth 20000] [--repeat 3]
+"""
+
+import argparse
+import gc
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+PROJECT_ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(PROJECT_ROOT / 'scripts'))
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from id_allocator import stable_hash
+from pdf_to_final_mindmap import fix_node_ids, parse_hierarchy, validate_final_data
+from process_mindmaps_pipeline import upgrade_to_mindmap_format
+from synthetic_corpus import WORDS, generate_outline, outline_to_lines
+from tree_walk import walk
+from upgrade_mindmap_data import detect_split_nodes, merge_split_nodes, slugify, upgrade_mindmap_data
+
+
+# ---- 原先的递归实现（仅作对照，行为与 tree_walk 版本相同） ----
+
+def recursive_upgrade_node(node, parent_side, parent_id, index, siblings_count, level, used_ids):
+    label = node.get('title') or node.get('label') or ''
+    node_id = node.get('id')
+    if not node_id:
+        base_id = slugify(label) or f'node-{level}-{index}'
+        candidate_ids = [f"{parent_id}-{base_id}", base_id] if parent_id else [base_id]
+        node_id = None
+        for candidate in candidate_ids:
+            if candidate not in used_ids:
+                node_id = candidate
+                break
+        if not node_id:
+            suffix = 1
+            while node_id is None or node_id in used_ids:
+                node_id = f"{candidate_ids[0]}-{suffix}"
+                suffix += 1
+        used_ids.add(node_id)
+    side = node.get('side')
+    if not side:
+        if level == 0:
+            side = 'center'
+        elif parent_side == 'center' or parent_side is None:
+            side = 'left' if index < siblings_count / 2 else 'right'
+        else:
+            side = parent_side
+    children = node.get('children', [])
+    upgraded_children = []
+    if children:
+        for start, end in reversed(detect_split_nodes(children)):
+            merged = merge_split_nodes(children, start, end)
+            del children[start:end + 1]
+            children.insert(start, merged)
+        for idx, child in enumerate(children):
+            upgraded_children.append(
+                recursive_upgrade_node(child, side, node_id, idx, len(children), level + 1, used_ids))
+    return {'id': node_id, 'label': label, 'side': side, 'children': upgraded_children}
+
+
+def recursive_upgrade_mindmap_data(data):
+    used_ids = set()
+    return [recursive_upgrade_node(node, None, None, idx, len(data), 0, used_ids)
+            for idx, node in enumerate(data)]
+
+
+def recursive_upgrade_to_mindmap_format(data, level=0, parent_side=None, parent_id=None, index=0,
+                                        siblings_count=1, used_ids=None):
+    if used_ids is None:
+        used_ids = set()
+    if isinstance(data, dict) and 'label' in data:
+        return data
+    if isinstance(data, dict) and 'title' in data:
+        title = data.get('title', '')
+        node_id = data.get('id')
+        if not node_id:
+            base_id = slugify(title) or f'node-{level}-{index}'
+            candidate_ids = [f"{parent_id}-{base_id}", base_id] if parent_id else [base_id]
+            node_id = None
+            for candidate in candidate_ids:
+                if candidate not in used_ids:
+                    node_id = candidate
+                    break
+            if not node_id:
+                suffix = 1
+                while node_id is None or node_id in used_ids:
+                    node_id = f"{candidate_ids[0]}-{suffix}"
+                    suffix += 1
+            used_ids.add(node_id)
+        side = data.get('side')
+        if not side:
+            if level == 0:
+                side = 'center'
+            elif parent_side == 'center':
+                side = 'left' if index < siblings_count / 2 else 'right'
+            else:
+                side = parent_side
+        children = data.get('children', [])
+        return {
+            "id": node_id,
+            "label": title,
+            "side": side,
+            "children": [recursive_upgrade_to_mindmap_format(child, level + 1, side, node_id, idx,
+                                                             len(children), used_ids)
+                         for idx, child in enumerate(children)]
+        }
+    if isinstance(data, list):
+        return [recursive_upgrade_to_mindmap_format(item, level, parent_side, parent_id, idx, len(data), used_ids)
+                for idx, item in enumerate(data)]
+    return data
+
+
+def recursive_fix_node_ids(node, parent_id=None, used_ids=None, path=""):
+    if used_ids is None:
+        used_ids = set()
+    current_id = node.get('id', '')
+    current_path = f"{path}/{current_id}" if path else current_id
+    renamed = 0
+    if current_id in used_ids:
+        if parent_id:
+            new_id = f"{parent_id}-{current_id}"
+        else:
+            new_id = f"{current_id}-{stable_hash(current_path)}"
+        suffix = 1
+        original_new_id = new_id
+        while new_id in used_ids:
+            new_id = f"{original_new_id}-{suffix}"
+            suffix += 1
+        node['id'] = new_id
+        current_id = new_id
+        renamed = 1
+    used_ids.add(current_id)
+    for child in node.get('children', []):
+        renamed += recursive_fix_node_ids(child, current_id, used_ids, current_path)
+    return renamed
+
+
+def recursive_validate_final_data(data):
+    issues = []
+    all_ids = set()
+    
+    def check_node(node, path=""):
+        node_id = node.get('id')
+        path_str = f"{path}/{node_id}" if path else node_id
+        if not node_id:
+            issues.append(f"{path_str}: 缺少 id")
+        elif node_id in all_ids:
+            issues.append(f"{path_str}: ID 重复")
+        else:
+            all_ids.add(node_id)
+        if 'label' not in node:
+            issues.append(f"{path_str}: 缺少 label")
+        if 'side' not in node:
+            issues.append(f"{path_str}: 缺少 side")
+        for child in node.get('children', []):
+            check_node(child, path_str)
+    
+    for node in data:
+        check_node(node)
+    return issues, len(all_ids)
+
+
+# ---- 输入构造与比较 ----
+
+def make_outline(shape, size):
+    if shape == 'wide':
+        return generate_outline(size)
+    # 单链：每个节点是上一个节点唯一的子节点
+    return [(level, f"{WORDS[level % len(WORDS)]} {level}") for level in range(size)]
+
+
+def copy_tree(data):
+    """复制树（不递归）；只复制 dict 和 children 列表，标签等值共享"""
+    copied = []
+    
+    def enter(node, output, index, count):
+        children = []
+        output.append({**node, 'children': children})
+        return children, node.get('children')
+    
+    walk(data, enter, context=copied)
+    return copied
+
+
+def flatten(data):
+    """把树展开为先序的 (深度, 节点去掉 children 后的各项) 列表，用于比较两棵树"""
+    rows = []
+    
+    def enter(node, depth, index, count):
+        rows.append((depth, sorted((key, value) for key, value in node.items() if key != 'children')))
+        return depth + 1, node.get('children')
+    
+    walk(data, enter, context=0)
+    return rows
+
+
+def fix_all(fix, data):
+    used_ids = set()
+    renamed = 0
+    for node in data:
+        renamed += fix(node, None, used_ids)
+    return renamed, data
+
+
+def build_cases(root_nodes):
+    """返回 [(变换名, 递归实现, tree_walk 实现, 输入, 是否需要每次复制输入)]"""
+    upgraded = upgrade_mindmap_data(copy_tree(root_nodes))
+    # 每个节点的 id 都设为标签的 slug，大量节点走改名路径
+    duplicated = copy_tree(upgraded)
+    stack = list(duplicated)
+    while stack:
+        node = stack.pop()
+        node['id'] = slugify(node['label'])
+        stack.extend(node['children'])
+    return [
+        ('upgrade', recursive_upgrade_mindmap_data, upgrade_mindmap_data, root_nodes, True),
+        ('format', recursive_upgrade_to_mindmap_format, upgrade_to_mindmap_format, root_nodes, False),
+        ('fix_ids', lambda data: fix_all(recursive_fix_node_ids, data),
+         lambda data: fix_all(fix_node_ids, data), duplicated, True),
+        ('validate', recursive_validate_final_data, validate_final_data, upgraded, False),
+    ]
+
+
+def best_time(func, data, copy_input, repeat):
+    """返回 (最短耗时, 结果)；递归实现溢出时返回 (None, None)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        arg = copy_tree(data) if copy_input else data
+        gc.collect()
+        start = time.perf_counter()
+        try:
+            result = func(arg)
+        except RecursionError:
+            return None, None
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def comparable(result):
+    """把变换结果转成可以安全比较的形式（树展开为列表）"""
+    if isinstance(result, tuple) and isinstance(result[1], list):
+        return result[0], flatten(result[1])
+    if isinstance(result, list):
+        return flatten(result)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='递归实现 vs tree_walk 显式栈实现')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000], help='wide 树的节点数')
+    parser.add_argument('--depth', type=int, default=20000, help='deep 树的深度（默认 20000）')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    
+    shapes = [('wide', size) for size in args.sizes] + [('deep', args.depth)]
+    print(f"{'树形':<5} {'节点数':>8} {'变换':<9} {'递归(s)':>9} {'显式栈(s)':>10} {'加速比':>7}  结果")
+    for shape, size in shapes:
+        root_nodes = parse_hierarchy(outline_to_lines(make_outline(shape, size)))
+        for name, old, new, data, copy_input in build_cases(root_nodes):
+            old_time, expected = best_time(old, data, copy_input, args.repeat)
+            new_time, actual = best_time(new, data, copy_input, args.repeat)
+            if old_time is None:
+                print(f"{shape:<5} {size:>8} {name:<9} {'溢出':>9} {new_time:>10.3f} {'-':>7}  递归实现 RecursionError")
+                continue
+            status = '一致' if comparable(actual) == comparable(expected) else '不一致！'
+            print(f"{shape:<5} {size:>8} {name:<9} {old_time:>9.3f} {new_time:>10.3f} "
+                  f"{old_time / new_time:>6.2f}x  {status}")
+
+
+if __name__ == "__main__":
+    main()
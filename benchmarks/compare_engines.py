@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+提取引擎对比
+在同一批 PDF 上运行每个可用的提取引擎，报告提取耗时以及与参照引擎（默认 pdfplumber）的逐行差异：
+- 文本差异行数：按行文本做 diff，增加 / 删除 / 改写的行数（取两侧较大者）
+- x0 差异行数：文本相同的行中，行首 x 坐标相差超过 --x-epsilon 的行数（会影响缩进级别）
+
+用法: python benchmarks/compare_engines.py [PDF 或目录 ...] [--repeat 3] [--engines pdfplumber pdfminer pdfium]
+默认对比 mindmap_raw/ 下的全部 PDF
+"""
+
+import argparse
+import difflib
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'scripts'))
+
+from line_grouping import DEFAULT_Y_TOLERANCE
+from pdf_engines import DEFAULT_ENGINE, available_engines
+from pdf_line_extractor import extract_lines
+
+
+def collect_pdfs(paths):
+    pdfs = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            pdfs.extend(sorted(path.glob('*.pdf')))
+        else:
+            pdfs.append(path)
+    return pdfs
+
+
+def time_engine(pdf_path, engine, repeat, y_tolerance):
+    """返回 (最短耗时, 提取结果)"""
+    best = None
+    lines = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        lines = extract_lines(pdf_path, y_tolerance=y_tolerance, engine=engine)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, lines
+
+
+def diff_lines(reference, lines, x_epsilon):
+    """返回 (文本差异行数, x0 差异行数)"""
+    ref_texts = [text for _, text in reference]
+    texts = [text for _, text in lines]
+    text_diffs = 0
+    x_diffs = 0
+    matcher = difflib.SequenceMatcher(None, ref_texts, texts, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            x_diffs += sum(1 for (ref_x, _), (x, _) in zip(reference[i1:i2], lines[j1:j2])
+                           if abs(ref_x - x) > x_epsilon)
+        else:
+            text_diffs += max(i2 - i1, j2 - j1)
+    return text_diffs, x_diffs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='对比各提取引擎的速度和输出差异')
+    parser.add_argument('paths', nargs='*', default=['mindmap_raw'], help='PDF 文件或目录（默认 mindmap_raw/）')
+    parser.add_argument('--engines', nargs='+', default=available_engines(),
+                        help=f"参与对比的引擎（默认全部可用引擎: {', '.join(available_engines())}）")
+    parser.add_argument('--reference', default=DEFAULT_ENGINE, help=f'参照引擎（默认 {DEFAULT_ENGINE}）')
+    parser.add_argument('--repeat', type=int, default=3, help='每个引擎重复次数，取最短耗时（默认 3）')
+    parser.add_argument('--y-tolerance', type=float, default=DEFAULT_Y_TOLERANCE)
+    parser.add_argument('--x-epsilon', type=float, default=0.01, help='x0 差异阈值，单位 pt（默认 0.01）')
+    args = parser.parse_args(argv)
+    
+    pdfs = collect_pdfs(args.paths)
+    if not pdfs:
+        print("❌ 没有找到 PDF 文件")
+        return 1
+    engines = [args.reference] + [engine for engine in args.engines if engine != args.reference]
+    
+    totals = {engine: [0.0, 0, 0, 0] for engine in engines}  # 耗时、行数、文本差异、x0 差异
+    print(f"{'PDF':<28} {'引擎':<12} {'耗时(s)':>9} {'加速比':>7} {'行数':>8} {'文本差异':>8} {'x0差异':>8}")
+    for pdf_path in pdfs:
+        reference_time, reference = time_engine(pdf_path, args.reference, args.repeat, args.y_tolerance)
+        for engine in engines:
+            if engine == args.reference:
+                elapsed, lines = reference_time, reference
+            else:
+                elapsed, lines = time_engine(pdf_path, engine, args.repeat, args.y_tolerance)
+            text_diffs, x_diffs = diff_lines(reference, lines, args.x_epsilon)
+            total = totals[engine]
+            total[0] += elapsed
+            total[1] += len(lines)
+            total[2] += text_diffs
+            total[3] += x_diffs
+            print(f"{pdf_path.name[:28]:<28} {engine:<12} {elapsed:>9.3f} {reference_time / elapsed:>6.2f}x "
+                  f"{len(lines):>8} {text_diffs:>8} {x_diffs:>8}")
+    
+    print("-" * 86)
+    reference_total = totals[args.reference][0]
+    for engine in engines:
+        elapsed, line_count, text_diffs, x_diffs = totals[engine]
+        print(f"{'合计':<28} {engine:<12} {elapsed:>9.3f} {reference_total / elapsed:>6.2f}x "
+              f"{line_count:>8} {text_diffs:>8} {x_diffs:>8}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成思维导图语料
+按给定的节点数、最大深度和分支数生成大纲，可以输出为：
+- 缩进 txt（convert_txt_to_mindmap.py 的输入格式，每级 2 个空格）
+- 简单 PDF（每行一个节点，缩进体现为 x 坐标；不依赖 reportlab，直接写 PDF 对象）
+- 内存中的 (x0, text) 行列表（与从上述 PDF 提取出的结果一致，用于跳过超大 PDF 的提取）
+
+标签从固定词表中随机组合，同名节点的比例与真实章节接近，可以覆盖 ID 冲突的路径；
+相同参数和种子总是生成相同的语料
+
+用法: python benchmarks/synthetic_corpus.py --nodes 10000 --format pdf -o synthetic.pdf
+"""
+
+import argparse
+import random
+import sys
+import zlib
+from collections import deque
+
+WORDS = (
+    'cell membrane nucleus ribosome protein enzyme substrate active site ATP glucose '
+    'mitochondria chloroplast light reaction Calvin cycle DNA RNA transcription translation '
+    'antibody antigen immune response phagocyte lymphocyte vaccine structure function form '
+    'transport diffusion osmosis receptor hormone signal pathway inhibitor temperature pH '
+    'rate concentration gene mutation allele inheritance'
+).split()
+
+# 合成 PDF 的版式（pt）
+PAGE_WIDTH = 612
+PAGE_HEIGHT = 792
+FONT_SIZE = 10
+LINE_HEIGHT = 12
+LINES_PER_PAGE = 60
+TOP = 760
+LEFT = 40
+INDENT = 20
+
+
+def generate_outline(nodes, depth=6, fanout=8, seed=0):
+    """
+    生成大纲，返回按先序排列的 [(level, label), ...]
+    
+    按层序填充节点（每个节点最多 fanout 个子节点，最深 depth 层），
+    节点数超过该形状的容量时其余节点都作为根节点
+    """
+    rng = random.Random(seed)
+    children = [[]]
+    levels = [0]
+    roots = [0]
+    queue = deque([0])
+    while len(levels) < nodes:
+        if not queue:
+            # 当前森林已填满，新开一棵树
+            node = len(levels)
+            children.append([])
+            levels.append(0)
+            roots.append(node)
+            queue.append(node)
+            continue
+        parent = queue[0]
+        if len(children[parent]) >= fanout or levels[parent] + 1 >= depth:
+            queue.popleft()
+            continue
+        node = len(levels)
+        children.append([])
+        levels.append(levels[parent] + 1)
+        children[parent].append(node)
+        queue.append(node)
+    
+    outline = []
+    stack = list(reversed(roots))
+    while stack:
+        node = stack.pop()
+        label = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+        outline.append((levels[node], label))
+        stack.extend(reversed(children[node]))
+    return outline
+
+
+def outline_to_txt(outline):
+    """缩进 txt 文本"""
+    return ''.join(f"{'  ' * level}{label}\n" for level, label in outline)
+
+
+def outline_to_lines(outline):
+    """与从合成 PDF 提取结果一致的 (x0, text) 行列表"""
+    return [(float(LEFT + level * INDENT), label) for level, label in outline]
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def outline_to_pdf(outline):
+    """生成 PDF 字节串：Helvetica 10pt，每页 LINES_PER_PAGE 行"""
+    pages = [outline[i:i + LINES_PER_PAGE] for i in range(0, len(outline), LINES_PER_PAGE)] or [[]]
+    page_count = len(pages)
+    # 对象编号：1 Catalog，2 Pages，3 Font，之后每页两个对象（Page、内容流）
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        ("<< /Type /Pages /Kids [%s] /Count %d >>" % (
+            ' '.join(f"{4 + 2 * i} 0 R" for i in range(page_count)), page_count)).encode('ascii'),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    for i, page_lines in enumerate(pages):
+        ops = [f"BT /F1 {FONT_SIZE} Tf"]
+        for row, (level, label) in enumerate(page_lines):
+            x = LEFT + level * INDENT
+            y = TOP - row * LINE_HEIGHT
+            ops.append(f"1 0 0 1 {x} {y} Tm ({_escape(label)}) Tj")
+        ops.append("ET")
+        content = zlib.compress('\n'.join(ops).encode('latin-1'))
+        objects.append((f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+                        f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>").encode('ascii'))
+        objects.append(f"<< /Length {len(content)} /Filter /FlateDecode >>\nstream\n".encode('ascii')
+                       + content + b"\nendstream")
+    
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode('ascii') + body + b"\nendobj\n"
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('ascii')
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode('ascii')
+    out += (f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+            f"startxref\n{xref}\n%%EOF\n").encode('ascii')
+    return bytes(out)
+
+
+def write_corpus(path, outline, fmt):
+    if fmt == 'txt':
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(outline_to_txt(outline))
+    else:
+        with open(path, 'wb') as f:
+            f.write(outline_to_pdf(outline))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成合成思维导图语料（缩进 txt 或 PDF）')
+    parser.add_argument('--nodes', type=int, default=1000, help='节点数（默认 1000）')
+    parser.add_argument('--depth', type=int, default=6, help='最大深度（默认 6）')
+    parser.add_argument('--fanout', type=int, default=8, help='每个节点最多的子节点数（默认 8）')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--format', choices=['txt', 'pdf'], default='txt')
+    parser.add_argument('-o', '--output', required=True, help='输出文件')
+    args = parser.parse_args()
+    
+    outline = generate_outline(args.nodes, args.depth, args.fanout, args.seed)
+    write_corpus(args.output, outline, args.format)
+    print(f"✅ 已生成 {len(outline)} 个节点: {args.output}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -5,11 +5,34 @@
 格式与 AS 级别的 JSON 文件一致
 """
 
-import json
+import argparse
+import functools
 import os
 import re
+import sys
 from pathlib import Path
 
+# 添加 scripts 目录到路径，以便导入共用模块
+sys.path.insert(0, str(Path(__file__).parent / 'scripts'))
+
+from build_manifest import MANIFEST_FILENAME, BuildManifest, code_fingerprint
+from chapter_manifest import CHAPTER_MANIFEST_FILENAME, update_chapter_manifest
+from chapters import CHAPTER_TO_FILENAME, TXT_TO_CHAPTER
+from id_allocator import IdAllocator
+import node_store
+from node_store import NodeStore
+from output_encoding import precompressed_up_to_date, remove_precompressed, report_sizes, write_precompressed
+from search_index import SEARCH_INDEX_FILENAME, update_search_index
+import shard_output
+from shard_output import DEFAULT_SHARD_BYTES, DEFAULT_SKELETON_DEPTH, remove_shards, shards_up_to_date, write_shards
+import tree_layout
+from tree_layout import layout_up_to_date, remove_layout, write_layout
+from stable_check import check_stable
+from tree_walk import walk_subtree
+
+# 解析行为变化（而源码指纹覆盖不到）时手动递增，使已有的构建记录失效
+PIPELINE_VERSION = '1'
+
 
 def calculate_indent_level(line):
     """计算行的缩进级别（空格数）"""
@@ -20,18 +43,8 @@ def calculate_indent_level(line):
     return indent
 
 
-def parse_txt_hierarchy(file_path):
-    """解析 txt 文件的层级关系，构建树形结构"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-    
-    if not lines:
-        return []
-    
-    nodes = []  # 用于维护当前路径的节点栈
-    root_nodes = []
-    root_index = 0
-    
+def _txt_outline_entries(lines):
+    """产出 (缩进级别, 内容)；空行和去掉项目符号后为空的行跳过"""
     for line in lines:
         # 计算缩进级别
         indent_level = calculate_indent_level(line)
@@ -47,120 +60,127 @@ def parse_txt_hierarchy(file_path):
         if not content:
             continue
         
-        # 弹出栈中所有级别大于等于当前级别的节点
-        while nodes and nodes[-1]["level"] >= indent_level:
-            nodes.pop()
+        yield indent_level, content
+
+
+def parse_txt_store(file_path):
+    """解析 txt 文件的层级关系，构建 NodeStore（逐行读取，不保留整个文件）"""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        return NodeStore.from_outline(_txt_outline_entries(f))
+
+
+def parse_txt_hierarchy(file_path):
+    """解析 txt 文件的层级关系，构建 [{id, title, children}, ...] 树形结构"""
+    return parse_txt_store(file_path).to_title_dicts()
+
+
+def _upgrade_format_enter(used_ids):
+    """
+    upgrade_to_mindmap_format 的先序钩子（tree_walk），used_ids 为整棵树共享的 IdAllocator
+    
+    上下文为 (所在层级, 父节点 side, 父节点 id, 输出列表)：
+    每个节点把升级结果追加到父节点的输出列表，再把自己的输出 children 交给子节点
+    """
+    def enter(data, context, index, siblings_count):
+        level, parent_side, parent_id, output = context
         
-        # 生成节点 ID
-        if not nodes:
-            # 根节点
-            node_id = f"root_{root_index}"
-            root_index += 1
-        else:
-            # 子节点
-            parent = nodes[-1]["node"]
-            parent_id = parent.get("id", "")
-            child_index = len(parent.get("children", []))
-            node_id = f"{parent_id}_child_{child_index}"
-        
-        # 创建节点
-        node = {
-            "id": node_id,
-            "title": content,
-            "children": []
-        }
-        
-        # 添加到树中
-        if not nodes:
-            root_nodes.append(node)
-            nodes.append({"level": indent_level, "node": node})
-        else:
-            parent = nodes[-1]["node"]
-            parent["children"].append(node)
-            nodes.append({"level": indent_level, "node": node})
+        # 如果已经是新格式（有 label），原样保留
+        if isinstance(data, dict) and 'label' in data:
+            output.append(data)
+            return None, None
+        
+        # 旧格式（有 title），需要转换
+        if isinstance(data, dict) and 'title' in data:
+            title = data.get('title', '')
+            
+            # 使用已有的 ID
+            node_id = data.get('id')
+            if node_id:
+                used_ids.add(node_id)
+            
+            # 分配 side
+            side = data.get('side')
+            if not side:
+                if level == 0:
+                    side = 'center'
+                elif parent_side == 'center':
+                    # 一级节点：平分左右
+                    side = 'left' if index < siblings_count / 2 else 'right'
+                else:
+                    # 继承父节点方向
+                    side = parent_side
+            
+            children = []
+            output.append({
+                "id": node_id,
+                "label": title,
+                "side": side,
+                "children": children
+            })
+            return (level + 1, side, node_id, children), data.get('children')
+        
+        # 列表：元素与列表本身处于同一层级
+        if isinstance(data, list):
+            items = []
+            output.append(items)
+            return (level, parent_side, parent_id, items), data
+        
+        output.append(data)
+        return None, None
     
-    return root_nodes
+    return enter
 
 
 def upgrade_to_mindmap_format(data, level=0, parent_side=None, parent_id=None, index=0, siblings_count=1, used_ids=None):
-    """将 title 格式升级为 label 格式（添加 id, label, side）"""
+    """将 title 格式升级为 label 格式（添加 id, label, side）；显式栈遍历，不受递归深度限制"""
     if used_ids is None:
-        used_ids = set()
-    
-    # 如果已经是新格式（有 label），直接返回
-    if isinstance(data, dict) and 'label' in data:
-        return data
-    
-    # 旧格式（有 title），需要转换
-    if isinstance(data, dict) and 'title' in data:
-        title = data.get('title', '')
-        
-        # 使用已有的 ID
-        node_id = data.get('id')
-        if node_id:
-            used_ids.add(node_id)
-        
-        # 分配 side
-        side = data.get('side')
-        if not side:
-            if level == 0:
-                side = 'center'
-            elif parent_side == 'center':
-                # 一级节点：平分左右
-                side = 'left' if index < siblings_count / 2 else 'right'
-            else:
-                # 继承父节点方向
-                side = parent_side
-        
-        # 处理子节点
-        children = []
-        child_siblings_count = len(data.get('children', []))
-        for child_index, child in enumerate(data.get('children', [])):
-            upgraded_child = upgrade_to_mindmap_format(
-                child, 
-                level + 1, 
-                side, 
-                node_id, 
-                child_index, 
-                child_siblings_count,
-                used_ids
-            )
-            children.append(upgraded_child)
-        
-        return {
-            "id": node_id,
-            "label": title,
-            "side": side,
-            "children": children
-        }
-    
-    # 如果是列表，递归处理
-    if isinstance(data, list):
-        return [upgrade_to_mindmap_format(item, level, parent_side, parent_id, idx, len(data), used_ids) 
-                for idx, item in enumerate(data)]
-    
-    return data
-
-
-def convert_txt_to_json(txt_path, output_path):
-    """将 txt 文件转换为 JSON 格式"""
+        used_ids = IdAllocator()
+    
+    output = []
+    walk_subtree(data, _upgrade_format_enter(used_ids), context=(level, parent_side, parent_id, output),
+                 index=index, count=siblings_count)
+    return output[0]
+
+
+def convert_txt_to_json(txt_path, output_path, compact=False, shard_options=None, layout=False):
+    """
+    将 txt 文件转换为 JSON 格式；compact 为 True 时写出无缩进的 JSON 和 .gz / .br 预压缩文件，
+    shard_options 不为 None 时另外生成分片目录（参数传给 shard_output.write_shards），
+    layout 为 True 时另外写出预计算的布局文件 X.layout.json（tree_layout.py）
+    """
     try:
         print(f"  📄 读取文件: {txt_path}")
         
         # 解析层级关系
         print(f"  🔄 解析层级关系...")
-        root_nodes = parse_txt_hierarchy(txt_path)
-        print(f"  ✅ 解析完成，找到 {len(root_nodes)} 个根节点")
+        store = parse_txt_store(txt_path)
+        print(f"  ✅ 解析完成，找到 {len(store.roots())} 个根节点")
         
-        # 升级为思维导图格式
+        # 升级为思维导图格式（解析器已分配 ID，只需分配 side，结果与 upgrade_to_mindmap_format 相同）
         print(f"  🔄 升级为思维导图格式...")
-        upgraded_data = upgrade_to_mindmap_format(root_nodes)
+        store.assign_sides()
         print(f"  ✅ 格式升级完成")
         
         # 写入输出文件
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(upgraded_data, f, ensure_ascii=False, indent=2)
+            store.write_json(f, compact=compact)
+        if compact:
+            write_precompressed(output_path)
+        else:
+            # 以前 --compact 生成的预压缩文件已与新的 JSON 不一致
+            remove_precompressed(output_path)
+        if shard_options is not None:
+            shard_info = write_shards(store, output_path, compress=compact, **shard_options)
+            print(f"  🧩 分片完成: 骨架 {shard_info['skeleton_bytes']} 字节，{shard_info['branches']} 个分支、"
+                  f"{shard_info['shards']} 个分片（最大 {shard_info['largest_shard']} 字节）")
+        else:
+            remove_shards(output_path)
+        if layout:
+            layout_info = write_layout(store, output_path, compress=compact)
+            print(f"  📐 布局完成: {layout_info['nodes']} 个节点，画布 {layout_info['width']} x {layout_info['height']}")
+        else:
+            remove_layout(output_path)
         
         print(f"  ✅ 成功保存: {output_path}")
         return True, None
@@ -169,23 +189,50 @@ def convert_txt_to_json(txt_path, output_path):
         return False, f"{str(e)}\n{traceback.format_exc()}"
 
 
-# A2 级别 txt 文件到章节的映射
-TXT_TO_CHAPTER = {
-    'Energy and Respiration.txt': '12_Energy_and_respiration.json',
-    'Photosynthesis.txt': '13_Photosynthesis.json',
-    'Homeostasis.txt': '14_Homeostasis.json',
-    'Nervous System.txt': '15_Control_and_coordination.json',
-    'Inheritance.txt': '16_Inheritance.json',
-    'Selection & Evolution.txt': '17_Selection_and_evolution.json',
-    'Classification, Biodiversity and Conservation.txt': '18_Classification_biodiversity_and_conservation.json',
-    'Genetic Technology.txt': '19_Genetic_technology.json',
-}
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='将 mindmap_raw/ 下的 A2 txt 思维导图转换为 JSON，输出到 public/mindmaps/')
+    parser.add_argument('--force', action='store_true',
+                        help='忽略构建清单，重新生成所有章节')
+    parser.add_argument('--output-dir', default='public/mindmaps',
+                        help='输出目录（默认 public/mindmaps）')
+    parser.add_argument('--compact', action='store_true',
+                        help='写出无缩进的 JSON，并生成最高压缩级别的 .json.gz / .json.br 预压缩文件'
+                             '（.br 需要 pip install brotli），结束时打印体积报告')
+    parser.add_argument('--size-report', metavar='JSON',
+                        help='结束时打印每个章节 pretty / minified / gzip / brotli 的字节数，并保存为 JSON')
+    parser.add_argument('--shard', action='store_true',
+                        help='另外生成分片目录 X.shards/：前几层的骨架 + 按需加载的分支分片 + 节点到分片的 manifest.json')
+    parser.add_argument('--skeleton-depth', type=int, default=DEFAULT_SKELETON_DEPTH,
+                        help=f'--shard 骨架包含的层数（默认 {DEFAULT_SKELETON_DEPTH}）')
+    parser.add_argument('--shard-bytes', type=int, default=DEFAULT_SHARD_BYTES,
+                        help=f'--shard 单个分片的目标字节数（默认 {DEFAULT_SHARD_BYTES}）')
+    parser.add_argument('--layout', action='store_true',
+                        help='另外写出预计算的布局文件 X.layout.json（节点坐标、尺寸和子树范围），客户端无需再做布局')
+    parser.add_argument('--check-stable', action='store_true',
+                        help='不更新输出目录，而是用不同的哈希种子在新进程中完整转换两次，'
+                             '确认输出逐字节一致（不一致时退出码为 1）')
+    args = parser.parse_args(argv)
+    if args.skeleton_depth < 1 or args.shard_bytes < 1:
+        parser.error('--skeleton-depth 和 --shard-bytes 必须为正数')
+    return args
+
 
+def _build_into(argv, output_dir):
+    """--check-stable 的一次构建：按原参数把所有章节重新生成到 output_dir"""
+    main(argv + ['--force', '--output-dir', str(output_dir)])
 
-def main():
+
+def main(argv=None):
+    args = parse_args(argv)
+    
+    if args.check_stable:
+        child_argv = [arg for arg in (sys.argv[1:] if argv is None else argv) if arg != '--check-stable']
+        stable = check_stable(functools.partial(_build_into, child_argv), ignore=(MANIFEST_FILENAME,))
+        sys.exit(0 if stable else 1)
+    
     # 配置路径
     mindmap_raw_dir = Path('mindmap_raw')
-    public_mindmaps_dir = Path('public/mindmaps')
+    public_mindmaps_dir = Path(args.output_dir)
     
     # 创建输出目录
     public_mindmaps_dir.mkdir(parents=True, exist_ok=True)
@@ -204,13 +251,33 @@ def main():
     success_count = 0
     error_count = 0
     skipped_count = 0
+    unchanged_count = 0
+    
+    manifest = BuildManifest(
+        public_mindmaps_dir,
+        pipeline='convert_txt_to_mindmap',
+        pipeline_version=PIPELINE_VERSION,
+        # node_store 为整个模块的源码指纹：写 JSON 还依赖模块级的 _close_nodes、_PARSER_ID
+        code_hash=(code_fingerprint(calculate_indent_level, _txt_outline_entries, parse_txt_store, node_store)
+                   # 紧凑输出与缩进输出的内容不同，切换模式时重新生成
+                   + ('-compact' if args.compact else '')
+                   # 分片参数或分片代码（shard_output.py 整个模块的源码，含 SHARD_FORMAT）变化时重新生成分片
+                   + (f"-shard{args.skeleton_depth}x{args.shard_bytes}-{code_fingerprint(shard_output)}" if args.shard else '')
+                   # 布局算法或字体度量表（tree_layout.py 整个模块的源码）变化时重新生成布局
+                   + (f"-layout{code_fingerprint(tree_layout)}" if args.layout else ''))
+    )
+    
+    shard_options = ({'skeleton_depth': args.skeleton_depth, 'shard_bytes': args.shard_bytes}
+                     if args.shard else None)
     
     # 处理每个文件
+    output_paths = []
     for txt_file in sorted(txt_files):
         filename = txt_file.name
         
         # 查找对应的输出文件名
-        output_filename = TXT_TO_CHAPTER.get(filename)
+        chapter = TXT_TO_CHAPTER.get(filename)
+        output_filename = CHAPTER_TO_FILENAME.get(chapter)
         
         if not output_filename:
             print(f"⏭️  跳过: {filename} (未找到对应的章节映射)")
@@ -218,12 +285,22 @@ def main():
             continue
         
         output_path = public_mindmaps_dir / output_filename
+        output_paths.append(output_path)
+        
+        if (not args.force and manifest.is_up_to_date(txt_file, output_path) and
+                (not args.compact or precompressed_up_to_date(output_path)) and
+                (not args.shard or shards_up_to_date(output_path, args.compact)) and
+                (not args.layout or layout_up_to_date(output_path, args.compact))):
+            print(f"♻️  未变化: {filename} -> {output_filename}")
+            unchanged_count += 1
+            continue
         
         print(f"🔄 处理: {filename} -> {output_filename}")
         
-        success, error = convert_txt_to_json(txt_file, output_path)
+        success, error = convert_txt_to_json(txt_file, output_path, args.compact, shard_options, args.layout)
         
         if success:
+            manifest.record(txt_file, output_path)
             print(f"✅ 成功: {output_path}")
             success_count += 1
         else:
@@ -232,12 +309,24 @@ def main():
             error_count += 1
         print()
     
+    manifest.save()
+    chapter_count = update_chapter_manifest(public_mindmaps_dir)
+    search_info = update_search_index(public_mindmaps_dir)
+    
     print("-" * 60)
     print(f"📊 处理完成:")
     print(f"   ✅ 成功: {success_count} 个文件")
     print(f"   ❌ 失败: {error_count} 个文件")
     print(f"   ⏭️  跳过: {skipped_count} 个文件")
+    print(f"   ♻️  未变化: {unchanged_count} 个文件")
+    print(f"   📇 章节清单: {public_mindmaps_dir / CHAPTER_MANIFEST_FILENAME}（{chapter_count} 个章节）")
+    print(f"   🔎 搜索索引: {public_mindmaps_dir / SEARCH_INDEX_FILENAME}（{search_info['terms']} 个词，"
+          f"重新切词 {search_info['reindexed']} 个章节）")
     print(f"   📂 输出目录: {public_mindmaps_dir.absolute()}")
+    
+    if args.compact or args.size_report:
+        print("-" * 60)
+        report_sizes(output_paths, args.size_report)
 
 
 if __name__ == "__main__":
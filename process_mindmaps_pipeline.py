@@ -6,10 +6,17 @@
 并输出到 public/mindmaps/ 目录
 """
 
-import json
+import argparse
+import contextlib
+import functools
+import io
 import os
 import re
 import sys
+import tempfile
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 
 # 添加 scripts 目录到路径，以便导入升级脚本
@@ -26,38 +33,6 @@ except ImportError:
         text = re.sub(r'[-\s]+', '-', text)
         return text.lower().strip('-')
 
-# PDF 文件名到章节编号的映射（支持带空格的文件名）
-PDF_TO_CHAPTER = {
-    'cell.pdf': '1',
-    ' cell.pdf': '1',  # 带前导空格
-    'biomolecule.pdf': '2',
-    'enzyme.pdf': '3',
-    'membrane structure and transport.pdf': '4',
-    'mitosis.pdf': '5',
-    'Nucleic acids and protein synthesis.pdf': '6',
-    'Transport in Plant.pdf': '7',
-    'Transport in mammal.pdf': '8',
-    'Gas exchange system.pdf': '9',
-    ' Gas exchange system.pdf': '9',  # 带前导空格
-    'infectious disease.pdf': '10',
-    'Immunity.pdf': '11',
-}
-
-# 章节编号到输出文件名的映射
-CHAPTER_TO_FILENAME = {
-    '1': '1_Cell_structure.json',
-    '2': '2_Biological_molecules.json',
-    '3': '3_Enzymes.json',
-    '4': '4_Cell_membranes_and_transport.json',
-    '5': '5_The_mitotic_cell_cycle.json',
-    '6': '6_Nucleic_acids_and_protein_synthesis.json',
-    '7': '7_Transport_of_Plant.json',
-    '8': '8_Transport_in_mammals.json',
-    '9': '9_Gas_exchange.json',
-    '10': '10_Infectious_diseases.json',
-    '11': '11_Immunity.json',
-}
-
 try:
     import pdfplumber
 except ImportError:
@@ -65,83 +40,55 @@ except ImportError:
     print("请运行: pip install pdfplumber")
     sys.exit(1)
 
+from pdf_line_extractor import extract_lines, extractor_version, open_line_stream
+from line_grouping import DEFAULT_Y_TOLERANCE
+from indent_columns import DEFAULT_COLUMN_GAP, IndentColumns
+from line_cache import LineCache
+from pdf_engines import DEFAULT_ENGINE, ENGINES
+from build_manifest import MANIFEST_FILENAME, BuildManifest, code_fingerprint
+from chapter_manifest import CHAPTER_MANIFEST_FILENAME, update_chapter_manifest
+from chapters import CHAPTER_TO_FILENAME, PDF_TO_CHAPTER
+from id_allocator import IdAllocator
+import node_store
+from node_store import NodeStore
+from output_encoding import precompressed_up_to_date, remove_precompressed, report_sizes, write_precompressed
+from search_index import SEARCH_INDEX_FILENAME, update_search_index
+import shard_output
+from shard_output import DEFAULT_SHARD_BYTES, DEFAULT_SKELETON_DEPTH, remove_shards, shards_up_to_date, write_shards
+import tree_layout
+from tree_layout import layout_up_to_date, remove_layout, write_layout
+from tree_walk import walk_subtree
+from stable_check import check_stable
+from stage_profiler import FileProfile, build_report, dump_cprofile, print_summary, profile_stage, write_report
 
-def extract_text_from_pdf(pdf_path):
-    """从 PDF 中提取文本，保留缩进信息"""
-    lines_with_position = []
-    
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            chars = page.chars
-            
-            if not chars:
-                text = page.extract_text()
-                if text:
-                    page_lines = text.split('\n')
-                    for line in page_lines:
-                        lines_with_position.append((0, line))
-                continue
-            
-            y_groups = {}
-            for char in chars:
-                y_key = round(char['y0'], 1)
-                if y_key not in y_groups:
-                    y_groups[y_key] = []
-                y_groups[y_key].append(char)
-            
-            for y_key in sorted(y_groups.keys(), reverse=True):
-                chars_in_line = sorted(y_groups[y_key], key=lambda c: c['x0'])
-                
-                if not chars_in_line:
-                    continue
-                
-                first_char_x = chars_in_line[0]['x0']
-                line_text = ''.join([char['text'] for char in chars_in_line])
-                
-                if line_text.strip():
-                    lines_with_position.append((first_char_x, line_text))
+# 提取 / 解析行为变化（而源码指纹覆盖不到）时手动递增，使已有的构建记录失效
+PIPELINE_VERSION = '1'
+
+
+def extract_text_from_pdf(pdf_path, jobs=1, cache=None, y_tolerance=DEFAULT_Y_TOLERANCE,
+                          engine=DEFAULT_ENGINE, stats=None):
+    """
+    从 PDF 中提取文本，保留缩进信息
     
-    return lines_with_position
+    jobs > 1 时按页并行提取，cache 为 LineCache 时复用磁盘缓存，
+    y_tolerance 为同一行字符基线的最大差值（pt），engine 为提取引擎名，
+    stats 为 dict 时累加 pages / lines / chars 计数
+    """
+    return extract_lines(pdf_path, jobs=jobs, cache=cache, y_tolerance=y_tolerance, engine=engine,
+                         stats=stats)
 
 
 def calculate_indent_level(x_pos, x_positions):
-    """根据 x 坐标计算缩进级别"""
-    if not x_positions:
-        return 0
-    
-    unique_x = sorted(set(x_positions))
-    
-    if x_pos in unique_x:
-        return unique_x.index(x_pos)
-    
-    closest_x = min(unique_x, key=lambda x: abs(x - x_pos))
-    
-    if abs(x_pos - closest_x) > 10:
-        insert_pos = 0
-        for i, x in enumerate(unique_x):
-            if x_pos > x:
-                insert_pos = i + 1
-            else:
-                break
-        return insert_pos
-    
-    return unique_x.index(closest_x)
+    """根据 x 坐标计算缩进级别（单次计算；解析整份文档时请复用 IndentColumns）"""
+    return IndentColumns(x_positions).level(x_pos)
 
 
-def parse_hierarchy(lines_with_position):
-    """解析层级关系，构建树形结构"""
-    if not lines_with_position:
-        return []
-    
-    x_positions = [x for x, _ in lines_with_position if x > 0]
-    nodes = []
-    root_nodes = []
-    root_index = 0
-    
+def _outline_entries(lines_with_position, indent_model):
+    """清洗文本行，产出 (缩进级别, 内容)；去掉项目符号后为空的行跳过"""
     for x_pos, line_text in lines_with_position:
-        indent_level = calculate_indent_level(x_pos, x_positions)
-        content = line_text.strip()
+        indent_level = indent_model.level(x_pos)
         
+        content = line_text.strip()
         if not content:
             continue
         
@@ -151,140 +98,203 @@ def parse_hierarchy(lines_with_position):
         if not content:
             continue
         
-        while nodes and nodes[-1]["level"] >= indent_level:
-            nodes.pop()
-        
-        if not nodes:
-            node_id = f"root_{root_index}"
-            root_index += 1
-        else:
-            parent = nodes[-1]["node"]
-            parent_id = parent.get("id", "")
-            child_index = len(parent.get("children", []))
-            
-            if parent_id.startswith("root_"):
-                node_id = f"{parent_id}_child_{child_index}"
-            else:
-                node_id = f"{parent_id}_child_{child_index}"
-        
-        node = {
-            "id": node_id,
-            "title": content,
-            "children": []
-        }
-        
-        if not nodes:
-            root_nodes.append(node)
-            nodes.append({"level": indent_level, "node": node})
-        else:
-            parent = nodes[-1]["node"]
-            parent["children"].append(node)
-            nodes.append({"level": indent_level, "node": node})
-    
-    return root_nodes
+        yield indent_level, content
 
 
-def upgrade_to_mindmap_format(data, level=0, parent_side=None, parent_id=None, index=0, siblings_count=1, used_ids=None):
-    """将 title 格式升级为 label 格式（添加 id, label, side）"""
-    if used_ids is None:
-        used_ids = set()
+def parse_hierarchy_store(lines_with_position, indent_model=None, column_gap=DEFAULT_COLUMN_GAP):
+    """
+    解析层级关系，构建 NodeStore（紧凑的先序数组树，见 node_store.py）
     
-    # 如果已经是新格式（有 label），直接返回
-    if isinstance(data, dict) and 'label' in data:
-        return data
+    indent_model 为预先建好的 IndentColumns，此时 lines_with_position 可以是迭代器，
+    边读取边建树（流式解析）；默认根据全部行的 x 坐标建模，
+    相邻 x 坐标之差不超过 column_gap 的归为同一缩进列
+    """
+    if indent_model is None:
+        lines_with_position = list(lines_with_position)
+        if not lines_with_position:
+            return NodeStore()
+        indent_model = IndentColumns.from_lines(lines_with_position, column_gap)
     
-    # 旧格式（有 title），需要转换
-    if isinstance(data, dict) and 'title' in data:
-        title = data.get('title', '')
+    return NodeStore.from_outline(_outline_entries(lines_with_position, indent_model))
+
+
+def parse_hierarchy(lines_with_position, indent_model=None, column_gap=DEFAULT_COLUMN_GAP):
+    """解析层级关系，构建 [{id, title, children}, ...] 树形结构（参数同 parse_hierarchy_store）"""
+    return parse_hierarchy_store(lines_with_position, indent_model, column_gap).to_title_dicts()
+
+
+def _upgrade_format_enter(used_ids):
+    """
+    upgrade_to_mindmap_format 的先序钩子（tree_walk），used_ids 为整棵树共享的 IdAllocator
+    
+    上下文为 (所在层级, 父节点 side, 父节点 id, 输出列表)：
+    每个节点把升级结果追加到父节点的输出列表，再把自己的输出 children 交给子节点
+    """
+    def enter(data, context, index, siblings_count):
+        level, parent_side, parent_id, output = context
         
-        # 生成 ID
-        node_id = data.get('id')
-        if not node_id:
-            base_id = slugify(title)
-            if not base_id:
-                base_id = f'node-{level}-{index}'
-            
-            candidate_ids = []
-            if parent_id:
-                candidate_ids.append(f"{parent_id}-{base_id}")
-            candidate_ids.append(base_id)
-            
-            node_id = None
-            for candidate in candidate_ids:
-                if candidate not in used_ids:
-                    node_id = candidate
-                    break
+        # 如果已经是新格式（有 label），原样保留
+        if isinstance(data, dict) and 'label' in data:
+            output.append(data)
+            return None, None
+        
+        # 旧格式（有 title），需要转换
+        if isinstance(data, dict) and 'title' in data:
+            title = data.get('title', '')
             
+            # 生成 ID
+            node_id = data.get('id')
             if not node_id:
-                original_id = candidate_ids[0]
-                suffix = 1
-                while node_id is None or node_id in used_ids:
-                    node_id = f"{original_id}-{suffix}"
-                    suffix += 1
+                base_id = slugify(title)
+                if not base_id:
+                    base_id = f'node-{level}-{index}'
+                
+                if parent_id:
+                    node_id = used_ids.allocate(f"{parent_id}-{base_id}", base_id)
+                else:
+                    node_id = used_ids.allocate(base_id)
             
-            used_ids.add(node_id)
-        
-        # 分配 side
-        side = data.get('side')
-        if not side:
-            if level == 0:
-                side = 'center'
-            elif parent_side == 'center':
-                # 一级节点：平分左右
-                side = 'left' if index < siblings_count / 2 else 'right'
-            else:
-                # 继承父节点方向
-                side = parent_side
+            # 分配 side
+            side = data.get('side')
+            if not side:
+                if level == 0:
+                    side = 'center'
+                elif parent_side == 'center':
+                    # 一级节点：平分左右
+                    side = 'left' if index < siblings_count / 2 else 'right'
+                else:
+                    # 继承父节点方向
+                    side = parent_side
+            
+            children = []
+            output.append({
+                "id": node_id,
+                "label": title,
+                "side": side,
+                "children": children
+            })
+            return (level + 1, side, node_id, children), data.get('children')
         
-        # 处理子节点
-        children = []
-        child_siblings_count = len(data.get('children', []))
-        for child_index, child in enumerate(data.get('children', [])):
-            upgraded_child = upgrade_to_mindmap_format(
-                child, 
-                level + 1, 
-                side, 
-                node_id, 
-                child_index, 
-                child_siblings_count,
-                used_ids
-            )
-            children.append(upgraded_child)
+        # 列表：元素与列表本身处于同一层级
+        if isinstance(data, list):
+            items = []
+            output.append(items)
+            return (level, parent_side, parent_id, items), data
         
-        return {
-            "id": node_id,
-            "label": title,
-            "side": side,
-            "children": children
-        }
+        output.append(data)
+        return None, None
     
-    # 如果是列表，递归处理
-    if isinstance(data, list):
-        return [upgrade_to_mindmap_format(item, level, parent_side, parent_id, idx, len(data), used_ids) 
-                for idx, item in enumerate(data)]
+    return enter
+
+
+def upgrade_to_mindmap_format(data, level=0, parent_side=None, parent_id=None, index=0, siblings_count=1, used_ids=None):
+    """将 title 格式升级为 label 格式（添加 id, label, side）；显式栈遍历，不受递归深度限制"""
+    if used_ids is None:
+        used_ids = IdAllocator()
     
-    return data
+    output = []
+    walk_subtree(data, _upgrade_format_enter(used_ids), context=(level, parent_side, parent_id, output),
+                 index=index, count=siblings_count)
+    return output[0]
 
 
-def process_pdf_file(pdf_path, output_path):
-    """处理单个 PDF 文件"""
+def process_pdf_file(pdf_path, output_path, extract_options=None, parse_options=None, stream_options=None,
+                     profile=None, compact=False, shard_options=None, layout=False):
+    """
+    处理单个 PDF 文件
+    
+    extract_options / parse_options 分别为传给 extract_text_from_pdf / parse_hierarchy_store 的参数；
+    stream_options 不为 None 时改为流式提取 + 解析（参数传给 open_line_stream，不使用提取缓存）；
+    profile 为 FileProfile 时记录每个阶段的耗时、内存和计数；
+    compact 为 True 时写出无缩进的 JSON 和 .gz / .br 预压缩文件（output_encoding.py）；
+    shard_options 不为 None 时另外生成分片目录（参数传给 shard_output.write_shards）；
+    layout 为 True 时另外写出预计算的布局文件 X.layout.json（tree_layout.py）
+    """
     try:
-        print(f"  📄 提取 PDF 文本...")
-        lines_with_position = extract_text_from_pdf(pdf_path)
-        print(f"  ✅ 提取了 {len(lines_with_position)} 行文本")
+        extract_options = extract_options or {}
+        parse_options = parse_options or {}
+        stats = {} if profile is not None else None
         
-        print(f"  🔄 解析层级关系...")
-        root_nodes = parse_hierarchy(lines_with_position)
-        print(f"  ✅ 解析完成，找到 {len(root_nodes)} 个根节点")
+        if stream_options is not None:
+            print(f"  📄 流式提取 PDF 文本并解析层级关系...")
+            with profile_stage(profile, 'calibrate') as counters:
+                indent_model, lines = open_line_stream(
+                    pdf_path,
+                    column_gap=parse_options.get('column_gap', DEFAULT_COLUMN_GAP),
+                    y_tolerance=extract_options.get('y_tolerance', DEFAULT_Y_TOLERANCE),
+                    engine=extract_options.get('engine', DEFAULT_ENGINE),
+                    stats=stats,
+                    **stream_options
+                )
+                counters['indent_columns'] = len(indent_model.columns)
+            with profile_stage(profile, 'stream') as counters:
+                store = parse_hierarchy_store(lines, indent_model=indent_model)
+                if profile is not None:
+                    counters.update(stats)
+                    counters['indent_lookups'] = indent_model.lookups
+                    counters['nodes'] = len(store)
+            # 每一行都会查询一次缩进级别，查询次数即行数
+            print(f"  ✅ 提取了 {indent_model.lookups} 行文本")
+            print(f"  ✅ 解析完成，找到 {len(store.roots())} 个根节点")
+        else:
+            print(f"  📄 提取 PDF 文本...")
+            with profile_stage(profile, 'extract') as counters:
+                lines_with_position = extract_text_from_pdf(pdf_path, stats=stats, **extract_options)
+                if profile is not None:
+                    counters.update(stats)
+            print(f"  ✅ 提取了 {len(lines_with_position)} 行文本")
+            
+            print(f"  🔄 解析层级关系...")
+            with profile_stage(profile, 'parse') as counters:
+                if profile is None:
+                    store = parse_hierarchy_store(lines_with_position, **parse_options)
+                else:
+                    # 剖析时在外面建模，以便统计缩进级别的查询次数
+                    indent_model = IndentColumns.from_lines(
+                        lines_with_position, parse_options.get('column_gap', DEFAULT_COLUMN_GAP))
+                    store = parse_hierarchy_store(lines_with_position, indent_model=indent_model)
+                    counters['indent_lookups'] = indent_model.lookups
+                    counters['nodes'] = len(store)
+            print(f"  ✅ 解析完成，找到 {len(store.roots())} 个根节点")
         
+        # 解析器已为每个节点分配 ID，升级只需分配 side（结果与 upgrade_to_mindmap_format 相同）
         print(f"  🔄 升级为思维导图格式...")
-        upgraded_data = upgrade_to_mindmap_format(root_nodes)
+        with profile_stage(profile, 'upgrade') as counters:
+            store.assign_sides()
+            if profile is not None:
+                counters['nodes'] = store.node_count()
+                counters['id_collisions'] = store.count_duplicate_ids()
         print(f"  ✅ 格式升级完成")
         
-        # 写入输出文件
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(upgraded_data, f, ensure_ascii=False, indent=2)
+        # 写入输出文件（JSON 在这里才由 NodeStore 逐节点写出）
+        with profile_stage(profile, 'save') as counters:
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            with open(output_path, 'w', encoding='utf-8') as f:
+                store.write_json(f, compact=compact)
+            counters['bytes'] = os.path.getsize(output_path)
+        if compact:
+            with profile_stage(profile, 'compress') as counters:
+                sizes = write_precompressed(output_path)
+                counters['gzip_bytes'] = sizes['gzip']
+                counters['brotli_bytes'] = sizes['brotli']
+        else:
+            # 以前 --compact 生成的预压缩文件已与新的 JSON 不一致
+            remove_precompressed(output_path)
+        if shard_options is not None:
+            with profile_stage(profile, 'shard') as counters:
+                shard_info = write_shards(store, output_path, compress=compact, **shard_options)
+                counters.update(shard_info)
+            print(f"  🧩 分片完成: 骨架 {shard_info['skeleton_bytes']} 字节，{shard_info['branches']} 个分支、"
+                  f"{shard_info['shards']} 个分片（最大 {shard_info['largest_shard']} 字节）")
+        else:
+            remove_shards(output_path)
+        if layout:
+            with profile_stage(profile, 'layout') as counters:
+                layout_info = write_layout(store, output_path, compress=compact)
+                counters.update(layout_info)
+            print(f"  📐 布局完成: {layout_info['nodes']} 个节点，画布 {layout_info['width']} x {layout_info['height']}")
+        else:
+            remove_layout(output_path)
         
         return True, None
     except Exception as e:
@@ -292,10 +302,168 @@ def process_pdf_file(pdf_path, output_path):
         return False, f"{str(e)}\n{traceback.format_exc()}"
 
 
-def main():
+def resolve_output_filename(filename):
+    """根据 PDF 文件名查找章节和输出文件名，返回 (chapter, output_filename, 跳过原因)"""
+    # 查找对应的章节编号（处理文件名中的空格）
+    chapter = None
+    filename_normalized = filename.strip()  # 去除前后空格
+    for pdf_name, chapter_num in PDF_TO_CHAPTER.items():
+        pdf_name_normalized = pdf_name.strip()
+        if filename_normalized.lower() == pdf_name_normalized.lower():
+            chapter = chapter_num
+            break
+    
+    if not chapter:
+        return None, None, "未找到对应的章节映射"
+    
+    # 获取输出文件名
+    output_filename = CHAPTER_TO_FILENAME.get(chapter)
+    if not output_filename:
+        return chapter, None, "未找到对应的输出文件名"
+    
+    return chapter, output_filename, None
+
+
+def _process_pdf_job(pdf_path, output_path, extract_options=None, parse_options=None, stream_options=None,
+                     profiling=False, compact=False, shard_options=None, layout=False):
+    """
+    进程池 worker：捕获处理日志，交给父进程按顺序打印
+    
+    worker 中的缓存对象是副本，页面缓存命中数随结果一起返回给父进程汇总；
+    profiling 为 True 时在 worker 中剖析，剖析结果（dict）同样随结果返回
+    """
+    profile = FileProfile(pdf_path) if profiling else None
+    buffer = io.StringIO()
+    with contextlib.redirect_stdout(buffer):
+        success, error = process_pdf_file(pdf_path, output_path, extract_options, parse_options, stream_options,
+                                          profile, compact, shard_options, layout)
+    cache = (extract_options or {}).get('cache')
+    cache_stats = (cache.page_hits, cache.page_misses) if cache is not None else (0, 0)
+    return success, error, buffer.getvalue(), cache_stats, profile.to_dict() if profile else None
+
+
+def run_jobs_in_pool(tasks, max_workers):
+    """
+    将 (pdf_path, output_path[, extract_options, parse_options, stream_options, profiling, compact, shard_options, layout]) 任务分发到进程池，
+    按提交顺序返回 [(success, error, log, (页面缓存命中数, 未命中数), 剖析结果或 None), ...]
+    
+    worker 进程崩溃会让整个进程池失效（BrokenProcessPool），
+    受牵连的任务会逐个放到独立进程中重跑，只有真正崩溃的章节记为失败
+    """
+    results = [None] * len(tasks)
+    crashed = []
+    
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = [pool.submit(_process_pdf_job, *task) for task in tasks]
+        for i, future in enumerate(futures):
+            try:
+                results[i] = future.result()
+            except BrokenProcessPool:
+                crashed.append(i)
+            except Exception as e:
+                results[i] = (False, f"{type(e).__name__}: {e}", '', (0, 0), None)
+    
+    for i in crashed:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            try:
+                results[i] = pool.submit(_process_pdf_job, *tasks[i]).result()
+            except BrokenProcessPool as e:
+                results[i] = (False, f"worker 进程异常退出: {e}", '', (0, 0), None)
+    
+    return results
+
+
+def profile_slowest_file(pdf_path, pstats_path, extract_options, parse_options, stream_options,
+                         compact=False, shard_options=None, layout=False):
+    """
+    在 cProfile 下重跑指定文件：不使用提取缓存，输出写到临时目录，日志不打印；
+    compact / shard_options / layout 与正式运行相同，cProfile 结果包含 --profile 统计的全部阶段
+    """
+    # 剖析阶段已经结束，关闭 tracemalloc，避免它的开销混进 cProfile 结果
+    tracemalloc.stop()
+    extract_options = dict(extract_options, cache=None, jobs=1)
+    with tempfile.TemporaryDirectory() as tmp:
+        output_path = Path(tmp) / 'profile.json'
+        with contextlib.redirect_stdout(io.StringIO()):
+            dump_cprofile(pstats_path, process_pdf_file, pdf_path, output_path,
+                          extract_options, parse_options, stream_options,
+                          compact=compact, shard_options=shard_options, layout=layout)
+    print(f"📈 最慢文件的 cProfile 结果已保存: {pstats_path}（python -m pstats {pstats_path} 查看）")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='处理 mindmap_raw/ 下的 PDF，输出思维导图 JSON 到 public/mindmaps/')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='并行处理的进程数（默认 1 为串行，0 表示使用全部 CPU 核心）')
+    parser.add_argument('--page-jobs', type=int, default=1,
+                        help='单个 PDF 内按页并行提取的进程数（默认 1，适合页数很多的章节）')
+    parser.add_argument('--force', action='store_true',
+                        help='忽略构建清单，重新生成所有章节')
+    parser.add_argument('--output-dir', default='public/mindmaps',
+                        help='输出目录（默认 public/mindmaps）')
+    parser.add_argument('--compact', action='store_true',
+                        help='写出无缩进的 JSON，并生成最高压缩级别的 .json.gz / .json.br 预压缩文件'
+                             '（.br 需要 pip install brotli），结束时打印体积报告')
+    parser.add_argument('--size-report', metavar='JSON',
+                        help='结束时打印每个章节 pretty / minified / gzip / brotli 的字节数，并保存为 JSON')
+    parser.add_argument('--shard', action='store_true',
+                        help='另外生成分片目录 X.shards/：前几层的骨架 + 按需加载的分支分片 + 节点到分片的 manifest.json')
+    parser.add_argument('--skeleton-depth', type=int, default=DEFAULT_SKELETON_DEPTH,
+                        help=f'--shard 骨架包含的层数（默认 {DEFAULT_SKELETON_DEPTH}）')
+    parser.add_argument('--shard-bytes', type=int, default=DEFAULT_SHARD_BYTES,
+                        help=f'--shard 单个分片的目标字节数（默认 {DEFAULT_SHARD_BYTES}）')
+    parser.add_argument('--layout', action='store_true',
+                        help='另外写出预计算的布局文件 X.layout.json（节点坐标、尺寸和子树范围），客户端无需再做布局')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='不使用提取结果缓存（.cache/mindmap_lines），总是重新解析 PDF')
+    parser.add_argument('--y-tolerance', type=float, default=DEFAULT_Y_TOLERANCE,
+                        help=f'同一行字符基线的最大差值，单位 pt（默认 {DEFAULT_Y_TOLERANCE}）')
+    parser.add_argument('--engine', choices=list(ENGINES), default=DEFAULT_ENGINE,
+                        help='提取引擎：pdfplumber（默认）、pdfminer（直接读取字形坐标，结果相同、更快）、'
+                             'pdfium（需要 pypdfium2，最快，坐标略有差异）')
+    parser.add_argument('--column-gap', type=float, default=DEFAULT_COLUMN_GAP,
+                        help='相邻行首 x 坐标之差不超过该值时视为同一缩进列，单位 pt（默认 0，不合并）')
+    parser.add_argument('--stream', action='store_true',
+                        help='流式提取：逐页产出文本行并边读边建树，降低内存峰值（不使用提取缓存）')
+    parser.add_argument('--calibration', choices=['two-pass', 'sample'], default='two-pass',
+                        help='流式模式下缩进列的标定方式：two-pass 先扫描一遍 x 坐标（结果与非流式一致），'
+                             'sample 只用前几页标定（PDF 只解析一遍）')
+    parser.add_argument('--sample-pages', type=int, default=3,
+                        help='sample 标定使用的页数（默认 3）')
+    parser.add_argument('--profile', nargs='?', const='mindmap_profile.json', metavar='JSON',
+                        help='记录每个文件各阶段的耗时、CPU 时间、峰值内存和计数，写入 JSON 报告'
+                             '（默认 mindmap_profile.json；tracemalloc 会让运行变慢）')
+    parser.add_argument('--pstats', metavar='FILE',
+                        help='处理完成后在 cProfile 下重跑最慢的文件（不使用缓存、不写输出目录），'
+                             '结果保存为 pstats 文件（同时开启 --profile）')
+    parser.add_argument('--check-stable', action='store_true',
+                        help='不更新输出目录，而是用不同的哈希种子在新进程中完整构建两次，'
+                             '确认输出逐字节一致（不一致时退出码为 1）')
+    args = parser.parse_args(argv)
+    if args.check_stable and (args.profile is not None or args.pstats):
+        parser.error('--check-stable 不能与 --profile / --pstats 同时使用')
+    if args.skeleton_depth < 1 or args.shard_bytes < 1:
+        parser.error('--skeleton-depth 和 --shard-bytes 必须为正数')
+    return args
+
+
+def _build_into(argv, output_dir):
+    """--check-stable 的一次构建：按原参数把所有章节重新生成到 output_dir"""
+    main(argv + ['--force', '--output-dir', str(output_dir)])
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    
+    if args.check_stable:
+        child_argv = [arg for arg in (sys.argv[1:] if argv is None else argv) if arg != '--check-stable']
+        stable = check_stable(functools.partial(_build_into, child_argv), ignore=(MANIFEST_FILENAME,))
+        sys.exit(0 if stable else 1)
+    
     # 配置路径
     mindmap_raw_dir = Path('mindmap_raw')
-    public_mindmaps_dir = Path('public/mindmaps')
+    public_mindmaps_dir = Path(args.output_dir)
     
     # 创建输出目录
     public_mindmaps_dir.mkdir(parents=True, exist_ok=True)
@@ -309,45 +477,102 @@ def main():
     
     print(f"📁 找到 {len(pdf_files)} 个 PDF 文件")
     print(f"📂 输出目录: {public_mindmaps_dir}")
+    if jobs > 1:
+        print(f"⚙️  并行进程数: {jobs}")
     print("-" * 60)
     
     success_count = 0
     error_count = 0
     skipped_count = 0
+    unchanged_count = 0
     
-    # 处理每个文件
+    manifest = BuildManifest(
+        public_mindmaps_dir,
+        pipeline='process_mindmaps_pipeline',
+        pipeline_version=PIPELINE_VERSION,
+        # 源码指纹（node_store 为整个模块：写 JSON 还依赖模块级的 _close_nodes、_PARSER_ID）+ 提取器版本
+        # + 影响输出的参数，任一变化都会重新生成
+        code_hash=(code_fingerprint(IndentColumns, _outline_entries, parse_hierarchy_store, node_store)
+                   + f"-{extractor_version(args.y_tolerance, args.engine)}-gap{args.column_gap:g}"
+                   # 抽样标定的结果可能与完整标定不同
+                   + (f"-sample{args.sample_pages}" if args.stream and args.calibration == 'sample' else '')
+                   # 紧凑输出与缩进输出的内容不同，切换模式时重新生成
+                   + ('-compact' if args.compact else '')
+                   # 分片参数或分片代码（shard_output.py 整个模块的源码，含 SHARD_FORMAT）变化时重新生成分片
+                   + (f"-shard{args.skeleton_depth}x{args.shard_bytes}-{code_fingerprint(shard_output)}" if args.shard else '')
+                   # 布局算法或字体度量表（tree_layout.py 整个模块的源码）变化时重新生成布局
+                   + (f"-layout{code_fingerprint(tree_layout)}" if args.layout else ''))
+    )
+    
+    # 先确定每个文件的输出位置（无法映射的文件记为跳过，未变化的文件直接沿用）
+    plan = []
     for pdf_file in sorted(pdf_files):
+        chapter, output_filename, skip_reason = resolve_output_filename(pdf_file.name)
+        output_path = public_mindmaps_dir / output_filename if output_filename else None
+        unchanged = (not skip_reason and not args.force and
+                     manifest.is_up_to_date(pdf_file, output_path) and
+                     (not args.compact or precompressed_up_to_date(output_path)) and
+                     (not args.shard or shards_up_to_date(output_path, args.compact)) and
+                     (not args.layout or layout_up_to_date(output_path, args.compact)))
+        plan.append((pdf_file, output_path, chapter, skip_reason, unchanged))
+    
+    cache = None if args.no_cache or args.stream else LineCache()
+    extract_options = {'jobs': args.page_jobs, 'cache': cache, 'y_tolerance': args.y_tolerance,
+                       'engine': args.engine}
+    parse_options = {'column_gap': args.column_gap}
+    stream_options = ({'calibration': args.calibration, 'sample_pages': args.sample_pages}
+                      if args.stream else None)
+    shard_options = ({'skeleton_depth': args.skeleton_depth, 'shard_bytes': args.shard_bytes}
+                     if args.shard else None)
+    if args.pstats and args.profile is None:
+        args.profile = 'mindmap_profile.json'
+    profiling = args.profile is not None
+    profiles = []
+    tasks = [(pdf_file, output_path, extract_options, parse_options, stream_options, profiling, args.compact,
+              shard_options, args.layout)
+             for pdf_file, output_path, _, skip_reason, unchanged in plan
+             if not skip_reason and not unchanged]
+    
+    # 并行模式：先在进程池中处理全部文件，再按文件名顺序输出日志和结果
+    results = {}
+    if jobs > 1 and len(tasks) > 1:
+        for task, result in zip(tasks, run_jobs_in_pool(tasks, min(jobs, len(tasks)))):
+            results[task[0]] = result
+    
+    # 处理每个文件
+    for pdf_file, output_path, chapter, skip_reason, unchanged in plan:
         filename = pdf_file.name
         
-        # 查找对应的章节编号（处理文件名中的空格）
-        chapter = None
-        filename_normalized = filename.strip()  # 去除前后空格
-        for pdf_name, chapter_num in PDF_TO_CHAPTER.items():
-            pdf_name_normalized = pdf_name.strip()
-            if filename_normalized.lower() == pdf_name_normalized.lower():
-                chapter = chapter_num
-                break
-        
-        if not chapter:
-            print(f"⏭️  跳过: {filename} (未找到对应的章节映射)")
+        if skip_reason:
+            print(f"⏭️  跳过: {filename} ({skip_reason})")
             skipped_count += 1
             continue
         
-        # 获取输出文件名
-        output_filename = CHAPTER_TO_FILENAME.get(chapter)
-        if not output_filename:
-            print(f"⏭️  跳过: {filename} (未找到对应的输出文件名)")
-            skipped_count += 1
+        if unchanged:
+            print(f"♻️  未变化: {filename} -> {output_path.name}")
+            unchanged_count += 1
             continue
         
-        output_path = public_mindmaps_dir / output_filename
-        
-        print(f"🔄 处理: {filename} -> {output_filename}")
+        print(f"🔄 处理: {filename} -> {output_path.name}")
         print(f"   章节: {chapter}")
         
-        success, error = process_pdf_file(pdf_file, output_path)
+        if pdf_file in results:
+            success, error, log, (page_hits, page_misses), file_profile = results[pdf_file]
+            print(log, end='')
+            if cache is not None:
+                cache.page_hits += page_hits
+                cache.page_misses += page_misses
+        else:
+            profile = FileProfile(pdf_file) if profiling else None
+            success, error = process_pdf_file(pdf_file, output_path, extract_options, parse_options,
+                                              stream_options, profile, args.compact, shard_options,
+                                              args.layout)
+            file_profile = profile.to_dict() if profile else None
+        if file_profile is not None:
+            profiles.append(file_profile)
         
         if success:
+            manifest.record(pdf_file, output_path)
             print(f"✅ 成功: {output_path}")
             success_count += 1
         else:
@@ -356,12 +581,37 @@ def main():
             error_count += 1
         print()
     
+    manifest.save()
+    chapter_count = update_chapter_manifest(public_mindmaps_dir)
+    search_info = update_search_index(public_mindmaps_dir)
+    
     print("-" * 60)
     print(f"📊 处理完成:")
     print(f"   ✅ 成功: {success_count} 个文件")
     print(f"   ❌ 失败: {error_count} 个文件")
     print(f"   ⏭️  跳过: {skipped_count} 个文件")
+    print(f"   ♻️  未变化: {unchanged_count} 个文件")
+    if cache is not None:
+        print(f"   📦 页面缓存命中: {cache.hit_ratio_text()}")
+    print(f"   📇 章节清单: {public_mindmaps_dir / CHAPTER_MANIFEST_FILENAME}（{chapter_count} 个章节）")
+    print(f"   🔎 搜索索引: {public_mindmaps_dir / SEARCH_INDEX_FILENAME}（{search_info['terms']} 个词，"
+          f"重新切词 {search_info['reindexed']} 个章节）")
     print(f"   📂 输出目录: {public_mindmaps_dir.absolute()}")
+    
+    if args.compact or args.size_report:
+        print("-" * 60)
+        report_sizes([output_path for _, output_path, _, skip_reason, _ in plan if not skip_reason],
+                     args.size_report)
+    
+    if profiling and profiles:
+        print("-" * 60)
+        report = build_report(profiles, argv if argv is not None else sys.argv[1:])
+        write_report(args.profile, report)
+        print_summary(report)
+        print(f"📈 剖析报告已保存: {args.profile}")
+        if args.pstats:
+            profile_slowest_file(report['slowest'], args.pstats, extract_options, parse_options, stream_options,
+                                 args.compact, shard_options, args.layout)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+聊天机器人的本地检索：思维导图 + 考纲的 BM25 索引
+把 public/mindmaps/ 中每个章节从根到叶子的路径（"Enzymes > Factors affecting rate > temperature"）
+和 batch_convert.py 写到 output/ 的考纲 JSON 中的每个学习目标切成段落，建立 BM25 倒排索引。
+
+索引目录（默认 retrieval_index/）：
+- postings.bin: 按词排列的 (文档号, 词频) uint32 对，查询时 mmap，只读取查询词对应的片段
+- docs.jsonl: 每行一个段落 {"source", "chapter", "file", "id", "text"}；doc_offsets.bin 为每行的起始字节（uint64），
+  doc_lengths.bin 为每个段落的词数（uint32），都通过 mmap 按文档号随机访问，不需要加载整个语料
+- meta.json: 词典（词 → [postings 中的起始对序号, 文档频率]）、文档数、平均长度、k1 / b，以及每个源文件的
+  SHA-256 和文档号范围
+
+增量更新：源文件（一个章节或一个考纲文件）的 SHA-256 与 meta.json 中记录的相同时，直接沿用旧索引中的段落、
+长度和倒排（只平移文档号），只有变化的源文件需要读取和切词；--force 时全部重建。同样的输入总是得到同样的索引
+
+用法:
+    python scripts/bm25_index.py [--mindmaps-dir public/mindmaps] [--syllabus-dir output] [--index-dir retrieval_index]
+    python scripts/bm25_index.py --query "how does temperature affect enzyme activity" [--top-k 5] [--json]
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
+import shutil
+import sys
+import time
+from array import array
+from collections import Counter
+from pathlib import Path
+
+from build_manifest import sha256_file
+from chapters import CHAPTERS, sorted_chapters
+from search_index import tokenize as split_words
+
+BM25_FORMAT = 2
+DEFAULT_INDEX_DIR = 'retrieval_index'
+DEFAULT_K1 = 1.2
+DEFAULT_B = 0.75
+
+META_FILENAME = 'meta.json'
+POSTINGS_FILENAME = 'postings.bin'
+DOCS_FILENAME = 'docs.jsonl'
+DOC_OFFSETS_FILENAME = 'doc_offsets.bin'
+DOC_LENGTHS_FILENAME = 'doc_lengths.bin'
+
+# 不参与检索的高频英文虚词
+STOPWORDS = frozenset(
+    'a an and are as at be been but by can do does for from has have how in into is it its '
+    'of on or that the their them then there these they this to was were what when where which '
+    'while who why will with'.split()
+)
+
+
+def _stem(word):
+    """只合并最常见的复数形式（enzymes → enzyme，arteries → artery），不做完整的词干提取"""
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    if len(word) > 3 and word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    return word
+
+
+def analyze(text):
+    """段落或查询的检索词：切词、去掉虚词、合并复数"""
+    return [_stem(word) for word in split_words(text) if word not in STOPWORDS]
+
+
+def mindmap_passages(path, chapter):
+    """章节 JSON 中每条从根到叶子的路径为一个段落，id 为叶子节点的 id（显式栈，不受递归深度限制）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    passages = []
+    stack = [(node, ()) for node in reversed(data if isinstance(data, list) else [data])]
+    while stack:
+        node, ancestors = stack.pop()
+        labels = ancestors + ((node.get('label') or node.get('title') or '').strip(),)
+        children = node.get('children') or []
+        if children:
+            stack.extend((child, labels) for child in reversed(children))
+        else:
+            passages.append({'source': 'mindmap', 'chapter': chapter, 'file': path.name,
+                             'id': node.get('id', ''), 'text': ' > '.join(label for label in labels if label)})
+    return passages
+
+
+def syllabus_passages(path):
+    """batch_convert.py 输出的考纲 JSON：每个学习目标（连同所在小节）为一个段落，id 为 "小节序号.目标序号" """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    unit = str(data.get('unit', ''))
+    heading = f"{unit} {data.get('title', '')}".strip()
+    passages = []
+    for section_index, section in enumerate(data.get('content') or [], 1):
+        items = section.get('items') or []
+        if not items:
+            passages.append({'source': 'syllabus', 'chapter': unit, 'file': path.name, 'id': str(section_index),
+                             'text': f"{heading} > {section.get('section', '')}"})
+        for item_index, item in enumerate(items, 1):
+            passages.append({'source': 'syllabus', 'chapter': unit, 'file': path.name,
+                             'id': f"{section_index}.{item_index}",
+                             'text': f"{heading} > {section.get('section', '')} > {item.get('title', '')}: "
+                                     + ' '.join(item.get('content') or [])})
+    return passages
+
+
+def collect_sources(mindmaps_dir, syllabus_dir):
+    """[(源键, 路径, 读取段落的函数), ...]：存在的章节文件按章节编号，考纲文件按文件名"""
+    sources = []
+    for chapter in sorted_chapters(CHAPTERS):
+        path = Path(mindmaps_dir) / CHAPTERS[chapter][1]
+        if path.exists():
+            sources.append((f"mindmap/{path.name}", path, lambda path=path, chapter=chapter: mindmap_passages(path, chapter)))
+    if syllabus_dir and Path(syllabus_dir).is_dir():
+        for path in sorted(Path(syllabus_dir).glob('*.json')):
+            sources.append((f"syllabus/{path.name}", path, lambda path=path: syllabus_passages(path)))
+    return sources
+
+
+def _map_file(path):
+    """只读 mmap；空文件返回空 bytes（mmap 不能映射长度为 0 的文件）"""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class Bm25Index:
+    """
+    打开索引目录：meta.json 完整加载，postings / 段落 / 偏移 / 长度通过 mmap 按需读取
+    search() 返回按分数降序的 [{'score', 'source', 'chapter', 'file', 'id', 'text'}, ...]
+    """
+    
+    def __init__(self, index_dir):
+        self.index_dir = Path(index_dir)
+        with open(self.index_dir / META_FILENAME, 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        if self.meta.get('format') != BM25_FORMAT or self.meta.get('byteorder') != sys.byteorder:
+            raise ValueError(f"{self.index_dir} 的索引格式不兼容，请用 --force 重建")
+        self.terms = self.meta['terms']
+        self.doc_count = self.meta['docs']
+        self.avgdl = self.meta['avgdl'] or 1.0
+        self._maps = [_map_file(self.index_dir / name) for name in
+                      (POSTINGS_FILENAME, DOCS_FILENAME, DOC_OFFSETS_FILENAME, DOC_LENGTHS_FILENAME)]
+        postings, self._docs, offsets, lengths = self._maps
+        self._postings = memoryview(postings).cast('I')
+        self._offsets = memoryview(offsets).cast('Q')
+        self._lengths = memoryview(lengths).cast('I')
+    
+    def close(self):
+        for view in (self._postings, self._offsets, self._lengths):
+            view.release()
+        for mapped in self._maps:
+            if isinstance(mapped, mmap.mmap):
+                mapped.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def postings(self, term):
+        """term 的 (文档号, 词频) 列表（未收录时为空）"""
+        entry = self.terms.get(term)
+        if entry is None:
+            return []
+        start, df = entry
+        flat = self._postings[2 * start:2 * (start + df)]
+        return list(zip(flat[::2].tolist(), flat[1::2].tolist()))
+    
+    def document(self, doc):
+        """按文档号读取段落记录"""
+        return json.loads(self._docs[self._offsets[doc]:self._offsets[doc + 1]])
+    
+    def search(self, query, top_k=5, k1=None, b=None):
+        k1 = self.meta['k1'] if k1 is None else k1
+        b = self.meta['b'] if b is None else b
+        # tf 归一化项 k1 * (1 - b + b * dl / avgdl) 拆成常数和按文档长度缩放的两部分
+        base = k1 * (1 - b)
+        scale = k1 * b / self.avgdl
+        lengths = self._lengths
+        scores = {}
+        for term, query_tf in Counter(analyze(query)).items():
+            pairs = self.postings(term)
+            if not pairs:
+                continue
+            weight = query_tf * (k1 + 1) * math.log(1 + (self.doc_count - len(pairs) + 0.5) / (len(pairs) + 0.5))
+            for doc, tf in pairs:
+                scores[doc] = scores.get(doc, 0.0) + weight * tf / (tf + base + scale * lengths[doc])
+        results = []
+        for doc, score in heapq.nlargest(top_k, scores.items(), key=lambda item: (item[1], -item[0])):
+            record = self.document(doc)
+            record['score'] = round(score, 4)
+            results.append(record)
+        return results
+
+
+def search(query, index_dir=DEFAULT_INDEX_DIR, top_k=5):
+    """打开索引查询一次（多次查询时请复用 Bm25Index）"""
+    with Bm25Index(index_dir) as index:
+        return index.search(query, top_k)
+
+
+def _load_previous(index_dir):
+    try:
+        return Bm25Index(index_dir)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def build_index(index_dir=DEFAULT_INDEX_DIR, mindmaps_dir='public/mindmaps', syllabus_dir='output', force=False,
+                k1=DEFAULT_K1, b=DEFAULT_B):
+    """
+    生成或增量更新索引目录，返回 {'sources', 'rebuilt', 'docs', 'terms'}。
+    新索引先写到 <index_dir>.new，完成后整体替换旧目录，查询方不会读到一半的索引
+    """
+    index_dir = Path(index_dir)
+    previous = None if force else _load_previous(index_dir)
+    previous_sources = previous.meta['sources'] if previous else {}
+    
+    records = []
+    lengths = array('I')
+    postings = {}
+    sources = {}
+    rebuilt = 0
+    # 旧文档号 → 新文档号（沿用的源文件），最后一次性搬运旧倒排
+    remap = {}
+    for key, path, read_passages in collect_sources(mindmaps_dir, syllabus_dir):
+        sha256 = sha256_file(path)
+        start = len(records)
+        old = previous_sources.get(key)
+        if old and old['sha256'] == sha256:
+            for doc in range(old['start'], old['stop']):
+                remap[doc] = len(records)
+                records.append(bytes(previous._docs[previous._offsets[doc]:previous._offsets[doc + 1]]))
+                lengths.append(previous._lengths[doc])
+        else:
+            rebuilt += 1
+            for passage in read_passages():
+                doc = len(records)
+                terms = analyze(passage['text'])
+                for term, tf in Counter(terms).items():
+                    postings.setdefault(term, []).append((doc, tf))
+                records.append((json.dumps(passage, ensure_ascii=False, sort_keys=True) + '\n').encode('utf-8'))
+                lengths.append(len(terms))
+        sources[key] = {'sha256': sha256, 'start': start, 'stop': len(records)}
+    if remap:
+        for term in previous.terms:
+            moved = [(remap[doc], tf) for doc, tf in previous.postings(term) if doc in remap]
+            if moved:
+                postings.setdefault(term, []).extend(moved)
+    if previous:
+        previous.close()
+    
+    staging = index_dir.with_name(index_dir.name + '.new')
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir(parents=True)
+    lexicon = {}
+    flat = array('I')
+    for term in sorted(postings):
+        pairs = sorted(postings[term])
+        lexicon[term] = [len(flat) // 2, len(pairs)]
+        for doc, tf in pairs:
+            flat.append(doc)
+            flat.append(tf)
+    offsets = array('Q', [0])
+    with open(staging / DOCS_FILENAME, 'wb') as f:
+        for record in records:
+            f.write(record)
+            offsets.append(offsets[-1] + len(record))
+    for name, values in ((POSTINGS_FILENAME, flat), (DOC_OFFSETS_FILENAME, offsets), (DOC_LENGTHS_FILENAME, lengths)):
+        with open(staging / name, 'wb') as f:
+            values.tofile(f)
+    meta = {
+        'format': BM25_FORMAT,
+        'byteorder': sys.byteorder,
+        'k1': k1,
+        'b': b,
+        'docs': len(records),
+        'avgdl': sum(lengths) / len(lengths) if lengths else 0.0,
+        'sources': sources,
+        'terms': lexicon,
+    }
+    with open(staging / META_FILENAME, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False, separators=(',', ':'))
+    
+    retired = index_dir.with_name(index_dir.name + '.old')
+    shutil.rmtree(retired, ignore_errors=True)
+    if index_dir.exists():
+        os.replace(index_dir, retired)
+    os.replace(staging, index_dir)
+    shutil.rmtree(retired, ignore_errors=True)
+    return {'sources': len(sources), 'rebuilt': rebuilt, 'docs': len(records), 'terms': len(lexicon)}
+
+
+def index_digest(index_dir):
+    """索引目录中所有文件内容的 SHA-256（比较增量更新与全量重建的结果）"""
+    digest = hashlib.sha256()
+    for path in sorted(Path(index_dir).iterdir()):
+        digest.update(path.name.encode('utf-8'))
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成或查询思维导图 + 考纲的 BM25 检索索引')
+    parser.add_argument('--index-dir', default=DEFAULT_INDEX_DIR, help=f'索引目录（默认 {DEFAULT_INDEX_DIR}）')
+    parser.add_argument('--mindmaps-dir', default='public/mindmaps', help='章节 JSON 目录（默认 public/mindmaps）')
+    parser.add_argument('--syllabus-dir', default='output', help='batch_convert.py 的考纲 JSON 目录（默认 output，不存在时跳过）')
+    parser.add_argument('--force', action='store_true', help='忽略已有索引，全部重新切词（默认只重建变化的源文件）')
+    parser.add_argument('--query', help='查询而不是生成索引')
+    parser.add_argument('--top-k', type=int, default=5, help='--query 返回的段落数（默认 5）')
+    parser.add_argument('--json', action='store_true', help='--query 的结果以 JSON 输出')
+    args = parser.parse_args()
+    
+    if args.query is None:
+        start = time.perf_counter()
+        info = build_index(args.index_dir, args.mindmaps_dir, args.syllabus_dir, force=args.force)
+        print(f"📚 BM25 索引已更新: {args.index_dir}（{info['sources']} 个源文件，重建 {info['rebuilt']} 个，"
+              f"{info['docs']} 个段落，{info['terms']} 个词，{time.perf_counter() - start:.2f}s）")
+        return
+    
+    with Bm25Index(args.index_dir) as index:
+        start = time.perf_counter()
+        results = index.search(args.query, args.top_k)
+        elapsed = time.perf_counter() - start
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    for result in results:
+        print(f"  [{result['score']:.2f}] {result['source']} 第 {result['chapter']} 章  {result['text']}")
+    print(f"🔎 {len(results)} 个结果，查询耗时 {elapsed * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量构建清单
+记录每个输出 JSON 对应的源文件 SHA-256、pipeline 版本、代码指纹和输出文件 SHA-256，
+源文件、代码和输出都没有变化的章节可以直接跳过
+"""
+
+import hashlib
+import inspect
+import json
+import os
+from pathlib import Path
+
+MANIFEST_FILENAME = '.build_manifest.json'
+MANIFEST_FORMAT = 1
+
+
+def sha256_file(path, chunk_size=1 << 20):
+    """计算文件的 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def code_fingerprint(*funcs):
+    """根据函数（类、整个模块）源码计算指纹，解析 / 升级逻辑修改后旧的构建记录自动失效"""
+    digest = hashlib.sha256()
+    for func in funcs:
+        digest.update(getattr(func, '__qualname__', func.__name__).encode('utf-8'))
+        digest.update(inspect.getsource(func).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+
+class BuildManifest:
+    """
+    public/mindmaps/.build_manifest.json 的读写
+    
+    条目以输出文件名为键，多个 pipeline 共用同一个清单，各自只更新自己写出的文件
+    """
+    
+    def __init__(self, output_dir, pipeline, pipeline_version, code_hash):
+        self.path = Path(output_dir) / MANIFEST_FILENAME
+        self.pipeline = pipeline
+        self.pipeline_version = pipeline_version
+        self.code_hash = code_hash
+        self.entries = {}
+        self._load()
+    
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('format') == MANIFEST_FORMAT:
+            self.entries = data.get('entries', {})
+    
+    def is_up_to_date(self, source_path, output_path):
+        """源文件、pipeline 版本、代码指纹和输出文件都与记录一致时返回 True"""
+        entry = self.entries.get(Path(output_path).name)
+        if not entry:
+            return False
+        if (entry.get('pipeline') != self.pipeline or
+                entry.get('pipeline_version') != self.pipeline_version or
+                entry.get('code_hash') != self.code_hash):
+            return False
+        if not os.path.exists(output_path):
+            return False
+        return (entry.get('source_sha256') == sha256_file(source_path) and
+                entry.get('output_sha256') == sha256_file(output_path))
+    
+    def record(self, source_path, output_path):
+        """记录一次成功的构建"""
+        self.entries[Path(output_path).name] = {
+            'source': Path(source_path).as_posix(),
+            'source_sha256': sha256_file(source_path),
+            'pipeline': self.pipeline,
+            'pipeline_version': self.pipeline_version,
+            'code_hash': self.code_hash,
+            'output_sha256': sha256_file(output_path),
+        }
+    
+    def save(self):
+        """写回清单（先写临时文件再替换，避免中断时留下半个文件）"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'format': MANIFEST_FORMAT, 'entries': dict(sorted(self.entries.items()))},
+                      f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
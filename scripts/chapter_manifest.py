@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+章节清单 public/mindmaps/manifest.json
+两个 pipeline 结束时调用 update_chapter_manifest()，为输出目录中存在的每个章节记录：
+级别、文件名、SHA-256（API 用作强 ETag，客户端带 If-None-Match 时可以直接返回 304）、
+JSON / .gz / .br 字节数、节点数、最大深度，以及 --shard 生成的分片清单、--layout 生成的布局文件路径。
+API 按清单选择文件，不再硬编码章节映射，也不需要为了这些信息读取和解析章节文件。
+
+内容（SHA-256）没有变化的章节沿用原来的节点数和最大深度，只有重新生成的章节需要解析。
+清单不含时间戳，同样的输出总是得到同样的清单（--check-stable 照常通过）
+
+用法: python scripts/chapter_manifest.py [--output-dir public/mindmaps]
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+from build_manifest import sha256_file
+from chapters import CHAPTERS, sorted_chapters
+from json_backend import dump as dump_json
+from output_encoding import sibling_paths
+from shard_output import SHARD_MANIFEST_FILENAME, shard_dir
+from tree_layout import layout_path
+
+CHAPTER_MANIFEST_FILENAME = 'manifest.json'
+CHAPTER_MANIFEST_FORMAT = 1
+
+
+def tree_stats(data):
+    """(节点数, 最大深度)，根节点深度为 1（显式栈，不受递归深度限制）"""
+    stack = [(node, 1) for node in (data if isinstance(data, list) else [data])]
+    count = 0
+    max_depth = 0
+    while stack:
+        node, depth = stack.pop()
+        count += 1
+        max_depth = max(max_depth, depth)
+        stack.extend((child, depth + 1) for child in node.get('children') or [])
+    return count, max_depth
+
+
+def _load_entries(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get('format') != CHAPTER_MANIFEST_FORMAT:
+        return {}
+    return data.get('chapters', {})
+
+
+def _size_or_none(path):
+    return os.path.getsize(path) if path.exists() else None
+
+
+def chapter_entry(output_dir, chapter, previous=None):
+    """输出目录中某个章节的清单条目；章节文件不存在时返回 None"""
+    level, filename = CHAPTERS[chapter]
+    path = Path(output_dir) / filename
+    if not path.exists():
+        return None
+    sha256 = sha256_file(path)
+    if previous and previous.get('sha256') == sha256:
+        nodes, max_depth = previous['nodes'], previous['maxDepth']
+    else:
+        with open(path, 'r', encoding='utf-8') as f:
+            nodes, max_depth = tree_stats(json.load(f))
+    gz_path, br_path = sibling_paths(path)
+    shard_manifest = shard_dir(path) / SHARD_MANIFEST_FILENAME
+    layout_file = layout_path(path)
+    return {
+        'level': level,
+        'file': filename,
+        'sha256': sha256,
+        'bytes': os.path.getsize(path),
+        'gzipBytes': _size_or_none(gz_path),
+        'brotliBytes': _size_or_none(br_path),
+        'nodes': nodes,
+        'maxDepth': max_depth,
+        'shards': shard_manifest.relative_to(output_dir).as_posix() if shard_manifest.exists() else None,
+        'layout': layout_file.relative_to(output_dir).as_posix() if layout_file.exists() else None
+    }
+
+
+def update_chapter_manifest(output_dir):
+    """
+    重新生成 output_dir/manifest.json（只列出存在的章节文件），返回清单中的章节数。
+    先写临时文件再替换，API 不会读到半个清单
+    """
+    output_dir = Path(output_dir)
+    manifest_path = output_dir / CHAPTER_MANIFEST_FILENAME
+    previous = _load_entries(manifest_path)
+    chapters = {}
+    for chapter in sorted_chapters(CHAPTERS):
+        entry = chapter_entry(output_dir, chapter, previous.get(chapter))
+        if entry is not None:
+            chapters[chapter] = entry
+    tmp_path = manifest_path.with_name(manifest_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        dump_json({'format': CHAPTER_MANIFEST_FORMAT, 'chapters': chapters}, f)
+    os.replace(tmp_path, manifest_path)
+    return len(chapters)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='根据输出目录中的章节文件重新生成 manifest.json')
+    parser.add_argument('--output-dir', default='public/mindmaps', help='输出目录（默认 public/mindmaps）')
+    args = parser.parse_args()
+    
+    count = update_chapter_manifest(args.output_dir)
+    print(f"📇 章节清单已更新: {Path(args.output_dir) / CHAPTER_MANIFEST_FILENAME}（{count} 个章节）")
+
+
+if __name__ == "__main__":
+    main()
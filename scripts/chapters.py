@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+章节表
+两个 pipeline、章节清单（chapter_manifest.py）共用的章节编号 → (级别, 输出文件名) 映射，
+以及 PDF / txt 源文件名到章节编号的映射。新增章节只需要改这里；
+API 按构建时写出的 public/mindmaps/manifest.json 选择文件，不再另外维护一份映射
+"""
+
+# 章节编号 → (级别, 输出文件名)
+CHAPTERS = {
+    '1': ('AS', '1_Cell_structure.json'),
+    '2': ('AS', '2_Biological_molecules.json'),
+    '3': ('AS', '3_Enzymes.json'),
+    '4': ('AS', '4_Cell_membranes_and_transport.json'),
+    '5': ('AS', '5_The_mitotic_cell_cycle.json'),
+    '6': ('AS', '6_Nucleic_acids_and_protein_synthesis.json'),
+    '7': ('AS', '7_Transport_of_Plant.json'),
+    '8': ('AS', '8_Transport_in_mammals.json'),
+    '9': ('AS', '9_Gas_exchange.json'),
+    '10': ('AS', '10_Infectious_diseases.json'),
+    '11': ('AS', '11_Immunity.json'),
+    '12': ('A2', '12_Energy_and_respiration.json'),
+    '13': ('A2', '13_Photosynthesis.json'),
+    '14': ('A2', '14_Homeostasis.json'),
+    '15': ('A2', '15_Control_and_coordination.json'),
+    '16': ('A2', '16_Inheritance.json'),
+    '17': ('A2', '17_Selection_and_evolution.json'),
+    '18': ('A2', '18_Classification_biodiversity_and_conservation.json'),
+    '19': ('A2', '19_Genetic_technology.json'),
+}
+
+# 章节编号到输出文件名的映射
+CHAPTER_TO_FILENAME = {chapter: filename for chapter, (_, filename) in CHAPTERS.items()}
+
+# PDF 文件名到章节编号的映射（AS，process_mindmaps_pipeline.py；匹配时忽略大小写和前后空格）
+PDF_TO_CHAPTER = {
+    'cell.pdf': '1',
+    'biomolecule.pdf': '2',
+    'enzyme.pdf': '3',
+    'membrane structure and transport.pdf': '4',
+    'mitosis.pdf': '5',
+    'Nucleic acids and protein synthesis.pdf': '6',
+    'Transport in Plant.pdf': '7',
+    'Transport in mammal.pdf': '8',
+    'Gas exchange system.pdf': '9',
+    'infectious disease.pdf': '10',
+    'Immunity.pdf': '11',
+}
+
+# txt 文件名到章节编号的映射（A2，convert_txt_to_mindmap.py）
+TXT_TO_CHAPTER = {
+    'Energy and Respiration.txt': '12',
+    'Photosynthesis.txt': '13',
+    'Homeostasis.txt': '14',
+    'Nervous System.txt': '15',
+    'Inheritance.txt': '16',
+    'Selection & Evolution.txt': '17',
+    'Classification, Biodiversity and Conservation.txt': '18',
+    'Genetic Technology.txt': '19',
+}
+
+
+def sorted_chapters(chapters):
+    """按章节编号的数值排序"""
+    return sorted(chapters, key=int)
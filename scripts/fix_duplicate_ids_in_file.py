@@ -7,38 +7,42 @@
 import json
 import sys
 
+from id_allocator import IdAllocator, stable_hash
+from json_backend import dump as dump_json
+from output_encoding import refresh_precompressed
+from tree_walk import join_path, walk_subtree
+
 def fix_node_ids(node, parent_id=None, used_ids=None, path=""):
-    """递归修复节点 ID，确保唯一性"""
+    """修复节点及其子孙的 ID，确保唯一性（显式栈遍历，不受递归深度限制）"""
+    # used_ids 为 IdAllocator；传入普通集合时包装为共享该集合的 IdAllocator
     if used_ids is None:
-        used_ids = set()
-    
-    current_id = node.get('id', '')
-    current_path = f"{path}/{current_id}" if path else current_id
+        used_ids = IdAllocator()
+    elif not isinstance(used_ids, IdAllocator):
+        used_ids = IdAllocator(used_ids)
     
-    # 如果 ID 已存在，添加父节点前缀使其唯一
-    if current_id in used_ids:
-        if parent_id:
-            new_id = f"{parent_id}-{current_id}"
-        else:
-            # 根节点冲突，使用路径
-            new_id = f"{current_id}-{hash(current_path) % 10000}"
+    def enter(node, context, index, count):
+        parent_id, path = context
+        current_id = node.get('id', '')
+        current_path = (path, current_id)
         
-        # 确保新 ID 也是唯一的
-        suffix = 1
-        original_new_id = new_id
-        while new_id in used_ids:
-            new_id = f"{original_new_id}-{suffix}"
-            suffix += 1
+        # 如果 ID 已存在，添加父节点前缀使其唯一
+        if current_id in used_ids:
+            if parent_id:
+                new_id = f"{parent_id}-{current_id}"
+            else:
+                # 根节点冲突，使用路径的稳定摘要（不用 hash()，它的结果每个进程都不同）
+                new_id = f"{current_id}-{stable_hash(join_path(current_path))}"
+            
+            # 确保新 ID 也是唯一的（被占用时加数字后缀）
+            new_id = used_ids.allocate(new_id)
+            node['id'] = new_id
+            current_id = new_id
+            print(f"修复重复 ID: {join_path(current_path)} -> {new_id}")
         
-        node['id'] = new_id
-        current_id = new_id
-        print(f"修复重复 ID: {current_path} -> {new_id}")
-    
-    used_ids.add(current_id)
+        used_ids.add(current_id)
+        return (current_id, current_path), node.get('children')
     
-    # 递归处理子节点
-    for child in node.get('children', []):
-        fix_node_ids(child, current_id, used_ids, current_path)
+    walk_subtree(node, enter, context=(parent_id, path))
 
 def main():
     if len(sys.argv) < 2:
@@ -52,7 +56,7 @@ def main():
         data = json.load(f)
     
     print("正在修复重复 ID...")
-    used_ids = set()
+    used_ids = IdAllocator()
     
     if isinstance(data, list):
         for node in data:
@@ -62,7 +66,9 @@ def main():
     
     print(f"正在保存到: {file_path}")
     with open(file_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+        dump_json(data, f)
+    if refresh_precompressed(file_path):
+        print("已重新生成预压缩文件 (.gz / .br)")
     
     print("✅ 完成！")
 
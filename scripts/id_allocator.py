@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+唯一 ID 分配器
+各转换脚本生成 / 去重节点 ID 的规则相同：依次尝试候选 ID，全部被占用时在第一个候选后加 -1、-2 ... 后缀，
+取第一个未被占用的。原先每次冲突都从 -1 开始逐个试探，同一标签的兄弟节点很多时
+（大量重复的 "Structure"、"Function" 标题），第 n 个节点要试探 n 次，总开销是平方级的。
+
+IdAllocator 为每个基础 ID 记住下一个要试探的后缀：ID 只会被登记、不会被释放，
+已经试探过的后缀不可能重新变为可用，因此从记下的位置继续试探，结果与从 -1 开始完全相同，
+而每个后缀最多试探一次，分配的均摊开销是常数
+
+根节点 ID 冲突时改名用的后缀由 stable_hash 计算：内置的 hash() 对字符串按进程随机化（PYTHONHASHSEED），
+同一份 PDF 两次生成的 JSON 会不同，CDN 缓存、ETag 和按差异部署都会因此失效
+"""
+
+import hashlib
+
+
+def stable_hash(text, modulus=10000):
+    """文本的稳定摘要，取值 0 ~ modulus-1；替代 hash(text) % modulus，跨进程、跨机器结果相同"""
+    digest = hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % modulus
+
+
+class IdAllocator:
+    """
+    已使用 ID 的登记表 + 按基础 ID 递增的后缀计数器
+    
+    used 为已登记的 ID 集合（可传入已有集合共享）；
+    taken 为可选的判定函数，表示登记表之外被占用的 ID（例如 NodeStore 中按需计算的解析器 ID），
+    它判定为占用的 ID 之后必须一直保持占用，否则后缀计数器会跳过重新可用的 ID
+    """
+    
+    __slots__ = ('used', '_taken', '_next_suffix')
+    
+    def __init__(self, used=None, taken=None):
+        self.used = set() if used is None else used
+        self._taken = taken
+        self._next_suffix = {}
+    
+    def __contains__(self, node_id):
+        return node_id in self.used or (self._taken is not None and self._taken(node_id))
+    
+    def __len__(self):
+        return len(self.used)
+    
+    def add(self, node_id):
+        """登记一个已有的 ID"""
+        self.used.add(node_id)
+    
+    def allocate(self, *candidates):
+        """
+        返回第一个未被占用的候选 ID；全部被占用时返回 {第一个候选}-{后缀} 中第一个未被占用的。
+        返回的 ID 同时被登记
+        """
+        for candidate in candidates:
+            if candidate not in self:
+                self.used.add(candidate)
+                return candidate
+        base = candidates[0]
+        suffix = self._next_suffix.get(base, 1)
+        node_id = f"{base}-{suffix}"
+        while node_id in self:
+            suffix += 1
+            node_id = f"{base}-{suffix}"
+        self._next_suffix[base] = suffix + 1
+        self.used.add(node_id)
+        return node_id
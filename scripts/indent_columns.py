@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+缩进列模型
+每个文档只计算一次缩进列（所有行首 x 坐标聚类后的列中心，升序），
+之后每行的缩进级别用二分查找得到，解析整份文档为 O(n log n)
+"""
+
+from bisect import bisect_left
+
+# 与最近的列相距超过该值（pt）时视为新的缩进位置，不吸附到已有列
+SNAP_DISTANCE = 10
+
+# 默认不合并不同的 x 坐标（每个不同的 x 就是一列），与逐行计算的结果完全一致
+DEFAULT_COLUMN_GAP = 0.0
+
+
+def cluster_columns(x_positions, gap=DEFAULT_COLUMN_GAP):
+    """
+    一维聚类：排序后相邻 x 之差不超过 gap 的归为同一列，返回升序的列中心
+    
+    列中心取聚类的中位数元素，gap 为 0 时列中心就是原始 x 值本身
+    """
+    columns = []
+    cluster = []
+    for x in sorted(x_positions):
+        if cluster and x - cluster[-1] > gap:
+            columns.append(cluster[len(cluster) // 2])
+            cluster = []
+        cluster.append(x)
+    if cluster:
+        columns.append(cluster[len(cluster) // 2])
+    return columns
+
+
+class IndentColumns:
+    """
+    文档的缩进列模型，可在多个 parse_hierarchy 实现之间共用
+    
+    level(x) 的规则：
+    - x 恰好是某一列：返回该列的序号
+    - 最近的列在 SNAP_DISTANCE 之内：吸附到该列（距离相同时取左侧的列）
+    - 否则视为插入到列之间的新位置：返回小于 x 的列数
+    """
+    
+    __slots__ = ('columns', 'snap_distance', 'lookups')
+    
+    def __init__(self, x_positions, gap=DEFAULT_COLUMN_GAP, snap_distance=SNAP_DISTANCE):
+        self.columns = cluster_columns(x_positions, gap)
+        self.snap_distance = snap_distance
+        self.lookups = 0
+    
+    @classmethod
+    def from_lines(cls, lines_with_position, gap=DEFAULT_COLUMN_GAP, snap_distance=SNAP_DISTANCE):
+        """用 (x, text) 行列表建模（x 为 0 的行没有位置信息，不参与建模）"""
+        return cls([x for x, _ in lines_with_position if x > 0], gap, snap_distance)
+    
+    def level(self, x_pos):
+        """返回 x 坐标对应的缩进级别"""
+        self.lookups += 1
+        columns = self.columns
+        if not columns:
+            return 0
+        
+        i = bisect_left(columns, x_pos)
+        if i < len(columns) and columns[i] == x_pos:
+            return i
+        
+        if i == 0:
+            closest = 0
+        elif i == len(columns):
+            closest = i - 1
+        else:
+            closest = i - 1 if x_pos - columns[i - 1] <= columns[i] - x_pos else i
+        
+        if abs(x_pos - columns[closest]) > self.snap_distance:
+            return i
+        return closest
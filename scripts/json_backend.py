@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON 序列化层
+各脚本保存 JSON 时统一调用 dump()，后端（backend 参数为空时自动选择）：
+
+- orjson:  pip install orjson，Rust 实现，缩进输出也很快
+- msgspec: pip install msgspec，先写紧凑格式，再用 msgspec.json.format 加缩进
+- json:    标准库（缩进输出走纯 Python 的 iterencode，是大文件保存阶段的主要开销）
+- stream:  本模块的流式写出器，显式栈遍历、边遍历边写文件，不在内存中拼出整个字符串，
+           树再深也不会触发 RecursionError（标准库缩进输出是递归生成器）
+
+所有后端的输出都与 json.dump(..., ensure_ascii=False, indent=2)（compact=True 时为 separators=(',', ':')）
+逐字节一致。orjson / msgspec 在以下情况与标准库不同，遇到时自动改用标准库：
+- 非字符串的 dict 键、超过 64 位的整数等不支持的类型（抛出 TypeError）
+- 浮点数（标准库按 repr 写 1e+16、8e-05，orjson 写 1e16、0.00008）：去掉字符串后的输出中
+  还有"数字后跟 . 或 e"时整体改用标准库（思维导图数据只有字符串和 null，不会走到这一步）
+自动选择：安装了 orjson / msgspec 时使用它们；都没有时缩进输出用 stream（比标准库快约 2 倍，
+内存与文件大小无关），紧凑输出用标准库（C 实现，比 stream 快）。各后端的耗时见 benchmarks/bench_json_backend.py
+
+NaN / Infinity 不是合法的 JSON，标准库写 NaN，orjson / msgspec 写 null；思维导图数据中不会出现
+
+NodeStore.write_json 是三个转换脚本专用的流式写出器（直接遍历并行数组，不需要 dict 树）
+"""
+
+import json
+import re
+from json.encoder import encode_basestring
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+# 后端名称，按自动选择的优先级排列
+BACKENDS = ('orjson', 'msgspec', 'json', 'stream')
+
+# 快速后端与标准库格式不同的唯一情形是浮点数：先粗查数字后跟 . 或 e，命中时去掉字符串再查一次
+_FLOAT = re.compile(rb'[0-9][.eE]')
+_STRING = re.compile(rb'"(?:[^"\\]|\\.)*"')
+
+# stream 后端每攒够这么多片段写一次文件
+_WRITE_BATCH = 4096
+
+_END = object()
+
+
+def available_backends():
+    """当前环境可用的后端名称"""
+    installed = {'orjson': orjson is not None, 'msgspec': msgspec is not None}
+    return [name for name in BACKENDS if installed.get(name, True)]
+
+
+def default_backend(compact=False):
+    """自动选择的后端：orjson > msgspec > stream（缩进）/ json（紧凑）"""
+    for name in ('orjson', 'msgspec'):
+        if name in available_backends():
+            return name
+    return 'json' if compact else 'stream'
+
+
+def _resolve(backend, compact):
+    """检查后端名称；为空时自动选择"""
+    if not backend:
+        return default_backend(compact)
+    if backend not in available_backends():
+        raise ValueError(f"JSON 后端 {backend} 不可用（可用: {', '.join(available_backends())}）")
+    return backend
+
+
+def _encode_fast(obj, compact, backend):
+    """用 orjson / msgspec 编码为 UTF-8 字节；与标准库输出可能不同时返回 None"""
+    try:
+        if backend == 'orjson':
+            data = orjson.dumps(obj, option=0 if compact else orjson.OPT_INDENT_2)
+        else:
+            data = msgspec.json.encode(obj)
+            if not compact:
+                data = msgspec.json.format(data, indent=2)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if _FLOAT.search(data) and _FLOAT.search(_STRING.sub(b'""', data)):
+        return None
+    return data
+
+
+def _dumps_stdlib(obj, compact):
+    if compact:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
+def _float_str(value):
+    """与标准库 floatstr 相同"""
+    if value != value:
+        return 'NaN'
+    if value == float('inf'):
+        return 'Infinity'
+    if value == -float('inf'):
+        return '-Infinity'
+    return float.__repr__(value)
+
+
+def _encode_scalar(value):
+    if isinstance(value, str):
+        return encode_basestring(value)
+    if value is None:
+        return 'null'
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if isinstance(value, int):
+        return int.__repr__(value)
+    if isinstance(value, float):
+        return _float_str(value)
+    raise TypeError(f'Object of type {value.__class__.__name__} is not JSON serializable')
+
+
+def _encode_key(key):
+    """dict 键的转换规则与标准库相同"""
+    if isinstance(key, str):
+        return encode_basestring(key)
+    if isinstance(key, float):
+        return encode_basestring(_float_str(key))
+    if key is True:
+        return '"true"'
+    if key is False:
+        return '"false"'
+    if key is None:
+        return '"null"'
+    if isinstance(key, int):
+        return encode_basestring(int.__repr__(key))
+    raise TypeError(f'keys must be str, int, float, bool or None, not {key.__class__.__name__}')
+
+
+def iter_json(obj, compact=False):
+    """
+    逐段产出 obj 的 JSON 文本（显式栈，不受递归深度限制），拼接后与标准库的输出逐字节一致。
+    栈中每层为 [子项迭代器, 是否为 dict, 是否还没有写出子项]
+    """
+    if compact:
+        key_separator, indent = ':', None
+    else:
+        key_separator, indent = ': ', '  '
+    stack = []
+    value = obj
+    while True:
+        # 写出 value：标量直接写出，非空容器写出开括号并入栈
+        if isinstance(value, (list, tuple)):
+            if value:
+                yield '['
+                stack.append([iter(value), False, True])
+            else:
+                yield '[]'
+        elif isinstance(value, dict):
+            if value:
+                yield '{'
+                stack.append([iter(value.items()), True, True])
+            else:
+                yield '{}'
+        else:
+            yield _encode_scalar(value)
+        
+        # 找到下一个要写出的值，途中关闭已经写完的容器
+        while stack:
+            frame = stack[-1]
+            item = next(frame[0], _END)
+            if item is _END:
+                stack.pop()
+                closing = '}' if frame[1] else ']'
+                yield closing if indent is None else '\n' + indent * len(stack) + closing
+                continue
+            prefix = '' if frame[2] else ','
+            frame[2] = False
+            if indent is not None:
+                prefix += '\n' + indent * len(stack)
+            if frame[1]:
+                key, value = item
+                yield prefix + _encode_key(key) + key_separator
+            else:
+                value = item
+                yield prefix
+            break
+        else:
+            return
+
+
+def write_stream(obj, f, compact=False):
+    """stream 后端：把 iter_json 的片段分批写入文本文件 f"""
+    parts = []
+    for part in iter_json(obj, compact):
+        parts.append(part)
+        if len(parts) >= _WRITE_BATCH:
+            f.write(''.join(parts))
+            parts.clear()
+    f.write(''.join(parts))
+
+
+def dumps(obj, compact=False, backend=None):
+    """返回 obj 的 JSON 文本；backend 为空时自动选择"""
+    backend = _resolve(backend, compact)
+    if backend == 'stream':
+        return ''.join(iter_json(obj, compact))
+    if backend in ('orjson', 'msgspec'):
+        data = _encode_fast(obj, compact, backend)
+        if data is not None:
+            return data.decode('utf-8')
+    return _dumps_stdlib(obj, compact)
+
+
+def dump(obj, f, compact=False, backend=None):
+    """把 obj 写入文本文件 f，与 json.dump(obj, f, ensure_ascii=False, indent=2) 逐字节一致"""
+    backend = _resolve(backend, compact)
+    if backend == 'stream':
+        write_stream(obj, f, compact)
+    else:
+        f.write(dumps(obj, compact, backend))
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF 提取结果的磁盘缓存
+以 PDF 文件 SHA-256 + 提取器版本为键，缓存每页的 (x0, text) 行，
+只调整解析逻辑时不必再用 pdfplumber 重新提取；
+另外以页面指纹为键（"p-" 前缀）缓存单页结果，文档只改动个别页面时其余页面直接复用
+
+缓存文件格式（小端序）：
+    头部     magic(4s) 格式版本(H) 页数(I) 行数(I)
+    每页行数 uint32 × 页数
+    x 坐标   float64 × 行数
+    文本偏移 uint32 × (行数 + 1)，指向 UTF-8 文本块
+    文本块   所有行文本按 UTF-8 拼接
+
+缓存总大小超过上限时按最近访问时间（文件 mtime，读取时刷新）淘汰
+
+用法:
+    python scripts/line_cache.py stats
+    python scripts/line_cache.py list
+    python scripts/line_cache.py purge [--all | --older-than 天数 | --max-size-mb 上限]
+"""
+
+import argparse
+import os
+import struct
+import sys
+import time
+from array import array
+from pathlib import Path
+
+from build_manifest import sha256_file
+
+DEFAULT_CACHE_DIR = Path(__file__).resolve().parent.parent / '.cache' / 'mindmap_lines'
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+CACHE_SUFFIX = '.lines'
+MAGIC = b'MMLC'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sHII')
+
+
+def _to_little_endian(arr):
+    if sys.byteorder != 'little':
+        arr.byteswap()
+    return arr
+
+
+def encode_pages(pages):
+    """把每页的 (x0, text) 行列表编码为紧凑的二进制格式"""
+    page_counts = array('I', (len(page_lines) for page_lines in pages))
+    xs = array('d')
+    offsets = array('I', [0])
+    blob = bytearray()
+    for page_lines in pages:
+        for x, text in page_lines:
+            xs.append(x)
+            blob += text.encode('utf-8')
+            offsets.append(len(blob))
+    return b''.join([
+        HEADER.pack(MAGIC, FORMAT_VERSION, len(page_counts), len(xs)),
+        _to_little_endian(page_counts).tobytes(),
+        _to_little_endian(xs).tobytes(),
+        _to_little_endian(offsets).tobytes(),
+        bytes(blob),
+    ])
+
+
+def decode_pages(data):
+    """encode_pages 的逆操作，格式不符或数据不完整（文件被截断、损坏）时返回 None"""
+    if len(data) < HEADER.size:
+        return None
+    magic, version, n_pages, n_lines = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        return None
+    
+    pos = HEADER.size
+    arrays = []
+    for typecode, count in (('I', n_pages), ('d', n_lines), ('I', n_lines + 1)):
+        arr = array(typecode)
+        size = arr.itemsize * count
+        chunk = data[pos:pos + size]
+        if len(chunk) != size:
+            return None
+        arr.frombytes(chunk)
+        arrays.append(_to_little_endian(arr))
+        pos += size
+    page_counts, xs, offsets = arrays
+    # 偏移必须从 0 开始单调不减，并且恰好覆盖到文件末尾，否则文本块不完整
+    if sum(page_counts) != n_lines or offsets[0] != 0 or pos + offsets[-1] != len(data):
+        return None
+    if any(offsets[i] > offsets[i + 1] for i in range(n_lines)):
+        return None
+    blob = data[pos:]
+    
+    pages = []
+    line_index = 0
+    for count in page_counts:
+        page_lines = []
+        for i in range(line_index, line_index + count):
+            page_lines.append((xs[i], blob[offsets[i]:offsets[i + 1]].decode('utf-8')))
+        pages.append(page_lines)
+        line_index += count
+    return pages
+
+
+def read_header(path):
+    """
+    读取缓存文件头部，返回 (页数, 行数)；头部不完整、格式不符或文件长度与头部不一致
+    （按最后一个文本偏移推算，不读取整个文件）时抛出 ValueError
+    """
+    with open(path, 'rb') as f:
+        header = f.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise ValueError("头部不完整")
+        magic, version, n_pages, n_lines = HEADER.unpack(header)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("格式不符")
+        # 最后一个文本偏移即文本块长度
+        last_offset_pos = HEADER.size + 4 * n_pages + 8 * n_lines + 4 * n_lines
+        f.seek(last_offset_pos)
+        raw = f.read(4)
+        if len(raw) != 4:
+            raise ValueError("文件被截断")
+        blob_size = struct.unpack('<I', raw)[0]
+        if last_offset_pos + 4 + blob_size != os.fstat(f.fileno()).st_size:
+            raise ValueError("文件长度与头部不一致")
+    return n_pages, n_lines
+
+
+class LineCache:
+    """提取结果缓存目录"""
+    
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = Path(cache_dir) if cache_dir else DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        # 本次运行的页面命中统计（由 pdf_line_extractor 累计）
+        self.page_hits = 0
+        self.page_misses = 0
+    
+    def hit_ratio_text(self):
+        """页面缓存命中率的文字描述"""
+        total = self.page_hits + self.page_misses
+        if not total:
+            return "无"
+        return f"{self.page_hits}/{total} 页 ({self.page_hits / total:.1%})"
+    
+    def key_for(self, pdf_path, extractor_version):
+        """缓存键：PDF 内容哈希 + 提取器版本"""
+        return f"{sha256_file(pdf_path)}-{extractor_version}"
+    
+    def _path(self, key):
+        return self.cache_dir / f"{key}{CACHE_SUFFIX}"
+    
+    def get(self, key):
+        """读取缓存的每页行列表，未命中返回 None"""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                pages = decode_pages(f.read())
+        except (OSError, ValueError, UnicodeDecodeError, IndexError):
+            # 损坏的条目按未命中处理，之后重新提取并覆盖
+            return None
+        if pages is not None:
+            # 刷新访问时间，供 LRU 淘汰使用
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+        return pages
+    
+    def put(self, key, pages, evict=True):
+        """写入缓存；evict 为 True 时在超出大小上限后淘汰最久未使用的条目"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(encode_pages(pages))
+        os.replace(tmp_path, path)
+        if evict:
+            self.evict(self.max_bytes, keep=path)
+    
+    def entries(self):
+        """返回 [(path, 大小, 最近访问时间), ...]，按最近访问时间从旧到新排序"""
+        if not self.cache_dir.exists():
+            return []
+        result = []
+        for path in self.cache_dir.glob(f"*{CACHE_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            result.append((path, stat.st_size, stat.st_mtime))
+        result.sort(key=lambda entry: entry[2])
+        return result
+    
+    def evict(self, max_bytes, keep=None):
+        """按 LRU 淘汰条目，直到总大小不超过 max_bytes；返回删除的条目数"""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for path, size, _ in entries:
+            if total <= max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+    
+    def purge(self, older_than=None):
+        """删除全部条目，或只删除 older_than 秒内未访问的条目；返回删除的条目数"""
+        now = time.time()
+        removed = 0
+        for path, _, mtime in self.entries():
+            if older_than is not None and now - mtime < older_than:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            removed += 1
+        return removed
+
+
+def format_size(num_bytes):
+    for unit in ('B', 'KB', 'MB'):
+        if num_bytes < 1024:
+            return f"{num_bytes:.0f} {unit}" if unit == 'B' else f"{num_bytes:.1f} {unit}"
+        num_bytes /= 1024
+    return f"{num_bytes:.1f} GB"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='查看和清理 PDF 提取结果缓存')
+    parser.add_argument('--cache-dir', help=f'缓存目录（默认 {DEFAULT_CACHE_DIR}）')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    subparsers.add_parser('stats', help='显示缓存条目数和总大小')
+    subparsers.add_parser('list', help='列出所有缓存条目')
+    purge_parser = subparsers.add_parser('purge', help='清理缓存')
+    group = purge_parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--all', action='store_true', help='删除全部条目')
+    group.add_argument('--older-than', type=float, metavar='DAYS', help='删除超过指定天数未访问的条目')
+    group.add_argument('--max-size-mb', type=float, help='按 LRU 淘汰到指定大小以内')
+    args = parser.parse_args(argv)
+    
+    cache = LineCache(args.cache_dir)
+    
+    if args.command == 'stats':
+        entries = cache.entries()
+        total = sum(size for _, size, _ in entries)
+        print(f"📂 缓存目录: {cache.cache_dir}")
+        print(f"   条目数: {len(entries)}")
+        print(f"   总大小: {format_size(total)} / 上限 {format_size(cache.max_bytes)}")
+    elif args.command == 'list':
+        entries = cache.entries()
+        if not entries:
+            print("缓存为空")
+        for path, size, mtime in reversed(entries):
+            accessed = time.strftime('%Y-%m-%d %H:%M', time.localtime(mtime))
+            kind = '页面' if path.stem.startswith('p-') else '文档'
+            digest, _, version = path.stem[2:].partition('-') if kind == '页面' else path.stem.partition('-')
+            try:
+                n_pages, n_lines = read_header(path)
+            except (OSError, ValueError, struct.error) as e:
+                # 损坏的条目读取时按未命中处理，重新提取后会被覆盖
+                print(f"{kind} {digest[:12]}… {version:<14} {format_size(size):>9}  ⚠️  无效条目（{e}）  最近使用 {accessed}")
+                continue
+            print(f"{kind} {digest[:12]}… {version:<14} {format_size(size):>9}  {n_pages:>4} 页 {n_lines:>6} 行  最近使用 {accessed}")
+    elif args.command == 'purge':
+        if args.all:
+            removed = cache.purge()
+        elif args.older_than is not None:
+            removed = cache.purge(older_than=args.older_than * 86400)
+        else:
+            removed = cache.evict(int(args.max_size_mb * 1024 * 1024))
+        print(f"🗑️  已删除 {removed} 个缓存条目")
+
+
+if __name__ == "__main__":
+    main()
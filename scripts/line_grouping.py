@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+字符 → 文本行分组
+把页面字符按基线 y0 聚类成行：按 y0 从上到下排序一次，相邻基线差不超过容差的字符归为同一行，
+行内按 x0 排序后拼接文本
+
+安装了 numpy 时使用向量化实现，否则使用等价的纯 Python 实现
+"""
+
+from operator import itemgetter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 基线容差（pt）。原先按 round(y0, 1) 分桶，同一个桶内的基线相差不到 0.1pt，
+# 所以 0.1pt 保证原来归为同一行的字符仍在同一行（99.96 和 100.04 不会被拆开）；
+# 与原来不同的是，跨桶边界、相差不超过 0.1pt 的基线（100.04 和 100.06）现在也会合并。
+# 上下标通常错开数 pt，不受影响
+DEFAULT_Y_TOLERANCE = 0.1
+
+
+def _group_numpy(texts, xs, ys, y_tolerance):
+    x = np.asarray(xs, dtype=float)
+    y = np.asarray(ys, dtype=float)
+    
+    # 按 y0 从大到小（页面从上到下）稳定排序，基线差超过容差处断行
+    order = np.argsort(-y, kind='stable')
+    sorted_y = y[order]
+    starts = np.flatnonzero(sorted_y[:-1] - sorted_y[1:] > y_tolerance) + 1
+    line_ids = np.zeros(len(order), dtype=np.intp)
+    line_ids[starts] = 1
+    np.cumsum(line_ids, out=line_ids)
+    
+    # 行内按 x0 排序（lexsort 稳定，x0 相同的字符保持原有顺序）
+    order = order[np.lexsort((x[order], line_ids))].tolist()
+    ordered_texts = [texts[i] for i in order]
+    bounds = [0] + starts.tolist() + [len(order)]
+    
+    return [(xs[order[start]], ''.join(ordered_texts[start:end]))
+            for start, end in zip(bounds, bounds[1:])]
+
+
+def _group_python(texts, xs, ys, y_tolerance):
+    order = sorted(range(len(ys)), key=lambda i: -ys[i])
+    
+    lines = []
+    current = [order[0]]
+    for prev, i in zip(order, order[1:]):
+        if ys[prev] - ys[i] > y_tolerance:
+            lines.append(current)
+            current = []
+        current.append(i)
+    lines.append(current)
+    
+    result = []
+    for line_indices in lines:
+        line_indices.sort(key=lambda i: xs[i])
+        result.append((xs[line_indices[0]], ''.join([texts[i] for i in line_indices])))
+    return result
+
+
+def group_chars_into_lines(texts, xs, ys, y_tolerance=DEFAULT_Y_TOLERANCE, use_numpy=None):
+    """
+    把字符分组成行
+    
+    Args:
+        texts / xs / ys: 每个字符的文本、x0、y0（三个等长序列）
+        y_tolerance: 相邻基线合并为同一行的最大差值
+        use_numpy: 是否使用 numpy 实现，默认在可用时使用
+    
+    Returns:
+        从上到下的 [(行首字符 x0, 行文本), ...]，空白行已去除
+    """
+    if not texts:
+        return []
+    if use_numpy is None:
+        use_numpy = np is not None
+    group = _group_numpy if use_numpy else _group_python
+    return [(x, text) for x, text in group(texts, xs, ys, y_tolerance) if text.strip()]
+
+
+def group_page_chars(chars, y_tolerance=DEFAULT_Y_TOLERANCE, use_numpy=None):
+    """对 pdfplumber 的字符字典列表分组"""
+    texts = list(map(itemgetter('text'), chars))
+    xs = list(map(itemgetter('x0'), chars))
+    ys = list(map(itemgetter('y0'), chars))
+    return group_chars_into_lines(texts, xs, ys, y_tolerance, use_numpy)
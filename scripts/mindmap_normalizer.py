@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+思维导图数据规范化（单次遍历）
+把 pdf_to_final_mindmap 中依次执行的三步合并为一次先序遍历：
+
+1. upgrade_mindmap_data: title → label、生成缺失的 id、分配 side、合并断行节点
+2. fix_node_ids: 与先前节点重复的 id 加父节点前缀（根节点加路径的稳定摘要）改名
+3. validate_final_data: 检查 id / label / side 并统计节点数
+
+三步原本各自遍历一次整棵树、各自维护 used_ids 集合和路径字符串；
+合并后每个节点只访问一次（tree_walk 显式栈遍历，不受递归深度限制），输出与依次调用三个函数完全一致
+
+normalize_mindmap 处理任意 dict 树；normalize_store 直接在解析器产出的 NodeStore 上规范化，
+不创建节点 dict，供 pdf_to_final_mindmap.py 使用
+"""
+
+from id_allocator import IdAllocator, stable_hash
+from node_store import CENTER, LEFT, RIGHT
+from tree_walk import join_path, walk
+from upgrade_mindmap_data import DEFAULT_SPLIT_RULES, detect_split_runs, merge_split_siblings, slugify
+
+
+def normalize_mindmap(data, stats=None, split_rules=None):
+    """
+    单次遍历完成格式升级、ID 去重和验证（输入不变）
+    
+    返回 (规范化后的数据, 问题列表, 节点数)，与
+    upgrade_mindmap_data → fix_node_ids → validate_final_data 的结果相同；
+    stats 为 dict 时写入 id_collisions（去重时被改名的节点数），
+    split_rules 为断行合并规则（upgrade_mindmap_data.SplitRules，默认 DEFAULT_SPLIT_RULES）
+    """
+    if isinstance(data, list):
+        roots = data
+    elif isinstance(data, dict):
+        roots = [data]
+    else:
+        raise ValueError(f"不支持的数据类型: {type(data)}")
+    split_rules = split_rules or DEFAULT_SPLIT_RULES
+    
+    # 两套 ID 登记与原来的两步保持一致：
+    # generated_ids 只含升级时新生成的 ID（原 upgrade 的 used_ids），final_ids 是去重后的最终 ID
+    generated_ids = IdAllocator()
+    final_ids = IdAllocator()
+    issues = []
+    collisions = 0
+    
+    def enter(node, context, index, siblings_count):
+        nonlocal collisions
+        parent_side, parent_id, final_parent_id, level, parent_path, output = context
+        
+        label = node.get('title') or node.get('label') or ''
+        
+        # 升级：生成缺失的 ID（候选为 父id-slug、slug，都被占用时加数字后缀）
+        node_id = node.get('id')
+        if not node_id:
+            base_id = slugify(label) or f'node-{level}-{index}'
+            candidate_ids = [f"{parent_id}-{base_id}", base_id] if parent_id else [base_id]
+            node_id = generated_ids.allocate(*candidate_ids)
+        
+        side = node.get('side')
+        if not side:
+            if level == 0:
+                side = 'center'
+            elif parent_side == 'center' or parent_side is None:
+                side = 'left' if index < siblings_count / 2 else 'right'
+            else:
+                side = parent_side
+        
+        # 去重：与先前节点的最终 ID 冲突时改名（根节点冲突时路径就是自身 ID）
+        final_id = node_id
+        if final_id in final_ids:
+            if final_parent_id:
+                new_id = f"{final_parent_id}-{final_id}"
+            else:
+                new_id = f"{final_id}-{stable_hash(final_id)}"
+            final_id = final_ids.allocate(new_id)
+            collisions += 1
+        else:
+            final_ids.add(final_id)
+        
+        # 验证：去重后 ID 必然唯一，label / side 在下面必然写入，只需检查 ID 是否为空
+        path = (parent_path, final_id)
+        if not final_id:
+            issues.append(f"{join_path(path)}: 缺少 id")
+        
+        children = node.get('children', [])
+        if children:
+            children = merge_split_siblings(children, split_rules)
+        
+        upgraded_children = []
+        output.append({
+            'id': final_id,
+            'label': label,
+            'side': side,
+            'children': upgraded_children
+        })
+        return (side, node_id, final_id, level + 1, path, upgraded_children), children
+    
+    normalized = []
+    walk(roots, enter, context=(None, None, None, 0, '', normalized))
+    
+    if stats is not None:
+        stats['id_collisions'] = collisions
+    if isinstance(data, dict):
+        normalized = normalized[0]
+    return normalized, issues, len(final_ids)
+
+
+def normalize_store(store, stats=None, split_rules=None):
+    """
+    在 NodeStore（node_store.py）上完成与 normalize_mindmap 相同的规范化：
+    合并断行、为合并出的节点生成 ID、分配 side、ID 去重，结果写回 store 的 side / ids / labels / removed
+    
+    返回 (问题列表, 节点数)；store.write_json() 的输出与 normalize_mindmap 的结果逐字节一致。
+    解析器 ID 不为空且互不相同，生成和改名得到的 ID 也不为空，因此验证不会发现问题
+    """
+    split_rules = split_rules or DEFAULT_SPLIT_RULES
+    ids = store.ids
+    labels = store.labels
+    removed = store.removed
+    side_of = store.side
+    # 当前节点的先序编号；编号小于它的节点都已访问过
+    current = -1
+    
+    def parser_id_taken(candidate):
+        """candidate 是否是已访问、且没有被合并掉或改名的节点的解析器 ID"""
+        owner = store.find_parser_id(candidate)
+        return 0 <= owner < current and owner not in ids and owner not in removed
+    
+    # 与 normalize_mindmap 一样分两套登记：generated_ids 只含生成的 ID；
+    # 最终 ID 中的解析器 ID 不登记（按需在树中查找），其余（生成 / 改名得到的）登记在 final_ids
+    generated_ids = IdAllocator()
+    final_ids = IdAllocator(taken=parser_id_taken)
+    collisions = 0
+    visited = 0
+    
+    def enter(item, context, index, siblings_count):
+        nonlocal collisions, visited, current
+        node, original_index = item
+        current = node
+        parent_side, parent_id, final_parent_id, parent_parser_id, level = context
+        
+        if original_index is None:
+            # 合并断行得到的节点：没有解析器 ID，按升级规则生成
+            parser_id = None
+            base_id = slugify(labels[node]) or f'node-{level}-{index}'
+            candidate_ids = [f"{parent_id}-{base_id}", base_id] if parent_id else [base_id]
+            node_id = generated_ids.allocate(*candidate_ids)
+            clash = node_id in final_ids
+        else:
+            parser_id = f"{parent_parser_id}_child_{original_index}" if level else f"root_{original_index}"
+            node_id = parser_id
+            # 解析器 ID 只属于本节点，只可能与先前生成 / 改名得到的 ID 冲突
+            clash = node_id in final_ids.used
+        
+        if level == 0:
+            side = CENTER
+        elif parent_side == CENTER:
+            side = LEFT if index < siblings_count / 2 else RIGHT
+        else:
+            side = parent_side
+        
+        final_id = node_id
+        if clash:
+            if final_parent_id:
+                new_id = f"{final_parent_id}-{final_id}"
+            else:
+                new_id = f"{final_id}-{stable_hash(final_id)}"
+            final_id = final_ids.allocate(new_id)
+            collisions += 1
+        if final_id != parser_id:
+            ids[node] = final_id
+            final_ids.add(final_id)
+        side_of[node] = side
+        visited += 1
+        
+        if original_index is None or not store.has_children(node):
+            return None, None
+        
+        # 子节点：先检测断行，合并的一段用第一个节点代表（标签改为合并后的标签），其余标记为已合并
+        children = store.children(node)
+        titles = [store.label(child) for child in children]
+        runs = detect_split_runs(titles, [store.has_children(child) for child in children], split_rules)
+        items = []
+        position = 0
+        for start, end in runs:
+            items.extend((children[k], k) for k in range(position, start))
+            labels[children[start]] = ' '.join(title.strip() for title in titles[start:end + 1] if title.strip())
+            removed.update(children[start + 1:end + 1])
+            items.append((children[start], None))
+            position = end + 1
+        items.extend((children[k], k) for k in range(position, len(children)))
+        return (side, node_id, final_id, parser_id, level + 1), items
+    
+    walk([(root, k) for k, root in enumerate(store.roots())], enter, context=(None, None, None, None, 0))
+    
+    if stats is not None:
+        stats['id_collisions'] = collisions
+    return [], visited
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+紧凑的树存储（NodeStore）
+解析器按文档顺序产出节点，文档顺序就是先序，因此整棵树可以用几个并行数组表示：
+
+- depth:        节点深度（根节点为 0）
+- next_sibling: 下一个兄弟节点的编号（没有时为 -1）
+- 标签池:       所有标签的 UTF-8 字节依次拼接，_ends 记录每个标签的结束偏移
+- side:         side 编码（见 SIDES），升级 / 规范化时写入
+
+解析器 ID（root_0、root_0_child_2 ...）完全由树结构决定，不保存，遍历时现算；
+只有生成的 ID（合并断行后的节点）、去重改名后的 ID 和合并后的标签记在稀疏的 dict 中，
+被合并掉的节点记在 removed 集合中。
+
+原先每个节点是一个 dict + children 列表 + id / title 两个字符串，升级时还要整棵树再复制一份，
+节点数很大时内存几乎都花在这些对象上；这里每个节点只占十几个字节。
+解析、升级和 ID 分配都在 NodeStore 上进行，JSON 只在保存时由 write_json 逐节点写出，
+与 json.dump(data, f, ensure_ascii=False, indent=2) 的输出逐字节一致（compact=True 时为无缩进的紧凑格式）
+"""
+
+import re
+from array import array
+from json.encoder import encode_basestring
+
+# side 编码，0 表示尚未分配
+SIDES = (None, 'center', 'left', 'right')
+CENTER = 1
+LEFT = 2
+RIGHT = 3
+
+# 解析器生成的 ID 格式（序号不带前导零）
+_PARSER_ID = re.compile(r'root_(0|[1-9][0-9]*)((?:_child_(?:0|[1-9][0-9]*))*)')
+
+# write_json 每攒够这么多片段写一次文件
+_WRITE_BATCH = 4096
+
+
+class NodeStore:
+    """先序并行数组表示的森林（见模块说明）"""
+    
+    __slots__ = ('depth', 'next_sibling', 'side', 'ids', 'labels', 'removed', '_pool', '_ends', '_open')
+    
+    def __init__(self):
+        self.depth = array('i')
+        self.next_sibling = array('i')
+        self.side = bytearray()
+        # 稀疏的覆盖项：显式 ID、合并后的标签、被合并掉的节点
+        self.ids = {}
+        self.labels = {}
+        self.removed = set()
+        self._pool = bytearray()
+        self._ends = array('q')
+        # 每一层最近添加、子树尚未结束的节点（append 用来连接兄弟节点）
+        self._open = []
+    
+    @classmethod
+    def from_outline(cls, entries):
+        """
+        由 (缩进级别, 标签) 序列建树，规则与解析器原来的节点栈相同：
+        弹出缩进级别大于等于当前行的节点后，当前行成为栈顶节点的子节点（栈空时为根节点）
+        """
+        store = cls()
+        levels = []
+        for indent_level, label in entries:
+            while levels and levels[-1] >= indent_level:
+                levels.pop()
+            store.append(len(levels), label)
+            levels.append(indent_level)
+        return store
+    
+    def append(self, depth, label):
+        """按先序追加一个节点（depth 最多比上一个节点深一层），返回节点编号"""
+        index = len(self.depth)
+        open_nodes = self._open
+        if depth < len(open_nodes):
+            self.next_sibling[open_nodes[depth]] = index
+            del open_nodes[depth:]
+        elif depth > len(open_nodes):
+            raise ValueError(f"节点深度 {depth} 跳过了中间层级")
+        open_nodes.append(index)
+        self.depth.append(depth)
+        self.next_sibling.append(-1)
+        self.side.append(0)
+        self._pool += label.encode('utf-8')
+        self._ends.append(len(self._pool))
+        return index
+    
+    def __len__(self):
+        return len(self.depth)
+    
+    def node_count(self):
+        """未被合并掉的节点数"""
+        return len(self.depth) - len(self.removed)
+    
+    def label(self, index):
+        if index in self.labels:
+            return self.labels[index]
+        start = self._ends[index - 1] if index else 0
+        return self._pool[start:self._ends[index]].decode('utf-8')
+    
+    def has_children(self, index):
+        return index + 1 < len(self.depth) and self.depth[index + 1] > self.depth[index]
+    
+    def _siblings_from(self, first):
+        result = []
+        node = first
+        while node != -1:
+            result.append(node)
+            node = self.next_sibling[node]
+        return result
+    
+    def roots(self):
+        """根节点编号列表"""
+        return self._siblings_from(0 if self.depth else -1)
+    
+    def children(self, index):
+        """子节点编号列表（原始顺序，包括被合并掉的节点）"""
+        return self._siblings_from(index + 1 if self.has_children(index) else -1)
+    
+    def find_parser_id(self, node_id):
+        """解析器 ID 对应的节点编号；不是解析器 ID 格式或树中没有这个节点时返回 -1"""
+        match = _PARSER_ID.fullmatch(node_id)
+        if not match:
+            return -1
+        path = [int(match.group(1))] + [int(k) for k in match.group(2).split('_child_')[1:]]
+        node = 0 if self.depth else -1
+        for depth, child_index in enumerate(path):
+            if depth:
+                node = node + 1 if self.has_children(node) else -1
+            for _ in range(child_index):
+                if node == -1:
+                    break
+                node = self.next_sibling[node]
+            if node == -1:
+                return -1
+        return node
+    
+    def iter_nodes(self):
+        """
+        按先序产出未被合并掉的节点 (编号, 深度, id, 标签, side)
+        
+        没有显式 ID 的节点使用解析器 ID：根节点 root_{序号}，其余为 {父节点解析器 ID}_child_{原始序号}
+        （序号按解析时的兄弟顺序计算，被合并掉的节点也占序号）
+        """
+        depth_of = self.depth
+        ids = self.ids
+        removed = self.removed
+        side_of = self.side
+        parser_ids = []
+        child_counts = []
+        root_count = 0
+        for index in range(len(depth_of)):
+            depth = depth_of[index]
+            del parser_ids[depth:]
+            del child_counts[depth:]
+            if depth:
+                parser_id = f"{parser_ids[-1]}_child_{child_counts[-1]}"
+                child_counts[-1] += 1
+            else:
+                parser_id = f"root_{root_count}"
+                root_count += 1
+            parser_ids.append(parser_id)
+            child_counts.append(0)
+            if index not in removed:
+                yield index, depth, ids.get(index, parser_id), self.label(index), SIDES[side_of[index]]
+    
+    def assign_sides(self):
+        """
+        按 upgrade_to_mindmap_format 的规则分配 side（不合并断行、不改 ID）：
+        根节点 center，一级节点按序号平分左右，更深的节点继承父节点
+        """
+        depth_of = self.depth
+        side_of = self.side
+        branch_side = CENTER
+        child_index = 0
+        child_count = 0
+        for index in range(len(depth_of)):
+            depth = depth_of[index]
+            if depth == 0:
+                side = CENTER
+                child_index = 0
+                child_count = len(self.children(index))
+            elif depth == 1:
+                side = LEFT if child_index < child_count / 2 else RIGHT
+                child_index += 1
+                branch_side = side
+            else:
+                side = branch_side
+            side_of[index] = side
+    
+    def count_duplicate_ids(self):
+        """重复的 ID 个数（同一 ID 第二次及以后出现的次数）"""
+        seen = set()
+        duplicates = 0
+        for _, _, node_id, _, _ in self.iter_nodes():
+            if node_id in seen:
+                duplicates += 1
+            else:
+                seen.add(node_id)
+        return duplicates
+    
+    def _build_dicts(self, make_node):
+        roots = []
+        outputs = [roots]
+        for _, depth, node_id, label, side in self.iter_nodes():
+            del outputs[depth + 1:]
+            children = []
+            outputs[depth].append(make_node(node_id, label, side, children))
+            outputs.append(children)
+        return roots
+    
+    def to_title_dicts(self):
+        """解析器原来的输出形式：[{id, title, children}, ...]"""
+        return self._build_dicts(lambda node_id, label, side, children: {
+            "id": node_id,
+            "title": label,
+            "children": children
+        })
+    
+    def to_mindmap(self):
+        """最终的思维导图形式：[{id, label, side, children}, ...]"""
+        return self._build_dicts(lambda node_id, label, side, children: {
+            'id': node_id,
+            'label': label,
+            'side': side,
+            'children': children
+        })
+    
+    def write_json(self, f, compact=False):
+        """
+        把 to_mindmap() 的结果写入文本文件 f，与 json.dump(..., ensure_ascii=False, indent=2) 逐字节一致；
+        compact 为真时不缩进，与 json.dump(..., ensure_ascii=False, separators=(',', ':')) 逐字节一致
+        """
+        if compact:
+            self._write_compact(f)
+            return
+        parts = []
+        previous = -1
+        for _, depth, node_id, label, side in self.iter_nodes():
+            if depth > previous:
+                # 打开根列表，或上一个节点的 children 列表
+                parts.append('[\n')
+            else:
+                # 上一个节点没有子节点；关闭它和它那些已经结束的祖先，再接同层的下一个节点
+                parts.append(_close_nodes(previous, depth))
+                parts.append(',\n')
+            pad = ' ' * (2 + 4 * depth)
+            side_json = 'null' if side is None else encode_basestring(side)
+            parts.append(f'{pad}{{\n'
+                         f'{pad}  "id": {encode_basestring(node_id)},\n'
+                         f'{pad}  "label": {encode_basestring(label)},\n'
+                         f'{pad}  "side": {side_json},\n'
+                         f'{pad}  "children": ')
+            previous = depth
+            if len(parts) >= _WRITE_BATCH:
+                f.write(''.join(parts))
+                parts.clear()
+        if previous == -1:
+            parts.append('[]')
+        else:
+            parts.append(_close_nodes(previous, 0))
+            parts.append('\n]')
+        f.write(''.join(parts))
+    
+    def _write_compact(self, f):
+        """write_json 的无缩进版本：叶子节点以 []} 结束，每个结束的祖先再补 ]}"""
+        parts = []
+        previous = -1
+        for _, depth, node_id, label, side in self.iter_nodes():
+            if depth > previous:
+                parts.append('[')
+            else:
+                parts.append('[]}' + ']}' * (previous - depth) + ',')
+            side_json = 'null' if side is None else encode_basestring(side)
+            parts.append(f'{{"id":{encode_basestring(node_id)},"label":{encode_basestring(label)},'
+                         f'"side":{side_json},"children":')
+            previous = depth
+            if len(parts) >= _WRITE_BATCH:
+                f.write(''.join(parts))
+                parts.clear()
+        if previous == -1:
+            parts.append('[]')
+        else:
+            parts.append('[]}' + ']}' * previous + ']')
+        f.write(''.join(parts))
+
+
+def _close_nodes(depth, stop_depth):
+    """关闭深度为 depth 的叶子节点，以及深度 stop_depth ~ depth-1 上的祖先（它们的 children 列表和对象本身）"""
+    closing = '[]\n' + ' ' * (2 + 4 * depth) + '}'
+    for level in range(depth - 1, stop_depth - 1, -1):
+        closing += '\n' + ' ' * (4 + 4 * level) + ']\n' + ' ' * (2 + 4 * level) + '}'
+    return closing
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+输出文件的预压缩与体积报告（--compact / --size-report）
+
+--compact 模式下转换脚本写出无缩进的 JSON，并在旁边生成最高压缩级别的预压缩文件：
+- X.json.gz: gzip 级别 9（头部 mtime 固定为 0，同一输入的压缩结果逐字节相同，--check-stable 照常通过）
+- X.json.br: brotli 质量 11（需要 pip install brotli；未安装时只生成 .gz）
+
+API 或 CDN 按请求的 Accept-Encoding 直接返回预压缩的字节，不必在每次请求时压缩。
+压缩以 1 MB 为单位流式进行，不把整个 JSON 读入内存
+"""
+
+import gzip
+import json
+import os
+from pathlib import Path
+
+from json_backend import dumps as dumps_json
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+_CHUNK_SIZE = 1 << 20
+
+
+def sibling_paths(json_path):
+    """返回 (.gz 路径, .br 路径)"""
+    json_path = Path(json_path)
+    return json_path.with_name(json_path.name + '.gz'), json_path.with_name(json_path.name + '.br')
+
+
+def _write_gzip(source, target):
+    with open(source, 'rb') as src, open(target, 'wb') as raw:
+        # 不写入文件名和修改时间，压缩结果只取决于内容
+        with gzip.GzipFile(filename='', mode='wb', compresslevel=GZIP_LEVEL, fileobj=raw, mtime=0) as dst:
+            for chunk in iter(lambda: src.read(_CHUNK_SIZE), b''):
+                dst.write(chunk)
+
+
+def _write_brotli(source, target):
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    with open(source, 'rb') as src, open(target, 'wb') as dst:
+        for chunk in iter(lambda: src.read(_CHUNK_SIZE), b''):
+            dst.write(compressor.process(chunk))
+        dst.write(compressor.finish())
+
+
+def write_precompressed(json_path):
+    """
+    生成 json_path 的 .gz（以及安装了 brotli 时的 .br）预压缩文件，返回 {'gzip': 字节数, 'brotli': 字节数或 None}；
+    未安装 brotli 时删除旧的 .br，避免留下与 JSON 不一致的文件
+    """
+    gz_path, br_path = sibling_paths(json_path)
+    _write_gzip(json_path, gz_path)
+    sizes = {'gzip': os.path.getsize(gz_path), 'brotli': None}
+    if brotli is not None:
+        _write_brotli(json_path, br_path)
+        sizes['brotli'] = os.path.getsize(br_path)
+    elif br_path.exists():
+        br_path.unlink()
+    return sizes
+
+
+def remove_precompressed(json_path):
+    """删除 json_path 的预压缩文件（以普通模式重新生成 JSON 后，旧的预压缩文件已经过期）"""
+    for path in sibling_paths(json_path):
+        if path.exists():
+            path.unlink()
+
+
+def refresh_precompressed(json_path):
+    """
+    转换流程之外改写 JSON 的工具（修复 ID、升级格式）保存后调用：原来有预压缩文件时按新内容重新生成，
+    否则什么也不做（API 优先返回预压缩文件，不能留下旧内容）。返回是否重新生成
+    """
+    if any(path.exists() for path in sibling_paths(json_path)):
+        write_precompressed(json_path)
+        return True
+    return False
+
+
+def precompressed_up_to_date(json_path):
+    """预压缩文件是否齐全且不早于 JSON（增量构建判断 --compact 的输出是否可以沿用）"""
+    json_mtime = os.path.getmtime(json_path)
+    gz_path, br_path = sibling_paths(json_path)
+    required = [gz_path] + ([br_path] if brotli is not None else [])
+    return all(path.exists() and os.path.getmtime(path) >= json_mtime for path in required)
+
+
+def measure_output(json_path):
+    """
+    统计一个输出文件各种形式的字节数：
+    pretty（indent=2）、minified（无缩进）、gzip / brotli（预压缩文件，不存在时为 None）
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    gz_path, br_path = sibling_paths(json_path)
+    return {
+        'file': Path(json_path).name,
+        'pretty': len(dumps_json(data).encode('utf-8')),
+        'minified': len(dumps_json(data, compact=True).encode('utf-8')),
+        'gzip': os.path.getsize(gz_path) if gz_path.exists() else None,
+        'brotli': os.path.getsize(br_path) if br_path.exists() else None,
+    }
+
+
+def _percent(size, pretty):
+    if size is None or not pretty:
+        return '-'
+    return f"{size / pretty * 100:.1f}%"
+
+
+def print_size_report(rows):
+    """打印每个章节 pretty / minified / gzip / brotli 的字节数及相对 pretty 的比例"""
+    print(f"{'文件':<44} {'pretty':>10} {'minified':>10} {'gzip':>10} {'brotli':>10}  minified / gzip / brotli")
+    totals = {'pretty': 0, 'minified': 0, 'gzip': 0, 'brotli': 0}
+    for row in rows:
+        cells = [f"{row[key]:>10}" if row[key] is not None else f"{'-':>10}"
+                 for key in ('pretty', 'minified', 'gzip', 'brotli')]
+        ratios = ' / '.join(_percent(row[key], row['pretty']) for key in ('minified', 'gzip', 'brotli'))
+        print(f"{row['file']:<44} {' '.join(cells)}  {ratios}")
+        for key in totals:
+            if totals[key] is not None:
+                totals[key] = None if row[key] is None else totals[key] + row[key]
+    if len(rows) > 1:
+        cells = [f"{totals[key]:>10}" if totals[key] is not None else f"{'-':>10}"
+                 for key in ('pretty', 'minified', 'gzip', 'brotli')]
+        ratios = ' / '.join(_percent(totals[key], totals['pretty']) for key in ('minified', 'gzip', 'brotli'))
+        print(f"{'合计':<44} {' '.join(cells)}  {ratios}")
+    if brotli is None:
+        print("   ℹ️  未安装 brotli（pip install brotli），--compact 只生成 .json.gz")
+
+
+def write_size_report(path, rows):
+    """把体积报告写成 JSON"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'gzip_level': GZIP_LEVEL, 'brotli_quality': BROTLI_QUALITY if brotli is not None else None,
+                   'files': rows}, f, ensure_ascii=False, indent=2)
+
+
+def report_sizes(json_paths, report_path=None):
+    """统计并打印 json_paths 的体积报告，report_path 不为空时另存为 JSON"""
+    rows = [measure_output(path) for path in json_paths if os.path.exists(path)]
+    if not rows:
+        return
+    print_size_report(rows)
+    if report_path:
+        write_size_report(report_path, rows)
+        print(f"📏 体积报告已保存: {report_path}")
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF 提取引擎
+每个引擎逐页产出 (x0, text) 行列表，行分组统一交给 line_grouping；
+引擎之间只在"如何拿到每个字符的 text / x0 / y0"上不同：
+
+- pdfplumber: 原有实现，通过 page.chars 取字符（每个字符一个 dict，属性最全，最慢）
+- pdfminer:   直接接管 pdfminer 的 render_char 回调，只记录 text / x0 / y0 三个值，
+              不构造 LTChar 布局对象和字符 dict；坐标与 pdfplumber 完全一致
+- pdfium:     使用 pypdfium2 的文本页（可选依赖），速度最快；
+              字符框由 PDFium 计算，x0 / y0 与 pdfminer 系略有差异
+
+引擎以名字选择（get_engine），名字可以跨进程传递，进程池 worker 里按名字重新构造引擎
+"""
+
+import pdfplumber
+from pdfminer.converter import PDFLayoutAnalyzer
+from pdfminer.layout import LTChar
+from pdfminer.pdfdocument import PDFDocument
+from pdfminer.pdffont import PDFUnicodeNotDefined
+from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+from pdfminer.pdfpage import PDFPage
+from pdfminer.pdfparser import PDFParser
+from pdfminer.utils import apply_matrix_rect
+
+try:
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
+except ImportError:
+    pdfium = None
+
+from line_grouping import DEFAULT_Y_TOLERANCE, group_chars_into_lines, group_page_chars
+
+DEFAULT_ENGINE = 'pdfplumber'
+
+
+def extract_page_lines(page, y_tolerance=DEFAULT_Y_TOLERANCE):
+    """从单个 pdfplumber 页面提取 (x0, text) 行列表"""
+    page_lines = []
+    chars = page.chars
+    
+    if not chars:
+        text = page.extract_text()
+        if text:
+            for line in text.split('\n'):
+                page_lines.append((0, line))
+        return page_lines
+    
+    return group_page_chars(chars, y_tolerance)
+
+
+class PdfplumberEngine:
+    """pdfplumber 引擎（默认）"""
+    
+    name = 'pdfplumber'
+
+    def count_pages(self, pdf_path):
+        with pdfplumber.open(pdf_path) as pdf:
+            return len(pdf.pages)
+
+    def iter_pages(self, pdf_path, page_numbers=None, y_tolerance=DEFAULT_Y_TOLERANCE):
+        with pdfplumber.open(pdf_path) as pdf:
+            if page_numbers is None:
+                page_numbers = range(len(pdf.pages))
+            for i in page_numbers:
+                page = pdf.pages[i]
+                try:
+                    yield extract_page_lines(page, y_tolerance)
+                finally:
+                    # 只保留提取出的文本行，释放该页缓存的字符和布局对象
+                    page.close()
+
+
+class _GlyphCollector(PDFLayoutAnalyzer):
+    """
+    只收集字符 text / x0 / y0 的 pdfminer 设备
+    
+    坐标计算与 LTChar 相同（横排字体直接算 bbox 左下角，竖排字体退回 LTChar），
+    不把字符加入布局树，也不做版面分析
+    """
+
+    def __init__(self, rsrcmgr):
+        super().__init__(rsrcmgr, laparams=None)
+        self.reset(0)
+
+    def reset(self, x_offset):
+        # pdfminer 的坐标以 mediabox 左下角为原点，pdfplumber 会把 mediabox 的 x0 加回来
+        self.x_offset = x_offset
+        self.texts = []
+        self.xs = []
+        self.ys = []
+
+    def render_char(self, matrix, font, fontsize, scaling, rise, cid, ncs, graphicstate):
+        try:
+            text = font.to_unichr(cid)
+        except PDFUnicodeNotDefined:
+            text = self.handle_undefined_char(font, cid)
+        textwidth = font.char_width(cid)
+        adv = textwidth * fontsize * scaling
+        
+        if font.is_vertical():
+            item = LTChar(matrix, font, fontsize, scaling, rise, text, textwidth,
+                          font.char_disp(cid), ncs, graphicstate)
+            x0, y0 = item.x0, item.y0
+        else:
+            descent = font.get_descent() * fontsize
+            x0, y0, _, _ = apply_matrix_rect(matrix, (0, descent + rise, adv, descent + rise + fontsize))
+        
+        self.texts.append(text)
+        self.xs.append(x0 + self.x_offset)
+        self.ys.append(y0)
+        return adv
+
+    def receive_layout(self, ltpage):
+        pass
+
+
+class PdfminerEngine:
+    """直接基于 pdfminer 解释器的精简引擎，输出与 pdfplumber 引擎一致"""
+    
+    name = 'pdfminer'
+
+    def count_pages(self, pdf_path):
+        with open(pdf_path, 'rb') as f:
+            return sum(1 for _ in PDFPage.create_pages(PDFDocument(PDFParser(f))))
+
+    def iter_pages(self, pdf_path, page_numbers=None, y_tolerance=DEFAULT_Y_TOLERANCE):
+        wanted = None if page_numbers is None else list(page_numbers)
+        with open(pdf_path, 'rb') as f:
+            document = PDFDocument(PDFParser(f))
+            rsrcmgr = PDFResourceManager(caching=True)
+            device = _GlyphCollector(rsrcmgr)
+            interpreter = PDFPageInterpreter(rsrcmgr, device)
+            
+            if wanted is None:
+                pages = PDFPage.create_pages(document)
+            else:
+                # page_numbers 可以乱序或重复，先按页码取出需要的页面
+                all_pages = list(PDFPage.create_pages(document))
+                pages = (all_pages[i] for i in wanted)
+            
+            for page in pages:
+                device.reset(page.mediabox[0])
+                interpreter.process_page(page)
+                if device.texts:
+                    yield group_chars_into_lines(device.texts, device.xs, device.ys, y_tolerance)
+                else:
+                    yield []
+
+
+class PdfiumEngine:
+    """pypdfium2 引擎：PDFium 的 C 实现解析文本页"""
+    
+    name = 'pdfium'
+
+    def count_pages(self, pdf_path):
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            return len(pdf)
+        finally:
+            pdf.close()
+
+    def iter_pages(self, pdf_path, page_numbers=None, y_tolerance=DEFAULT_Y_TOLERANCE):
+        pdf = pdfium.PdfDocument(pdf_path)
+        try:
+            if page_numbers is None:
+                page_numbers = range(len(pdf))
+            for i in page_numbers:
+                page = pdf[i]
+                textpage = page.get_textpage()
+                try:
+                    yield self._page_lines(textpage, y_tolerance)
+                finally:
+                    textpage.close()
+                    page.close()
+        finally:
+            pdf.close()
+
+    @staticmethod
+    def _page_lines(textpage, y_tolerance):
+        texts, xs, ys = [], [], []
+        raw = textpage.raw
+        for i in range(textpage.count_chars()):
+            # 跳过 PDFium 为换行 / 词间距补出来的字符，只保留内容流里真实绘制的字形
+            if pdfium_c.FPDFText_IsGenerated(raw, i):
+                continue
+            text = chr(pdfium_c.FPDFText_GetUnicode(raw, i))
+            if text in '\r\n':
+                continue
+            left, bottom, _, _ = textpage.get_charbox(i, loose=True)
+            texts.append(text)
+            xs.append(left)
+            ys.append(bottom)
+        if not texts:
+            return []
+        return group_chars_into_lines(texts, xs, ys, y_tolerance)
+
+
+ENGINES = {engine.name: engine for engine in (PdfplumberEngine, PdfminerEngine, PdfiumEngine)}
+
+
+def available_engines():
+    """当前环境可用的引擎名（pdfium 需要安装 pypdfium2）"""
+    return [name for name in ENGINES if name != 'pdfium' or pdfium is not None]
+
+
+def get_engine(name=DEFAULT_ENGINE):
+    """按名字构造引擎"""
+    if name not in ENGINES:
+        raise ValueError(f"未知的提取引擎: {name}（可选: {', '.join(ENGINES)}）")
+    if name not in available_engines():
+        raise ValueError(f"提取引擎 {name} 不可用，请运行: pip install pypdfium2")
+    return ENGINES[name]()
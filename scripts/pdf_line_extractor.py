@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+PDF 文本行提取
+逐页提取 (x0, text) 行，保留缩进信息；
+长文档可以把页面分配到多个进程并行提取，结果按页码顺序拼接，与串行结果完全一致；
+传入 LineCache 时整份文档和每一页的提取结果都会缓存到磁盘，
+文档只改动了个别页面时，只有这些页面需要重新提取；
+流式模式逐页产出文本行，处理完的页面立即释放 pdfplumber 缓存的字符对象；
+字符来源由提取引擎决定（见 pdf_engines），默认 pdfplumber
+"""
+
+import hashlib
+import itertools
+import math
+from concurrent.futures import ProcessPoolExecutor
+
+import pdfplumber
+from pdfminer.pdftypes import PDFObjRef, PDFStream
+from pdfminer.psparser import PSKeyword, PSLiteral
+
+from build_manifest import code_fingerprint
+import line_grouping
+from line_grouping import DEFAULT_Y_TOLERANCE
+from indent_columns import DEFAULT_COLUMN_GAP, IndentColumns
+import pdf_engines
+from pdf_engines import DEFAULT_ENGINE, get_engine
+
+# 提取行为变化（而源码指纹覆盖不到，例如升级 pdfplumber）时手动递增，使缓存失效
+EXTRACTOR_VERSION = '2'
+
+
+def extract_pages(pdf_path, page_numbers, y_tolerance=DEFAULT_Y_TOLERANCE, engine=DEFAULT_ENGINE):
+    """
+    独立打开 PDF 并提取指定页（0 起始页码）
+    
+    返回与 page_numbers 一一对应的每页行列表；作为进程池 worker 使用
+    """
+    return list(get_engine(engine).iter_pages(pdf_path, page_numbers, y_tolerance))
+
+
+def count_pages(pdf_path, engine=DEFAULT_ENGINE):
+    """返回 PDF 页数"""
+    return get_engine(engine).count_pages(pdf_path)
+
+
+def split_into_chunks(page_numbers, jobs, chunks_per_job=2):
+    """将页码切成连续的小块，块数约为 jobs * chunks_per_job，便于负载均衡"""
+    if not page_numbers:
+        return []
+    chunk_size = max(1, math.ceil(len(page_numbers) / (jobs * chunks_per_job)))
+    return [page_numbers[i:i + chunk_size] for i in range(0, len(page_numbers), chunk_size)]
+
+
+def _feed_pdf_object(digest, obj, memo):
+    """把 PDF 对象按稳定的方式写入哈希；间接对象按 objid 记忆，共享的字体等资源只哈希一次"""
+    if isinstance(obj, PDFObjRef):
+        objid = obj.objid
+        if objid not in memo:
+            memo[objid] = b'cycle'  # 占位，防止循环引用
+            sub = hashlib.sha256()
+            _feed_pdf_object(sub, obj.resolve(), memo)
+            memo[objid] = sub.digest()
+        digest.update(b'R')
+        digest.update(memo[objid])
+    elif isinstance(obj, PDFStream):
+        digest.update(b'S')
+        _feed_pdf_object(digest, obj.attrs, memo)
+        data = obj.rawdata if obj.rawdata is not None else obj.get_data()
+        digest.update(len(data).to_bytes(8, 'little'))
+        digest.update(data)
+    elif isinstance(obj, dict):
+        digest.update(b'{')
+        for key in sorted(obj, key=str):
+            digest.update(str(key).encode('utf-8') + b'=')
+            _feed_pdf_object(digest, obj[key], memo)
+        digest.update(b'}')
+    elif isinstance(obj, (list, tuple)):
+        digest.update(b'[')
+        for item in obj:
+            _feed_pdf_object(digest, item, memo)
+        digest.update(b']')
+    elif isinstance(obj, (PSLiteral, PSKeyword)):
+        digest.update(b'/' + repr(obj.name).encode('utf-8'))
+    elif isinstance(obj, bytes):
+        digest.update(b'b' + len(obj).to_bytes(8, 'little') + obj)
+    else:
+        digest.update(repr(obj).encode('utf-8'))
+
+
+def page_fingerprint(page_obj, memo):
+    """
+    页面指纹：内容流 + 资源（字体、XObject 等）+ 页面框和旋转角度
+    
+    这些都不变时页面的提取结果也不变
+    """
+    digest = hashlib.sha256()
+    _feed_pdf_object(digest, [page_obj.mediabox, page_obj.cropbox, page_obj.rotate], memo)
+    _feed_pdf_object(digest, page_obj.resources, memo)
+    _feed_pdf_object(digest, page_obj.contents, memo)
+    return digest.hexdigest()
+
+
+def page_fingerprints(pdf_path):
+    """计算文档中每一页的指纹"""
+    memo = {}
+    with pdfplumber.open(pdf_path) as pdf:
+        return [page_fingerprint(page.page_obj, memo) for page in pdf.pages]
+
+
+def extractor_version(y_tolerance=DEFAULT_Y_TOLERANCE, engine=DEFAULT_ENGINE):
+    """
+    缓存使用的提取器版本：手动版本号 + 引擎名 + 源码指纹 + 基线容差
+    指纹覆盖整个 pdf_engines 模块（字符坐标由模块级的 _GlyphCollector 等计算，不只在引擎类里）
+    和整个 line_grouping 模块（_group_numpy / _group_python / group_page_chars）
+    """
+    fingerprint = code_fingerprint(pdf_engines, line_grouping)[:8]
+    return f"{EXTRACTOR_VERSION}.{engine}.{fingerprint}.y{y_tolerance:g}"
+
+
+def extract_lines_by_page(pdf_path, jobs=1, page_numbers=None, cache=None,
+                          y_tolerance=DEFAULT_Y_TOLERANCE, engine=DEFAULT_ENGINE):
+    """
+    提取每页的 (x0, text) 行，返回按页码顺序排列的列表的列表
+    
+    Args:
+        pdf_path: PDF 文件路径
+        jobs: 并行进程数，<= 1 时串行提取
+        page_numbers: 要提取的页码（0 起始），默认全部页面
+        cache: LineCache 实例；只在提取整份文档时使用
+        y_tolerance: 同一行字符基线的最大差值（pt）
+        engine: 提取引擎名（pdf_engines.ENGINES）
+    """
+    if cache is not None and page_numbers is None:
+        return _extract_with_cache(pdf_path, jobs, cache, y_tolerance, engine)
+    
+    if page_numbers is None:
+        page_numbers = list(range(count_pages(pdf_path, engine)))
+    else:
+        page_numbers = list(page_numbers)
+    
+    if jobs <= 1 or len(page_numbers) < 2:
+        return extract_pages(pdf_path, page_numbers, y_tolerance, engine)
+    
+    chunks = split_into_chunks(page_numbers, jobs)
+    pages = []
+    with ProcessPoolExecutor(max_workers=min(jobs, len(chunks))) as pool:
+        # map 按提交顺序返回，保证页面顺序
+        for chunk_lines in pool.map(extract_pages, [pdf_path] * len(chunks), chunks,
+                                    [y_tolerance] * len(chunks), [engine] * len(chunks)):
+            pages.extend(chunk_lines)
+    return pages
+
+
+def _extract_with_cache(pdf_path, jobs, cache, y_tolerance, engine):
+    """
+    先查整份文档的缓存；未命中时按页面指纹逐页查缓存，只提取改动过的页面
+    
+    命中 / 未命中的页数累计到 cache.page_hits / cache.page_misses
+    """
+    version = extractor_version(y_tolerance, engine)
+    key = cache.key_for(pdf_path, version)
+    pages = cache.get(key)
+    if pages is not None:
+        cache.page_hits += len(pages)
+        return pages
+    
+    page_keys = [f"p-{fingerprint}-{version}" for fingerprint in page_fingerprints(pdf_path)]
+    pages = []
+    for page_key in page_keys:
+        cached = cache.get(page_key)
+        pages.append(cached[0] if cached is not None else None)
+    
+    missing = [i for i, page_lines in enumerate(pages) if page_lines is None]
+    if missing:
+        for i, page_lines in zip(missing, extract_lines_by_page(pdf_path, jobs, missing,
+                                                                  y_tolerance=y_tolerance,
+                                                                  engine=engine)):
+            pages[i] = page_lines
+            cache.put(page_keys[i], [page_lines], evict=False)
+    
+    cache.page_hits += len(pages) - len(missing)
+    cache.page_misses += len(missing)
+    cache.put(key, pages)
+    return pages
+
+
+def _count_page(stats, page_lines):
+    """把一页的页数 / 行数 / 字符数（行文本长度之和）累加到 stats"""
+    stats['pages'] = stats.get('pages', 0) + 1
+    stats['lines'] = stats.get('lines', 0) + len(page_lines)
+    stats['chars'] = stats.get('chars', 0) + sum(len(text) for _, text in page_lines)
+
+
+def extract_lines(pdf_path, jobs=1, page_numbers=None, cache=None, y_tolerance=DEFAULT_Y_TOLERANCE,
+                  engine=DEFAULT_ENGINE, stats=None):
+    """
+    提取整个文档的 (x0, text) 行列表（各页按顺序拼接）
+    
+    stats 为 dict 时累加 pages / lines / chars 计数（供 --profile 使用）
+    """
+    lines_with_position = []
+    for page_lines in extract_lines_by_page(pdf_path, jobs, page_numbers, cache, y_tolerance, engine):
+        lines_with_position.extend(page_lines)
+        if stats is not None:
+            _count_page(stats, page_lines)
+    return lines_with_position
+
+
+def iter_page_lines(pdf_path, y_tolerance=DEFAULT_Y_TOLERANCE, engine=DEFAULT_ENGINE, stats=None):
+    """逐页产出 (x0, text) 行列表；每页处理完后释放该页缓存的字符和布局对象"""
+    pages = get_engine(engine).iter_pages(pdf_path, y_tolerance=y_tolerance)
+    if stats is None:
+        return pages
+    return _counted(pages, stats)
+
+
+def _counted(pages, stats):
+    """逐页透传，同时累加计数"""
+    for page_lines in pages:
+        _count_page(stats, page_lines)
+        yield page_lines
+
+
+def iter_lines(pdf_path, y_tolerance=DEFAULT_Y_TOLERANCE, engine=DEFAULT_ENGINE, stats=None):
+    """逐行产出 (x0, text)"""
+    for page_lines in iter_page_lines(pdf_path, y_tolerance, engine, stats):
+        yield from page_lines
+
+
+def open_line_stream(pdf_path, calibration='two-pass', sample_pages=3,
+                     column_gap=DEFAULT_COLUMN_GAP, y_tolerance=DEFAULT_Y_TOLERANCE,
+                     engine=DEFAULT_ENGINE, stats=None):
+    """
+    为流式解析准备缩进列模型和文本行迭代器，返回 (indent_model, lines)
+    
+    缩进列需要在解析前确定，两种标定方式：
+    - 'two-pass': 先完整扫描一遍只收集行首 x 坐标，再流式产出文本行；
+      结果与一次性提取完全一致，代价是 PDF 要解析两遍
+    - 'sample': 只用前 sample_pages 页标定（这些页的行先缓存下来再产出），
+      PDF 只解析一遍；后续页面出现新的缩进位置时级别按插入位置计算，可能与完整标定不同
+    
+    stats 为 dict 时，产出的文本行按页累加 pages / lines / chars 计数（two-pass 的标定扫描不计入）
+    """
+    if calibration == 'two-pass':
+        x_positions = [x for x, _ in iter_lines(pdf_path, y_tolerance, engine) if x > 0]
+        return IndentColumns(x_positions, column_gap), iter_lines(pdf_path, y_tolerance, engine, stats)
+    
+    if calibration == 'sample':
+        pages = iter_page_lines(pdf_path, y_tolerance, engine, stats)
+        sampled = [line for page_lines in itertools.islice(pages, sample_pages) for line in page_lines]
+        rest = (line for page_lines in pages for line in page_lines)
+        return IndentColumns.from_lines(sampled, column_gap), itertools.chain(sampled, rest)
+    
+    raise ValueError(f"未知的标定方式: {calibration}")
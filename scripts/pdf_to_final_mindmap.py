@@ -5,14 +5,15 @@
 从 PDF → 最终格式化的 JSON（包含 id、label、side，且 ID 唯一）
 
 流程：
-1. 从 PDF 提取文本和层级结构
-2. 生成初始 JSON（title 格式）
-3. 升级数据格式（title → label，添加 id、side）
-4. 修复重复 ID
-5. 验证最终数据
+1. 从 PDF 提取文本
+2. 解析层级结构，生成初始 JSON（title 格式）
+3. 规范化：升级数据格式（title → label，添加 id、side）、修复重复 ID、验证，一次遍历完成
+4. 保存
 """
 
-import json
+import argparse
+import copy
+import functools
 import os
 import re
 import sys
@@ -30,118 +31,82 @@ except ImportError:
     print("请运行: pip install pdfplumber")
     sys.exit(1)
 
-# 导入升级模块
-from upgrade_mindmap_data import upgrade_mindmap_data, slugify
+# 导入规范化模块
+from mindmap_normalizer import normalize_store
+from id_allocator import IdAllocator, stable_hash
+from node_store import NodeStore
+from output_encoding import remove_precompressed, report_sizes, write_precompressed
+from shard_output import DEFAULT_SHARD_BYTES, DEFAULT_SKELETON_DEPTH, remove_shards, write_shards
+from tree_layout import remove_layout, write_layout
+from tree_walk import join_path, walk, walk_subtree
+from pdf_line_extractor import extract_lines, open_line_stream
+from line_grouping import DEFAULT_Y_TOLERANCE
+from indent_columns import DEFAULT_COLUMN_GAP, IndentColumns
+from line_cache import LineCache
+from pdf_engines import DEFAULT_ENGINE, ENGINES
+from stable_check import check_stable
+from stage_profiler import FileProfile, build_report, dump_cprofile, print_summary, profile_stage, write_report
 
 # 修复重复 ID 的函数（内联，避免导入问题）
 def fix_node_ids(node, parent_id=None, used_ids=None, path=""):
-    """递归修复节点 ID，确保唯一性"""
+    """修复节点及其子孙的 ID，确保唯一性（显式栈遍历）；返回改名的节点数（ID 冲突次数）"""
+    # used_ids 为 IdAllocator；传入普通集合时包装为共享该集合的 IdAllocator
     if used_ids is None:
-        used_ids = set()
+        used_ids = IdAllocator()
+    elif not isinstance(used_ids, IdAllocator):
+        used_ids = IdAllocator(used_ids)
+    renamed = 0
     
-    current_id = node.get('id', '')
-    current_path = f"{path}/{current_id}" if path else current_id
-    
-    # 如果 ID 已存在，添加父节点前缀使其唯一
-    if current_id in used_ids:
-        if parent_id:
-            new_id = f"{parent_id}-{current_id}"
-        else:
-            # 根节点冲突，使用路径
-            new_id = f"{current_id}-{hash(current_path) % 10000}"
+    def enter(node, context, index, count):
+        nonlocal renamed
+        parent_id, path = context
+        current_id = node.get('id', '')
+        # 路径按改名前的 ID 记录为链表，只有根节点冲突时才拼成字符串
+        current_path = (path, current_id)
         
-        # 确保新 ID 也是唯一的
-        suffix = 1
-        original_new_id = new_id
-        while new_id in used_ids:
-            new_id = f"{original_new_id}-{suffix}"
-            suffix += 1
+        # 如果 ID 已存在，添加父节点前缀使其唯一
+        if current_id in used_ids:
+            if parent_id:
+                new_id = f"{parent_id}-{current_id}"
+            else:
+                # 根节点冲突，使用路径的稳定摘要（不用 hash()，它的结果每个进程都不同）
+                new_id = f"{current_id}-{stable_hash(join_path(current_path))}"
+            
+            # 确保新 ID 也是唯一的（被占用时加数字后缀）
+            new_id = used_ids.allocate(new_id)
+            node['id'] = new_id
+            current_id = new_id
+            renamed += 1
         
-        node['id'] = new_id
-        current_id = new_id
-    
-    used_ids.add(current_id)
+        used_ids.add(current_id)
+        return (current_id, current_path), node.get('children')
     
-    # 递归处理子节点
-    for child in node.get('children', []):
-        fix_node_ids(child, current_id, used_ids, current_path)
+    walk_subtree(node, enter, context=(parent_id, path))
+    return renamed
 
 
-def extract_text_from_pdf(pdf_path):
-    """从 PDF 中提取文本，保留缩进信息"""
-    lines_with_position = []
+def extract_text_from_pdf(pdf_path, jobs=1, cache=None, y_tolerance=DEFAULT_Y_TOLERANCE,
+                          engine=DEFAULT_ENGINE, stats=None):
+    """
+    从 PDF 中提取文本，保留缩进信息
     
-    with pdfplumber.open(pdf_path) as pdf:
-        for page in pdf.pages:
-            chars = page.chars
-            
-            if not chars:
-                text = page.extract_text()
-                if text:
-                    page_lines = text.split('\n')
-                    for line in page_lines:
-                        lines_with_position.append((0, line))
-                continue
-            
-            y_groups = {}
-            for char in chars:
-                y_key = round(char['y0'], 1)
-                if y_key not in y_groups:
-                    y_groups[y_key] = []
-                y_groups[y_key].append(char)
-            
-            for y_key in sorted(y_groups.keys(), reverse=True):
-                chars_in_line = sorted(y_groups[y_key], key=lambda c: c['x0'])
-                
-                if not chars_in_line:
-                    continue
-                
-                first_char_x = chars_in_line[0]['x0']
-                line_text = ''.join([char['text'] for char in chars_in_line])
-                
-                if line_text.strip():
-                    lines_with_position.append((first_char_x, line_text))
-    
-    return lines_with_position
+    jobs > 1 时按页并行提取，cache 为 LineCache 时复用磁盘缓存，
+    y_tolerance 为同一行字符基线的最大差值（pt），engine 为提取引擎名，
+    stats 为 dict 时累加 pages / lines / chars 计数
+    """
+    return extract_lines(pdf_path, jobs=jobs, cache=cache, y_tolerance=y_tolerance, engine=engine,
+                         stats=stats)
 
 
 def calculate_indent_level(x_pos, x_positions):
-    """根据 x 坐标计算缩进级别"""
-    if not x_positions:
-        return 0
-    
-    unique_x = sorted(set(x_positions))
-    
-    if x_pos in unique_x:
-        return unique_x.index(x_pos)
-    
-    closest_x = min(unique_x, key=lambda x: abs(x - x_pos))
-    
-    if abs(x_pos - closest_x) > 10:
-        insert_pos = 0
-        for i, x in enumerate(unique_x):
-            if x_pos > x:
-                insert_pos = i + 1
-            else:
-                break
-        return insert_pos
-    
-    return unique_x.index(closest_x)
+    """根据 x 坐标计算缩进级别（单次计算；解析整份文档时请复用 IndentColumns）"""
+    return IndentColumns(x_positions).level(x_pos)
 
 
-def parse_hierarchy(lines_with_position):
-    """解析层级关系，构建树形结构"""
-    if not lines_with_position:
-        return []
-    
-    x_positions = [x for x, _ in lines_with_position if x > 0]
-    
-    nodes = []
-    root_nodes = []
-    root_index = 0
-    
+def _outline_entries(lines_with_position, indent_model):
+    """清洗文本行，产出 (缩进级别, 内容)；去掉项目符号后为空的行跳过"""
     for x_pos, line_text in lines_with_position:
-        indent_level = calculate_indent_level(x_pos, x_positions)
+        indent_level = indent_model.level(x_pos)
         
         content = line_text.strip()
         if not content:
@@ -153,37 +118,29 @@ def parse_hierarchy(lines_with_position):
         if not content:
             continue
         
-        while nodes and nodes[-1]["level"] >= indent_level:
-            nodes.pop()
-        
-        if not nodes:
-            node_id = f"root_{root_index}"
-            root_index += 1
-        else:
-            parent = nodes[-1]["node"]
-            parent_id = parent.get("id", "")
-            child_index = len(parent.get("children", []))
-            
-            if parent_id.startswith("root_"):
-                node_id = f"{parent_id}_child_{child_index}"
-            else:
-                node_id = f"{parent_id}_child_{child_index}"
-        
-        node = {
-            "id": node_id,
-            "title": content,
-            "children": []
-        }
-        
-        if not nodes:
-            root_nodes.append(node)
-            nodes.append({"level": indent_level, "node": node})
-        else:
-            parent = nodes[-1]["node"]
-            parent["children"].append(node)
-            nodes.append({"level": indent_level, "node": node})
+        yield indent_level, content
+
+
+def parse_hierarchy_store(lines_with_position, indent_model=None, column_gap=DEFAULT_COLUMN_GAP):
+    """
+    解析层级关系，构建 NodeStore（紧凑的先序数组树，见 node_store.py）
+    
+    indent_model 为预先建好的 IndentColumns，此时 lines_with_position 可以是迭代器，
+    边读取边建树（流式解析）；默认根据全部行的 x 坐标建模，
+    相邻 x 坐标之差不超过 column_gap 的归为同一缩进列
+    """
+    if indent_model is None:
+        lines_with_position = list(lines_with_position)
+        if not lines_with_position:
+            return NodeStore()
+        indent_model = IndentColumns.from_lines(lines_with_position, column_gap)
     
-    return root_nodes
+    return NodeStore.from_outline(_outline_entries(lines_with_position, indent_model))
+
+
+def parse_hierarchy(lines_with_position, indent_model=None, column_gap=DEFAULT_COLUMN_GAP):
+    """解析层级关系，构建 [{id, title, children}, ...] 树形结构（参数同 parse_hierarchy_store）"""
+    return parse_hierarchy_store(lines_with_position, indent_model, column_gap).to_title_dicts()
 
 
 def validate_final_data(data):
@@ -191,105 +148,165 @@ def validate_final_data(data):
     issues = []
     all_ids = set()
     
-    def check_node(node, path=""):
+    def check_node(node, path, index, count):
         node_id = node.get('id')
-        path_str = f"{path}/{node_id}" if path else node_id
+        path = (path, node_id)
         
         if not node_id:
-            issues.append(f"{path_str}: 缺少 id")
+            issues.append(f"{join_path(path)}: 缺少 id")
         elif node_id in all_ids:
-            issues.append(f"{path_str}: ID 重复")
+            issues.append(f"{join_path(path)}: ID 重复")
         else:
             all_ids.add(node_id)
         
         if 'label' not in node:
-            issues.append(f"{path_str}: 缺少 label")
+            issues.append(f"{join_path(path)}: 缺少 label")
         if 'side' not in node:
-            issues.append(f"{path_str}: 缺少 side")
+            issues.append(f"{join_path(path)}: 缺少 side")
         
-        for child in node.get('children', []):
-            check_node(child, path_str)
+        return path, node.get('children')
     
     nodes = data if isinstance(data, list) else [data]
-    for node in nodes:
-        check_node(node)
+    walk(nodes, check_node, context="")
     
     return issues, len(all_ids)
 
 
-def main():
-    """主函数：执行完整 pipeline"""
-    if len(sys.argv) < 2:
-        print("用法: python pdf_to_final_mindmap.py <PDF文件> [输出JSON文件]")
-        print("示例: python pdf_to_final_mindmap.py cell.pdf cell_mindmap.json")
-        sys.exit(1)
-    
-    pdf_path = sys.argv[1]
-    output_file = sys.argv[2] if len(sys.argv) > 2 else None
-    
-    if not os.path.exists(pdf_path):
-        print(f"错误: 找不到 PDF 文件 {pdf_path}")
-        sys.exit(1)
-    
-    if not output_file:
-        base_name = os.path.splitext(os.path.basename(pdf_path))[0]
-        output_file = f"{base_name}_mindmap.json"
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='从 PDF 生成最终格式的思维导图 JSON',
+        epilog='示例: python pdf_to_final_mindmap.py cell.pdf cell_mindmap.json'
+    )
+    parser.add_argument('pdf_path', help='PDF 文件')
+    parser.add_argument('output_file', nargs='?', help='输出 JSON 文件（默认 <PDF文件名>_mindmap.json）')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='按页并行提取的进程数（默认 1 为串行，0 表示使用全部 CPU 核心）')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='不使用提取结果缓存（.cache/mindmap_lines），总是重新解析 PDF')
+    parser.add_argument('--y-tolerance', type=float, default=DEFAULT_Y_TOLERANCE,
+                        help=f'同一行字符基线的最大差值，单位 pt（默认 {DEFAULT_Y_TOLERANCE}）')
+    parser.add_argument('--engine', choices=list(ENGINES), default=DEFAULT_ENGINE,
+                        help='提取引擎：pdfplumber（默认）、pdfminer（直接读取字形坐标，结果相同、更快）、'
+                             'pdfium（需要 pypdfium2，最快，坐标略有差异）')
+    parser.add_argument('--column-gap', type=float, default=DEFAULT_COLUMN_GAP,
+                        help='相邻行首 x 坐标之差不超过该值时视为同一缩进列，单位 pt（默认 0，不合并）')
+    parser.add_argument('--stream', action='store_true',
+                        help='流式提取：逐页产出文本行并边读边建树，降低内存峰值（不使用提取缓存和按页并行）')
+    parser.add_argument('--calibration', choices=['two-pass', 'sample'], default='two-pass',
+                        help='流式模式下缩进列的标定方式：two-pass 先扫描一遍 x 坐标（结果与非流式一致），'
+                             'sample 只用前几页标定（PDF 只解析一遍）')
+    parser.add_argument('--sample-pages', type=int, default=3,
+                        help='sample 标定使用的页数（默认 3）')
+    parser.add_argument('--profile', nargs='?', const='mindmap_profile.json', metavar='JSON',
+                        help='记录各阶段的耗时、CPU 时间、峰值内存和计数，写入 JSON 报告'
+                             '（默认 mindmap_profile.json；tracemalloc 会让运行变慢）')
+    parser.add_argument('--pstats', metavar='FILE',
+                        help='在 cProfile 下运行并把结果保存为 pstats 文件（python -m pstats FILE 查看）')
+    parser.add_argument('--compact', action='store_true',
+                        help='写出无缩进的 JSON，并生成最高压缩级别的 .json.gz / .json.br 预压缩文件'
+                             '（.br 需要 pip install brotli），结束时打印体积报告')
+    parser.add_argument('--size-report', metavar='JSON',
+                        help='结束时打印 pretty / minified / gzip / brotli 的字节数，并保存为 JSON')
+    parser.add_argument('--shard', action='store_true',
+                        help='另外生成分片目录 X.shards/：前几层的骨架 + 按需加载的分支分片 + 节点到分片的 manifest.json')
+    parser.add_argument('--skeleton-depth', type=int, default=DEFAULT_SKELETON_DEPTH,
+                        help=f'--shard 骨架包含的层数（默认 {DEFAULT_SKELETON_DEPTH}）')
+    parser.add_argument('--shard-bytes', type=int, default=DEFAULT_SHARD_BYTES,
+                        help=f'--shard 单个分片的目标字节数（默认 {DEFAULT_SHARD_BYTES}）')
+    parser.add_argument('--layout', action='store_true',
+                        help='另外写出预计算的布局文件 X.layout.json（节点坐标、尺寸和子树范围），客户端无需再做布局')
+    parser.add_argument('--check-stable', action='store_true',
+                        help='不写输出文件，而是用不同的哈希种子在新进程中运行两次 pipeline，'
+                             '确认输出逐字节一致（不一致时退出码为 1）')
+    args = parser.parse_args(argv)
+    if args.check_stable and (args.profile is not None or args.pstats):
+        parser.error('--check-stable 不能与 --profile / --pstats 同时使用')
+    if args.skeleton_depth < 1 or args.shard_bytes < 1:
+        parser.error('--skeleton-depth 和 --shard-bytes 必须为正数')
+    return args
+
+
+def _build_into(args, output_dir):
+    """--check-stable 的一次构建：按原参数运行 pipeline，输出写到 output_dir"""
+    args = copy.copy(args)
+    args.output_file = str(Path(output_dir) / os.path.basename(args.output_file))
+    run_pipeline(args)
+
+
+def run_pipeline(args, profile=None):
+    """执行 4 个步骤；profile 为 FileProfile 时记录每个步骤的耗时、内存和计数"""
+    pdf_path = args.pdf_path
+    output_file = args.output_file
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    stats = {} if profile is not None else None
     
     print("=" * 60)
     print("思维导图生成 Pipeline")
     print("=" * 60)
     
-    # Step 1: 从 PDF 提取文本
-    print(f"\n[1/5] 正在从 PDF 提取文本: {pdf_path}")
+    # Step 1: 从 PDF 提取文本（流式模式下只标定缩进列，文本行在 Step 2 中边读边解析）
+    indent_model = None
+    if args.stream:
+        print(f"\n[1/4] 正在标定缩进列（{args.calibration}）: {pdf_path}")
+    else:
+        print(f"\n[1/4] 正在从 PDF 提取文本: {pdf_path}")
     try:
-        lines_with_position = extract_text_from_pdf(pdf_path)
-        print(f"      ✅ 提取了 {len(lines_with_position)} 行文本")
+        if args.stream:
+            with profile_stage(profile, 'calibrate') as counters:
+                indent_model, lines_with_position = open_line_stream(
+                    pdf_path, args.calibration, args.sample_pages,
+                    column_gap=args.column_gap, y_tolerance=args.y_tolerance, engine=args.engine,
+                    stats=stats
+                )
+                counters['indent_columns'] = len(indent_model.columns)
+            print(f"      ✅ 找到 {len(indent_model.columns)} 个缩进列")
+        else:
+            cache = None if args.no_cache else LineCache()
+            with profile_stage(profile, 'extract') as counters:
+                lines_with_position = extract_text_from_pdf(pdf_path, jobs=jobs, cache=cache,
+                                                            y_tolerance=args.y_tolerance,
+                                                            engine=args.engine, stats=stats)
+                if stats is not None:
+                    counters.update(stats)
+            print(f"      ✅ 提取了 {len(lines_with_position)} 行文本")
+            if cache is not None:
+                print(f"      📦 页面缓存命中: {cache.hit_ratio_text()}")
     except Exception as e:
         print(f"      ❌ 提取失败: {e}")
         sys.exit(1)
     
     # Step 2: 解析层级结构
-    print(f"\n[2/5] 正在解析层级结构...")
+    print(f"\n[2/4] 正在解析层级结构...")
     try:
-        root_nodes = parse_hierarchy(lines_with_position)
-        print(f"      ✅ 解析完成，找到 {len(root_nodes)} 个根节点")
+        # 流式模式下文本行在这一步才真正提取，阶段名体现这一点
+        with profile_stage(profile, 'stream' if args.stream else 'parse') as counters:
+            if profile is not None and indent_model is None:
+                # 剖析时在外面建模，以便统计缩进级别的查询次数
+                lines_with_position = list(lines_with_position)
+                indent_model = IndentColumns.from_lines(lines_with_position, args.column_gap)
+            store = parse_hierarchy_store(lines_with_position, indent_model, column_gap=args.column_gap)
+            if profile is not None:
+                if args.stream:
+                    counters.update(stats)
+                counters['indent_lookups'] = indent_model.lookups
+                counters['nodes'] = len(store)
+        if args.stream:
+            # 每一行都会查询一次缩进级别，查询次数即行数
+            print(f"      ✅ 流式提取了 {indent_model.lookups} 行文本")
+        print(f"      ✅ 解析完成，找到 {len(store.roots())} 个根节点")
     except Exception as e:
         print(f"      ❌ 解析失败: {e}")
         import traceback
         traceback.print_exc()
         sys.exit(1)
     
-    # Step 3: 升级数据格式
-    print(f"\n[3/5] 正在升级数据格式（添加 id、label、side）...")
-    try:
-        upgraded_data = upgrade_mindmap_data(root_nodes)
-        print(f"      ✅ 格式升级完成")
-    except Exception as e:
-        print(f"      ❌ 升级失败: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
-    
-    # Step 4: 修复重复 ID
-    print(f"\n[4/5] 正在修复重复 ID...")
+    # Step 3: 规范化（升级格式、ID 去重、验证在一次遍历中完成）
+    print(f"\n[3/4] 正在规范化数据（添加 id、label、side，修复重复 ID 并验证）...")
     try:
-        used_ids = set()
-        if isinstance(upgraded_data, list):
-            for node in upgraded_data:
-                fix_node_ids(node, None, used_ids)
-        else:
-            fix_node_ids(upgraded_data, None, used_ids)
-        print(f"      ✅ ID 修复完成")
-    except Exception as e:
-        print(f"      ❌ 修复失败: {e}")
-        import traceback
-        traceback.print_exc()
-        sys.exit(1)
-    
-    # Step 5: 验证并保存
-    print(f"\n[5/5] 正在验证并保存数据...")
-    try:
-        issues, node_count = validate_final_data(upgraded_data)
+        with profile_stage(profile, 'normalize') as counters:
+            issues, node_count = normalize_store(store, counters)
+            counters['nodes'] = node_count
+            counters['issues'] = len(issues)
         if issues:
             print(f"      ⚠️  发现 {len(issues)} 个问题:")
             for issue in issues[:5]:
@@ -298,9 +315,43 @@ def main():
                 print(f"         ... 还有 {len(issues) - 5} 个问题")
         else:
             print(f"      ✅ 验证通过，共 {node_count} 个节点")
-        
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(upgraded_data, f, ensure_ascii=False, indent=2)
+    except Exception as e:
+        print(f"      ❌ 规范化失败: {e}")
+        import traceback
+        traceback.print_exc()
+        sys.exit(1)
+    
+    # Step 4: 保存
+    print(f"\n[4/4] 正在保存数据...")
+    try:
+        with profile_stage(profile, 'save') as counters:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                store.write_json(f, compact=args.compact)
+            counters['bytes'] = os.path.getsize(output_file)
+        if args.compact:
+            with profile_stage(profile, 'compress') as counters:
+                sizes = write_precompressed(output_file)
+                counters['gzip_bytes'] = sizes['gzip']
+                counters['brotli_bytes'] = sizes['brotli']
+        else:
+            # 以前 --compact 生成的预压缩文件已与新的 JSON 不一致
+            remove_precompressed(output_file)
+        if args.shard:
+            with profile_stage(profile, 'shard') as counters:
+                shard_info = write_shards(store, output_file, args.skeleton_depth, args.shard_bytes,
+                                          compress=args.compact)
+                counters.update(shard_info)
+            print(f"      🧩 分片完成: 骨架 {shard_info['skeleton_bytes']} 字节，{shard_info['branches']} 个分支、"
+                  f"{shard_info['shards']} 个分片（最大 {shard_info['largest_shard']} 字节）")
+        else:
+            remove_shards(output_file)
+        if args.layout:
+            with profile_stage(profile, 'layout') as counters:
+                layout_info = write_layout(store, output_file, compress=args.compact)
+                counters.update(layout_info)
+            print(f"      📐 布局完成: {layout_info['nodes']} 个节点，画布 {layout_info['width']} x {layout_info['height']}")
+        else:
+            remove_layout(output_file)
         print(f"      ✅ 已保存到: {output_file}")
     except Exception as e:
         print(f"      ❌ 保存失败: {e}")
@@ -310,6 +361,38 @@ def main():
     print("✅ Pipeline 完成！")
     print(f"   输出文件: {output_file}")
     print("=" * 60)
+    
+    if args.compact or args.size_report:
+        report_sizes([output_file], args.size_report)
+
+
+def main(argv=None):
+    """主函数：执行完整 pipeline"""
+    args = parse_args(argv)
+    
+    if not os.path.exists(args.pdf_path):
+        print(f"错误: 找不到 PDF 文件 {args.pdf_path}")
+        sys.exit(1)
+    
+    if not args.output_file:
+        base_name = os.path.splitext(os.path.basename(args.pdf_path))[0]
+        args.output_file = f"{base_name}_mindmap.json"
+    
+    if args.check_stable:
+        sys.exit(0 if check_stable(functools.partial(_build_into, args)) else 1)
+    
+    profile = FileProfile(args.pdf_path) if args.profile else None
+    if args.pstats:
+        dump_cprofile(args.pstats, run_pipeline, args, profile)
+        print(f"📈 cProfile 结果已保存: {args.pstats}")
+    else:
+        run_pipeline(args, profile)
+    
+    if profile is not None:
+        report = build_report([profile.to_dict()], argv if argv is not None else sys.argv[1:])
+        write_report(args.profile, report)
+        print_summary(report)
+        print(f"📈 剖析报告已保存: {args.profile}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨章节的联想搜索索引 public/mindmaps/search-index.json
+学生按概念（"ATP"、"Golgi body"）搜索时不需要下载全部 19 个章节：两个 pipeline 结束时调用
+update_search_index()，把所有节点的 label 切分成词，写出一份排好序的词表和对应的倒排列表，客户端加载一次即可。
+
+{"format": 2,
+ "chapters": {"3": {"sha256": "...", "ids": [节点 id, ...], "labels": [节点 label, ...]}, ...},
+ "terms": ["adenosine", "atp", ...],
+ "postings": [[章节, 节点序号, 章节, 节点序号, ...], ...]}
+
+- ids / labels 按章节 JSON 的先序排列，倒排列表中的节点序号指向它们；postings 与 terms 一一对应
+- terms 按码位排序（Python 的 str 比较）；客户端二分查找时必须按码位比较，不能用 JS 按 UTF-16 码元比较的 <
+- 查询时每个词都按前缀匹配（最后一个词通常还没输入完），在有序词表上二分查找出前缀范围，
+  各词的结果取交集，整个 label 以查询开头的排在前面
+- 增量更新：章节文件的 SHA-256 与索引中记录的相同时沿用原来的词和倒排，只有重新生成的章节需要读取和切词
+
+用法:
+    python scripts/search_index.py [--output-dir public/mindmaps]     # 重新生成索引
+    python scripts/search_index.py --query "golgi bo" [--limit 10]    # 查询
+"""
+
+import argparse
+import bisect
+import heapq
+import json
+import os
+import re
+import time
+from pathlib import Path
+
+from build_manifest import sha256_file
+from chapters import CHAPTERS, sorted_chapters
+from json_backend import dump as dump_json
+
+SEARCH_INDEX_FILENAME = 'search-index.json'
+SEARCH_INDEX_FORMAT = 2
+
+# 词：连续的字母 / 数字（不含下划线、组合符号），统一 lower()。客户端 src/lib/mindmapSearch.js 用
+# toLowerCase() 和 [\p{L}\p{N}]+ 得到同样的词；不用 casefold()，它会把 µ、ß、词尾 ς 等改写成 JS 没有的形式
+_TOKEN = re.compile(r'[^\W_]+')
+# 大于任何词中字符的哨兵，用于求前缀范围的上界
+_PREFIX_END = '\U0010ffff'
+
+
+def tokenize(text):
+    """label 或查询切分出的词（按出现顺序，可能重复）"""
+    return _TOKEN.findall(text.lower())
+
+
+def chapter_nodes(path):
+    """章节 JSON 中所有节点的 (ids, labels)，先序（显式栈，不受递归深度限制）"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    ids = []
+    labels = []
+    stack = list(reversed(data if isinstance(data, list) else [data]))
+    while stack:
+        node = stack.pop()
+        ids.append(node.get('id', ''))
+        labels.append(node.get('label') or node.get('title') or '')
+        stack.extend(reversed(node.get('children') or []))
+    return ids, labels
+
+
+def _load_index(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if data.get('format') != SEARCH_INDEX_FORMAT:
+        return None
+    return data
+
+
+def update_search_index(output_dir, force=False):
+    """
+    重新生成 output_dir/search-index.json（只包含存在的章节文件），返回 {'chapters', 'reindexed', 'terms'}。
+    内容未变化的章节沿用已有索引中的倒排（force 为真时全部重新切词）；先写临时文件再替换
+    """
+    output_dir = Path(output_dir)
+    index_path = output_dir / SEARCH_INDEX_FILENAME
+    previous = None if force else _load_index(index_path)
+    previous_chapters = previous['chapters'] if previous else {}
+    
+    chapters = {}
+    reindexed = []
+    for chapter in sorted_chapters(CHAPTERS):
+        path = output_dir / CHAPTERS[chapter][1]
+        if not path.exists():
+            continue
+        sha256 = sha256_file(path)
+        old = previous_chapters.get(chapter)
+        if old and old['sha256'] == sha256:
+            chapters[chapter] = old
+        else:
+            ids, labels = chapter_nodes(path)
+            chapters[chapter] = {'sha256': sha256, 'ids': ids, 'labels': labels}
+            reindexed.append(chapter)
+    
+    # 沿用章节的倒排直接从旧索引中取出，重新生成的章节重新切词
+    postings = {}
+    kept = {int(chapter) for chapter in chapters if chapter not in reindexed}
+    if previous and kept:
+        for term, flat in zip(previous['terms'], previous['postings']):
+            pairs = [(flat[i], flat[i + 1]) for i in range(0, len(flat), 2) if flat[i] in kept]
+            if pairs:
+                postings[term] = pairs
+    for chapter in reindexed:
+        number = int(chapter)
+        for index, label in enumerate(chapters[chapter]['labels']):
+            for term in set(tokenize(label)):
+                postings.setdefault(term, []).append((number, index))
+    
+    terms = sorted(postings)
+    data = {
+        'format': SEARCH_INDEX_FORMAT,
+        'chapters': chapters,
+        'terms': terms,
+        'postings': [[value for pair in sorted(postings[term]) for value in pair] for term in terms],
+    }
+    tmp_path = index_path.with_name(index_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        dump_json(data, f, compact=True)
+    os.replace(tmp_path, index_path)
+    return {'chapters': len(chapters), 'reindexed': len(reindexed), 'terms': len(terms)}
+
+
+class SearchIndex:
+    """加载后的索引：search() 返回 [(章节, 节点 id, label), ...]"""
+    
+    def __init__(self, data):
+        self.terms = data['terms']
+        self.postings = data['postings']
+        self.chapters = data['chapters']
+        # (章节, 节点序号) → 切词后用空格连接的 label，排序时按需计算
+        self._normalized = {}
+    
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+    
+    def prefix_range(self, prefix):
+        """以 prefix 开头的词在有序词表中的范围 [start, stop)"""
+        start = bisect.bisect_left(self.terms, prefix)
+        stop = bisect.bisect_left(self.terms, prefix + _PREFIX_END, start)
+        return start, stop
+    
+    def _matches(self, prefix):
+        start, stop = self.prefix_range(prefix)
+        matches = set()
+        for flat in self.postings[start:stop]:
+            matches.update(zip(flat[::2], flat[1::2]))
+        return matches
+    
+    def search(self, query, limit=10):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # 先查最长的词（通常结果最少），再逐个取交集
+        matches = None
+        for token in sorted(set(tokens), key=len, reverse=True):
+            found = self._matches(token)
+            matches = found if matches is None else matches & found
+            if not matches:
+                return []
+        
+        phrase = ' '.join(tokens)
+        
+        def rank(match):
+            chapter, index = match
+            label = self.chapters[str(chapter)]['labels'][index]
+            normalized = self._normalized.get(match)
+            if normalized is None:
+                normalized = self._normalized[match] = ' '.join(tokenize(label))
+            return (not normalized.startswith(phrase), len(label), chapter, index)
+        
+        results = []
+        for chapter, index in heapq.nsmallest(limit, matches, key=rank):
+            entry = self.chapters[str(chapter)]
+            results.append((str(chapter), entry['ids'][index], entry['labels'][index]))
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成或查询跨章节的联想搜索索引 search-index.json')
+    parser.add_argument('--output-dir', default='public/mindmaps', help='输出目录（默认 public/mindmaps）')
+    parser.add_argument('--force', action='store_true', help='忽略已有索引，所有章节重新切词')
+    parser.add_argument('--query', help='查询而不是重新生成索引')
+    parser.add_argument('--limit', type=int, default=10, help='--query 返回的结果数（默认 10）')
+    args = parser.parse_args()
+    
+    index_path = Path(args.output_dir) / SEARCH_INDEX_FILENAME
+    if args.query is None:
+        info = update_search_index(args.output_dir, force=args.force)
+        print(f"🔎 搜索索引已更新: {index_path}（{info['chapters']} 个章节，重新切词 {info['reindexed']} 个，"
+              f"{info['terms']} 个词，{os.path.getsize(index_path)} 字节）")
+        return
+    
+    index = SearchIndex.load(index_path)
+    start = time.perf_counter()
+    results = index.search(args.query, args.limit)
+    elapsed = time.perf_counter() - start
+    for chapter, node_id, label in results:
+        print(f"  第 {chapter} 章  {label}  ({node_id})")
+    print(f"🔎 {len(results)} 个结果，查询耗时 {elapsed * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    main()
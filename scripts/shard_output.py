@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+分片输出（--shard）
+MindmapView 首屏只显示上面几层，整章 JSON 却要一次下载完。分片模式在 X.json 旁边另外生成 X.shards/ 目录：
+
+- skeleton.json:  前 --skeleton-depth 层节点（森林，格式与 X.json 相同）
+- shard-NNNN.json: 延迟加载的分支，{父节点 id: 子节点列表, ...}
+- manifest.json:  节点 id → 所在分片、分支字节数和子节点数；客户端展开节点时按它只请求需要的分片
+
+骨架最深一层中有子节点的节点是"延迟节点"，它的子节点列表（一个分支）放到分片中。
+一个分支超过 --shard-bytes 时，从子树最大的子节点开始把子节点也改为延迟节点，直到剩下的内容不超过目标
+（子节点列表本身不拆开，子节点很多的分支可能仍超过目标）。
+较小的分支按文档顺序装进同一个分片，直到分片大小达到目标。
+延迟节点在所在文件中的 children 为空列表，是否有子节点以 manifest.json 为准。
+
+分片和骨架都是无缩进的 JSON（只用于传输）；与 --compact 同用时同样生成 .gz / .br 预压缩文件。
+整个过程在 NodeStore 的先序序列上进行：计算子树大小、选择延迟节点和装箱都是线性的
+"""
+
+import heapq
+import os
+import shutil
+from json.encoder import encode_basestring
+from pathlib import Path
+
+from json_backend import dump as dump_json, dumps as dumps_json
+from output_encoding import precompressed_up_to_date, write_precompressed
+
+SHARD_FORMAT = 1
+DEFAULT_SKELETON_DEPTH = 2
+DEFAULT_SHARD_BYTES = 64 * 1024
+
+SKELETON_FILENAME = 'skeleton.json'
+SHARD_MANIFEST_FILENAME = 'manifest.json'
+
+
+def shard_dir(json_path):
+    """X.json 的分片目录 X.shards/"""
+    json_path = Path(json_path)
+    return json_path.with_name(json_path.stem + '.shards')
+
+
+class _Forest:
+    """NodeStore 中未被合并掉的节点的先序序列，以及每个节点的子树结束位置和紧凑 JSON 字节数"""
+    
+    __slots__ = ('depth', 'ids', 'labels', 'sides', 'end', 'own', 'subtree')
+    
+    def __init__(self, store):
+        self.depth = []
+        self.ids = []
+        self.labels = []
+        self.sides = []
+        for _, depth, node_id, label, side in store.iter_nodes():
+            self.depth.append(depth)
+            self.ids.append(node_id)
+            self.labels.append(label)
+            self.sides.append(side)
+        count = len(self.depth)
+        
+        # 子树结束位置（不含）：节点被深度不超过它的后继节点关闭
+        self.end = [count] * count
+        parents = [-1] * count
+        open_nodes = []
+        for index, depth in enumerate(self.depth):
+            while open_nodes and self.depth[open_nodes[-1]] >= depth:
+                self.end[open_nodes.pop()] = index
+            if open_nodes:
+                parents[index] = open_nodes[-1]
+            open_nodes.append(index)
+        
+        # 节点本身（children 为空列表）的紧凑 JSON 字节数，以及整个子树的字节数
+        self.own = [
+            len(f'{{"id":{encode_basestring(node_id)},"label":{encode_basestring(label)},'
+                f'"side":{"null" if side is None else encode_basestring(side)},"children":[]}}'.encode('utf-8'))
+            for node_id, label, side in zip(self.ids, self.labels, self.sides)
+        ]
+        self.subtree = list(self.own)
+        child_counts = [0] * count
+        for index in range(count - 1, -1, -1):
+            if child_counts[index]:
+                # 子节点之间的逗号
+                self.subtree[index] += child_counts[index] - 1
+            parent = parents[index]
+            if parent != -1:
+                self.subtree[parent] += self.subtree[index]
+                child_counts[parent] += 1
+    
+    def __len__(self):
+        return len(self.depth)
+    
+    def children(self, index):
+        child = index + 1
+        stop = self.end[index]
+        result = []
+        while child < stop:
+            result.append(child)
+            child = self.end[child]
+        return result
+    
+    def to_dicts(self, start, stop, base_depth, lazy):
+        """[start, stop) 中的节点转换为 dict 森林（最浅一层深度为 base_depth），延迟节点的子树不展开"""
+        roots = []
+        outputs = [roots]
+        index = start
+        while index < stop:
+            level = self.depth[index] - base_depth
+            del outputs[level + 1:]
+            children = []
+            outputs[level].append({
+                'id': self.ids[index],
+                'label': self.labels[index],
+                'side': self.sides[index],
+                'children': children
+            })
+            outputs.append(children)
+            index = self.end[index] if index in lazy else index + 1
+        return roots
+
+
+def _plan_branches(forest, skeleton_depth, shard_bytes):
+    """
+    选出延迟节点，返回 (延迟节点集合, [(延迟节点, 分支字节数), ...]（按文档顺序）)
+    分支字节数是子节点列表在分片中的紧凑 JSON 字节数（延迟的子节点只计节点本身）
+    """
+    lazy = set()
+    pending = [index for index in range(len(forest))
+               if forest.depth[index] == skeleton_depth - 1 and forest.end[index] > index + 1]
+    heapq.heapify(pending)
+    branches = []
+    while pending:
+        parent = heapq.heappop(pending)
+        lazy.add(parent)
+        children = forest.children(parent)
+        # 方括号和逗号
+        size = 2 + len(children) - 1 + sum(forest.subtree[child] for child in children)
+        if size > shard_bytes:
+            # 子树大的子节点优先改为延迟节点（相同大小时按文档顺序）
+            candidates = sorted((child for child in children if forest.end[child] > child + 1),
+                                key=lambda child: (-forest.subtree[child], child))
+            for child in candidates:
+                if size <= shard_bytes:
+                    break
+                size -= forest.subtree[child] - forest.own[child]
+                heapq.heappush(pending, child)
+        branches.append((parent, size))
+    return lazy, branches
+
+
+def _pack_branches(branches, forest, shard_bytes):
+    """按文档顺序把分支装进分片：加入下一个分支会超过目标时另起一个分片"""
+    shards = []
+    current = []
+    current_size = 2
+    for parent, size in branches:
+        # "父节点 id": 以及分支之间的逗号
+        entry_size = len(encode_basestring(forest.ids[parent]).encode('utf-8')) + 1 + size + (1 if current else 0)
+        if current and current_size + entry_size > shard_bytes:
+            shards.append(current)
+            current = []
+            current_size = 2
+            entry_size -= 1
+        current.append(parent)
+        current_size += entry_size
+    if current:
+        shards.append(current)
+    return shards
+
+
+def _write_text(path, text):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return len(text.encode('utf-8'))
+
+
+def write_shards(store, json_path, skeleton_depth=DEFAULT_SKELETON_DEPTH, shard_bytes=DEFAULT_SHARD_BYTES,
+                 compress=False):
+    """
+    为 json_path 生成分片目录（已存在时先整体删除），compress 为真时为其中的 JSON 生成预压缩文件。
+    返回 {'skeleton_bytes', 'shards', 'branches', 'largest_shard'}
+    """
+    if skeleton_depth < 1:
+        raise ValueError("skeleton_depth 至少为 1")
+    forest = _Forest(store)
+    lazy, branches = _plan_branches(forest, skeleton_depth, shard_bytes)
+    shards = _pack_branches(branches, forest, shard_bytes)
+    
+    directory = shard_dir(json_path)
+    if directory.exists():
+        shutil.rmtree(directory)
+    directory.mkdir(parents=True)
+    written = []
+    
+    skeleton_bytes = _write_text(directory / SKELETON_FILENAME,
+                                 dumps_json(forest.to_dicts(0, len(forest), 0, lazy), compact=True))
+    written.append(directory / SKELETON_FILENAME)
+    
+    branch_entries = {}
+    shard_entries = []
+    for number, parents in enumerate(shards, 1):
+        filename = f'shard-{number:04d}.json'
+        parts = []
+        for parent in parents:
+            text = dumps_json(forest.to_dicts(parent + 1, forest.end[parent], forest.depth[parent] + 1, lazy),
+                              compact=True)
+            parts.append(f'{encode_basestring(forest.ids[parent])}:{text}')
+            branch_entries[forest.ids[parent]] = {
+                'shard': filename,
+                'bytes': len(text.encode('utf-8')),
+                'children': len(forest.children(parent))
+            }
+        size = _write_text(directory / filename, '{' + ','.join(parts) + '}')
+        written.append(directory / filename)
+        shard_entries.append({'file': filename, 'bytes': size, 'branches': len(parents)})
+    
+    manifest = {
+        'format': SHARD_FORMAT,
+        'source': Path(json_path).name,
+        'skeletonDepth': skeleton_depth,
+        'shardBytes': shard_bytes,
+        'nodes': len(forest),
+        'skeleton': {'file': SKELETON_FILENAME, 'bytes': skeleton_bytes},
+        'branches': branch_entries,
+        'shards': shard_entries
+    }
+    with open(directory / SHARD_MANIFEST_FILENAME, 'w', encoding='utf-8') as f:
+        dump_json(manifest, f)
+    written.append(directory / SHARD_MANIFEST_FILENAME)
+    
+    if compress:
+        for path in written:
+            write_precompressed(path)
+    return {
+        'skeleton_bytes': skeleton_bytes,
+        'shards': len(shard_entries),
+        'branches': len(branch_entries),
+        'largest_shard': max((entry['bytes'] for entry in shard_entries), default=0)
+    }
+
+
+def remove_shards(json_path):
+    """删除 json_path 的分片目录（不分片重新生成 JSON 后，旧的分片已经过期）"""
+    directory = shard_dir(json_path)
+    if directory.exists():
+        shutil.rmtree(directory)
+
+
+def shards_up_to_date(json_path, compress=False):
+    """
+    分片目录的 manifest.json 是否存在且不早于 JSON（增量构建判断 --shard 的输出是否可以沿用）；
+    compress 为真时还要求预压缩文件齐全（manifest.json 最后写出，检查它即可）
+    """
+    manifest_path = shard_dir(json_path) / SHARD_MANIFEST_FILENAME
+    if not manifest_path.exists() or os.path.getmtime(manifest_path) < os.path.getmtime(json_path):
+        return False
+    return not compress or precompressed_up_to_date(manifest_path)
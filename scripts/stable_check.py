@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+输出稳定性检查（--check-stable）
+用不同的 PYTHONHASHSEED 在两个新的解释器进程中各构建一次，逐字节比较两次的输出目录。
+依赖字符串 hash()、集合遍历顺序等每个进程都不同的因素时，两次输出会不一致；
+输出必须稳定，CDN 缓存、ETag 和按差异部署才有意义
+
+构建函数 build(output_dir) 会被 pickle 后交给 spawn 启动的子进程执行，
+因此必须是模块级函数（或其 functools.partial），且参数可以 pickle
+"""
+
+import contextlib
+import filecmp
+import io
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# 两次构建使用的哈希种子（固定且不同，检查结果可复现）
+HASH_SEEDS = ('1', '2')
+
+
+def _run_quietly(build, output_dir):
+    """在子进程中执行构建，日志只在失败时返回"""
+    buffer = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buffer):
+            build(output_dir)
+    except SystemExit as e:
+        if e.code:
+            raise RuntimeError(f"构建失败（退出码 {e.code}）:\n{buffer.getvalue()[-2000:]}") from None
+
+
+def build_with_hash_seed(build, output_dir, seed):
+    """在 PYTHONHASHSEED=seed 的新解释器进程中执行 build(output_dir)"""
+    previous = os.environ.get('PYTHONHASHSEED')
+    # spawn 启动的子进程继承当前环境变量，哈希种子在解释器启动时读取
+    os.environ['PYTHONHASHSEED'] = seed
+    try:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+            pool.submit(_run_quietly, build, output_dir).result()
+    finally:
+        if previous is None:
+            del os.environ['PYTHONHASHSEED']
+        else:
+            os.environ['PYTHONHASHSEED'] = previous
+
+
+def _list_files(directory, ignore):
+    return {path.relative_to(directory) for path in directory.rglob('*')
+            if path.is_file() and path.name not in ignore}
+
+
+def compare_outputs(dir_a, dir_b, ignore=()):
+    """返回 (两边都有的文件数, 内容不同或只在一边存在的文件相对路径列表)"""
+    files_a = _list_files(dir_a, ignore)
+    files_b = _list_files(dir_b, ignore)
+    common = sorted(files_a & files_b)
+    differences = [str(path) for path in common if not filecmp.cmp(dir_a / path, dir_b / path, shallow=False)]
+    differences += [f"{path}（只在一次构建中生成）" for path in sorted(files_a ^ files_b)]
+    return len(common), differences
+
+
+def check_stable(build, ignore=()):
+    """
+    构建两次并比较输出（ignore 为不参与比较的文件名，例如构建清单），打印结果；
+    两次输出逐字节一致时返回 True
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        outputs = []
+        for seed in HASH_SEEDS:
+            output_dir = Path(tmp) / f'seed{seed}'
+            output_dir.mkdir()
+            print(f"🔁 第 {len(outputs) + 1} 次构建（PYTHONHASHSEED={seed}）...")
+            try:
+                build_with_hash_seed(build, output_dir, seed)
+            except RuntimeError as e:
+                print(f"❌ {e}")
+                return False
+            outputs.append(output_dir)
+        count, differences = compare_outputs(*outputs, ignore=ignore)
+    
+    if differences:
+        print(f"❌ 两次构建的输出不一致（{len(differences)} 个文件）:")
+        for path in differences:
+            print(f"   - {path}")
+        return False
+    if count == 0:
+        print("⚠️  两次构建都没有生成输出文件")
+        return False
+    print(f"✅ 两次构建的 {count} 个输出文件逐字节一致")
+    return True
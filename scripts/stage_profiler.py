@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pipeline 阶段剖析（--profile）
+记录每个文件每个阶段的墙钟时间、CPU 时间、tracemalloc 峰值内存，以及页数 / 字符数 / 行数 / 节点数等计数，
+汇总写入 JSON 报告；另可把最慢文件的 cProfile 结果保存为 pstats 文件
+
+注意 tracemalloc 会让 Python 代码明显变慢，剖析时的绝对耗时偏大，适合比较阶段之间的占比
+"""
+
+import cProfile
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+REPORT_FORMAT = 1
+
+
+class FileProfile:
+    """单个文件的阶段记录"""
+    
+    def __init__(self, source):
+        self.source = str(source)
+        self.stages = []
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+    
+    @contextmanager
+    def stage(self, name):
+        """
+        计时一个阶段，产出一个 dict，阶段内写入的计数会记到该阶段
+        
+        峰值内存为阶段内 tracemalloc 峰值减去阶段开始时的已分配量
+        """
+        counters = {}
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        wall = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield counters
+        finally:
+            cpu = time.process_time() - cpu
+            wall = time.perf_counter() - wall
+            _, peak = tracemalloc.get_traced_memory()
+            entry = {'name': name, 'wall': wall, 'cpu': cpu, 'peak_bytes': max(0, peak - base)}
+            entry.update(counters)
+            self.stages.append(entry)
+    
+    def to_dict(self):
+        counters = {}
+        for stage in self.stages:
+            for key, value in stage.items():
+                if key not in ('name', 'wall', 'cpu', 'peak_bytes') and isinstance(value, (int, float)):
+                    # 同一计数出现在多个阶段时（如 nodes）取最后一个阶段的值
+                    counters[key] = value
+        return {
+            'source': self.source,
+            'wall': sum(stage['wall'] for stage in self.stages),
+            'cpu': sum(stage['cpu'] for stage in self.stages),
+            'peak_bytes': max((stage['peak_bytes'] for stage in self.stages), default=0),
+            'counters': counters,
+            'stages': self.stages,
+        }
+
+
+def profile_stage(profile, name):
+    """profile 为 None（未开启 --profile）时返回空操作的上下文，产出的计数 dict 会被丢弃"""
+    if profile is None:
+        return nullcontext({})
+    return profile.stage(name)
+
+
+def build_report(files, argv=None):
+    """汇总多个文件的剖析结果（FileProfile.to_dict() 的列表）"""
+    totals = {}
+    for file_report in files:
+        for stage in file_report['stages']:
+            total = totals.setdefault(stage['name'], {'wall': 0.0, 'cpu': 0.0, 'peak_bytes': 0})
+            total['wall'] += stage['wall']
+            total['cpu'] += stage['cpu']
+            total['peak_bytes'] = max(total['peak_bytes'], stage['peak_bytes'])
+    slowest = max(files, key=lambda f: f['wall'])['source'] if files else None
+    return {
+        'format': REPORT_FORMAT,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'command': argv if argv is not None else sys.argv,
+        'slowest': slowest,
+        'totals': totals,
+        'files': files,
+    }
+
+
+def write_report(path, report):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def print_summary(report):
+    """在终端打印各阶段合计"""
+    print(f"⏱️  阶段剖析（{len(report['files'])} 个文件）:")
+    print(f"   {'阶段':<12} {'墙钟(s)':>9} {'CPU(s)':>9} {'峰值内存(MB)':>13}")
+    for name, total in report['totals'].items():
+        print(f"   {name:<12} {total['wall']:>9.3f} {total['cpu']:>9.3f} "
+              f"{total['peak_bytes'] / 1024 / 1024:>13.1f}")
+    if report['slowest']:
+        print(f"   最慢的文件: {report['slowest']}")
+
+
+def dump_cprofile(path, func, *args, **kwargs):
+    """在 cProfile 下运行 func，把结果写入 pstats 文件（可用 python -m pstats 查看），返回 func 的结果"""
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(func, *args, **kwargs)
+    finally:
+        profiler.dump_stats(path)
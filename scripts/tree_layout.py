@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+服务端预计算的思维导图布局（--layout）
+MindmapView 每次打开章节都要在浏览器里对整棵树做一次 mindmap 布局，低端设备上这是最慢的交互。
+布局阶段在 Python 中算好每个节点的坐标和子树范围，写到 X.json 旁边的 X.layout.json，客户端可以直接渲染。
+
+- 节点大小：标签宽度按字体度量表估算（12px 无衬线字体，ASCII 使用 Helvetica 字宽，
+  CJK 等宽字符为 1em，其余字符取平均字宽），再按 MindmapView 的规则加内边距并限制在 80 ~ 200px，
+  超过最大宽度时按行数增加高度
+- 布局：与 MindmapView 相同的水平思维导图，根节点在 (0, 0)，side 为 left 的分支向左、其余向右展开，
+  层间距 H_GAP、兄弟间距 V_GAP。每一侧用 van der Ploeg 的非分层 tidy tree 算法
+  （Drawing Non-layered Tidy Trees in Linear Time, 2013）：子树按轮廓尽量靠拢，父节点位于子节点中间，
+  节点大小不同也不会重叠，总开销是线性的。多个根节点的树自上而下依次排列
+- 所有遍历都在先序数组上按编号正序 / 倒序进行，不使用递归
+
+X.layout.json 为按先序（与 X.json 中节点的出现顺序相同）排列的列数组，坐标为节点中心、取整到像素：
+{"format": 1, "order": "preorder", "nodes": N, "bounds": [minX, minY, maxX, maxY],
+ "x": [...], "y": [...], "width": [...], "height": [...], "top": [...], "bottom": [...]}
+top / bottom 为节点子树在纵向上占据的范围（折叠、视口裁剪时可直接使用）
+"""
+
+import math
+import os
+from pathlib import Path
+
+from json_backend import dump as dump_json
+from output_encoding import precompressed_up_to_date, remove_precompressed, write_precompressed
+
+LAYOUT_FORMAT = 1
+
+# 与 MindmapView 的样式和 mindmap 布局参数一致
+FONT_SIZE = 12
+PADDING_X = 10
+MIN_WIDTH = 80
+MAX_WIDTH = 200
+MIN_HEIGHT = 32
+MAX_HEIGHT = 60
+LINE_HEIGHT = 20
+H_GAP = 64
+V_GAP = 4
+# 多个根节点的树之间的间距
+ROOT_GAP = 32
+
+# Helvetica 的 ASCII 字宽（1/1000 em，0x20 ~ 0x7E）
+_ASCII_WIDTHS = (
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+)
+# 其余拉丁 / 希腊字母等取平均字宽，CJK 及全角字符为 1em
+_DEFAULT_WIDTH = 556
+_WIDE_WIDTH = 1000
+_CHAR_WIDTHS = {chr(0x20 + i): width for i, width in enumerate(_ASCII_WIDTHS)}
+
+
+def _char_width(char):
+    width = _CHAR_WIDTHS.get(char)
+    if width is not None:
+        return width
+    return _WIDE_WIDTH if ord(char) >= 0x2E80 else _DEFAULT_WIDTH
+
+
+def label_width(text):
+    """标签文字的估算宽度（px）"""
+    return sum(_CHAR_WIDTHS.get(char) or _char_width(char) for char in text) * FONT_SIZE / 1000
+
+
+def node_size(text):
+    """节点框的 (宽, 高)：文字宽度加左右内边距，超过最大宽度时折行"""
+    text_width = label_width(text)
+    width = min(max(text_width + 2 * PADDING_X, MIN_WIDTH), MAX_WIDTH)
+    lines = max(1, math.ceil(text_width / (MAX_WIDTH - 2 * PADDING_X)))
+    height = max(MIN_HEIGHT, min(lines * LINE_HEIGHT + 12, MAX_HEIGHT))
+    return width, height
+
+
+def layout_path(json_path):
+    """X.json 的布局文件 X.layout.json"""
+    json_path = Path(json_path)
+    return json_path.with_name(json_path.stem + '.layout.json')
+
+
+def _update_iyl(low_y, index, chain):
+    """van der Ploeg 的 IYL 链表（(low_y, 子节点序号, 下一项)）：弹出被新子树完全遮住的项后压入新项"""
+    while chain is not None and low_y >= chain[0]:
+        chain = chain[2]
+    return (low_y, index, chain)
+
+
+def tidy_layout(children, breadth, depth_size, depth_pos):
+    """
+    非分层 tidy tree：节点 0 为根，编号为先序；children[i] 为子节点编号列表，
+    breadth / depth_size 为节点在兄弟方向 / 层次方向上占据的大小（含间距），depth_pos 为层次方向的起点
+    （子节点 = 父节点起点 + 父节点 depth_size）。返回每个节点在兄弟方向上的起点坐标
+    """
+    count = len(breadth)
+    prelim = [0.0] * count
+    mod = [0.0] * count
+    shift = [0.0] * count
+    change = [0.0] * count
+    # 轮廓线程与子树的两端节点（extreme left / right）及其 mod 累计值
+    thread_left = [-1] * count
+    thread_right = [-1] * count
+    extreme_left = list(range(count))
+    extreme_right = list(range(count))
+    mod_left = [0.0] * count
+    mod_right = [0.0] * count
+    bottom = [depth_pos[i] + depth_size[i] for i in range(count)]
+    
+    # 第一遍（后序）：后代编号都大于祖先，倒序处理时每个节点的子树都已处理完
+    for node in range(count - 1, -1, -1):
+        kids = children[node]
+        if not kids:
+            continue
+        first = kids[0]
+        chain = _update_iyl(bottom[extreme_left[first]], 0, None)
+        for i in range(1, len(kids)):
+            current = kids[i]
+            low_y = bottom[extreme_right[current]]
+            # 沿左边兄弟的右轮廓和当前子树的左轮廓向下，推开当前子树直到不重叠
+            sibling = kids[i - 1]
+            mod_sibling = mod[sibling]
+            contour = current
+            mod_contour = mod[current]
+            while sibling != -1 and contour != -1:
+                if bottom[sibling] > chain[0]:
+                    chain = chain[2]
+                distance = (mod_sibling + prelim[sibling] + breadth[sibling]) - (mod_contour + prelim[contour])
+                if distance > 0:
+                    mod_contour += distance
+                    mod[current] += distance
+                    mod_left[current] += distance
+                    mod_right[current] += distance
+                    # 把位移均匀分给中间较小的兄弟子树
+                    between = chain[1]
+                    if between != i - 1:
+                        parts = i - between
+                        shift[kids[between + 1]] += distance / parts
+                        shift[current] -= distance / parts
+                        change[current] -= distance - distance / parts
+                sibling_bottom = bottom[sibling]
+                contour_bottom = bottom[contour]
+                if sibling_bottom <= contour_bottom:
+                    sibling = children[sibling][-1] if children[sibling] else thread_right[sibling]
+                    if sibling != -1:
+                        mod_sibling += mod[sibling]
+                if sibling_bottom >= contour_bottom:
+                    contour = children[contour][0] if children[contour] else thread_left[contour]
+                    if contour != -1:
+                        mod_contour += mod[contour]
+            if sibling == -1 and contour != -1:
+                # 当前子树更深：从左边子树的最左端节点接一条线程到当前子树的左轮廓
+                leftmost = extreme_left[first]
+                thread_left[leftmost] = contour
+                diff = (mod_contour - mod[contour]) - mod_left[first]
+                mod[leftmost] += diff
+                prelim[leftmost] -= diff
+                extreme_left[first] = extreme_left[current]
+                mod_left[first] = mod_left[current]
+            elif sibling != -1 and contour == -1:
+                # 左边更深：从当前子树的最右端节点接一条线程到左边的右轮廓
+                rightmost = extreme_right[current]
+                thread_right[rightmost] = sibling
+                diff = (mod_sibling - mod[sibling]) - mod_right[current]
+                mod[rightmost] += diff
+                prelim[rightmost] -= diff
+                extreme_right[current] = extreme_right[kids[i - 1]]
+                mod_right[current] = mod_right[kids[i - 1]]
+            chain = _update_iyl(low_y, i, chain)
+        last = kids[-1]
+        # 父节点位于第一个和最后一个子节点之间
+        prelim[node] = (prelim[first] + mod[first] + mod[last] + prelim[last] + breadth[last]) / 2 - breadth[node] / 2
+        extreme_left[node] = extreme_left[first]
+        mod_left[node] = mod_left[first]
+        extreme_right[node] = extreme_right[last]
+        mod_right[node] = mod_right[last]
+    
+    # 第二遍（先序）：累加 mod 得到最终坐标，并把 shift / change 分配给子节点
+    position = [0.0] * count
+    mod_sum = [0.0] * count
+    for node in range(count):
+        mod_sum[node] += mod[node]
+        position[node] = prelim[node] + mod_sum[node]
+        total_shift = 0.0
+        total_change = 0.0
+        for child in children[node]:
+            total_shift += shift[child]
+            total_change += total_shift + change[child]
+            mod[child] += total_change
+            mod_sum[child] = mod_sum[node]
+    return position
+
+
+class MindmapLayout:
+    """按先序排列的布局结果（列数组，见模块说明）"""
+    
+    __slots__ = ('x', 'y', 'width', 'height', 'top', 'bottom')
+    
+    def __init__(self, count):
+        self.x = [0.0] * count
+        self.y = [0.0] * count
+        self.width = [0.0] * count
+        self.height = [0.0] * count
+        self.top = [0.0] * count
+        self.bottom = [0.0] * count
+    
+    def __len__(self):
+        return len(self.x)
+    
+    def bounds(self):
+        if not self.x:
+            return [0, 0, 0, 0]
+        return [
+            min(x - w / 2 for x, w in zip(self.x, self.width)),
+            min(self.top),
+            max(x + w / 2 for x, w in zip(self.x, self.width)),
+            max(self.bottom),
+        ]
+    
+    def to_json(self):
+        def pixels(values):
+            return [round(value) for value in values]
+        
+        return {
+            'format': LAYOUT_FORMAT,
+            'order': 'preorder',
+            'nodes': len(self),
+            'bounds': pixels(self.bounds()),
+            'x': pixels(self.x),
+            'y': pixels(self.y),
+            'width': pixels(self.width),
+            'height': pixels(self.height),
+            'top': pixels(self.top),
+            'bottom': pixels(self.bottom),
+        }
+
+
+def layout_outline(depths, labels, sides):
+    """
+    对先序排列的节点（深度、标签、side）计算布局，返回 MindmapLayout
+    side 为 left 的一级分支向左，其余（right、center、None）向右
+    """
+    count = len(depths)
+    layout = MindmapLayout(count)
+    parents = [-1] * count
+    children = [[] for _ in range(count)]
+    open_nodes = []
+    for index, depth in enumerate(depths):
+        del open_nodes[depth:]
+        if open_nodes:
+            parents[index] = open_nodes[-1]
+            children[open_nodes[-1]].append(index)
+        open_nodes.append(index)
+    for index, label in enumerate(labels):
+        layout.width[index], layout.height[index] = node_size(label)
+    
+    # 层次方向：节点左缘（向左展开时为右缘）到根节点中心的距离
+    near_edge = [0.0] * count
+    for index in range(count):
+        parent = parents[index]
+        if parent == -1:
+            near_edge[index] = -layout.width[index] / 2
+        else:
+            near_edge[index] = near_edge[parent] + layout.width[parent] + H_GAP
+    left = [False] * count
+    for index in range(count):
+        parent = parents[index]
+        if parent != -1:
+            left[index] = left[parent] if parents[parent] != -1 else sides[index] == 'left'
+        direction = -1 if left[index] else 1
+        layout.x[index] = direction * (near_edge[index] + layout.width[index] / 2)
+    
+    # 兄弟方向：每个根节点的左右两侧分别作为一棵树布局，根节点居中，多棵树依次向下排列
+    offset = 0.0
+    roots = [index for index in range(count) if parents[index] == -1]
+    for position, root in enumerate(roots):
+        for side_left in (False, True):
+            branch = [child for child in children[root] if left[child] == side_left]
+            if branch:
+                _layout_side(root, branch, children, near_edge, layout)
+        # 子树在纵向上的范围（后代编号更大，倒序累计）
+        end = roots[position + 1] if position + 1 < len(roots) else count
+        for index in range(end - 1, root - 1, -1):
+            layout.top[index] = min(layout.top[index], layout.y[index] - layout.height[index] / 2)
+            layout.bottom[index] = max(layout.bottom[index], layout.y[index] + layout.height[index] / 2)
+            parent = parents[index]
+            if parent != -1:
+                layout.top[parent] = min(layout.top[parent], layout.top[index])
+                layout.bottom[parent] = max(layout.bottom[parent], layout.bottom[index])
+        # 第一棵树的根节点在 y = 0，之后的树接在上一棵树的下方
+        delta = 0.0 if position == 0 else offset + ROOT_GAP - layout.top[root]
+        for index in range(root, end):
+            layout.y[index] += delta
+            layout.top[index] += delta
+            layout.bottom[index] += delta
+        offset = layout.bottom[root]
+    return layout
+
+
+def _layout_side(root, branch, children, near_edge, layout):
+    """根节点一侧的分支：在局部编号的先序树上运行 tidy_layout，结果平移到根节点中心 y = 0"""
+    nodes = [root]
+    local_children = [[]]
+    stack = list(reversed(branch))
+    local_parent = {child: 0 for child in branch}
+    while stack:
+        node = stack.pop()
+        local = len(nodes)
+        nodes.append(node)
+        local_children.append([])
+        local_children[local_parent[node]].append(local)
+        for child in children[node]:
+            local_parent[child] = local
+        stack.extend(reversed(children[node]))
+    breadth = [layout.height[node] + V_GAP for node in nodes]
+    depth_size = [layout.width[node] + H_GAP for node in nodes]
+    depth_pos = [near_edge[node] for node in nodes]
+    position = tidy_layout(local_children, breadth, depth_size, depth_pos)
+    root_center = position[0] + breadth[0] / 2
+    for local, node in enumerate(nodes):
+        if local:
+            layout.y[node] = position[local] + breadth[local] / 2 - root_center
+    for node in nodes:
+        layout.top[node] = layout.bottom[node] = layout.y[node]
+
+
+def layout_store(store):
+    """NodeStore（未被合并掉的节点，与 write_json 输出的顺序相同）的布局"""
+    depths = []
+    labels = []
+    sides = []
+    for _, depth, _, label, side in store.iter_nodes():
+        depths.append(depth)
+        labels.append(label)
+        sides.append(side)
+    return layout_outline(depths, labels, sides)
+
+
+def write_layout(store, json_path, compress=False):
+    """计算布局并写出 X.layout.json（compress 为真时生成预压缩文件），返回 {'nodes', 'width', 'height'}"""
+    layout = layout_store(store)
+    path = layout_path(json_path)
+    with open(path, 'w', encoding='utf-8') as f:
+        dump_json(layout.to_json(), f, compact=True)
+    if compress:
+        write_precompressed(path)
+    else:
+        remove_precompressed(path)
+    min_x, min_y, max_x, max_y = layout.bounds()
+    return {'nodes': len(layout), 'width': round(max_x - min_x), 'height': round(max_y - min_y)}
+
+
+def remove_layout(json_path):
+    """删除 json_path 的布局文件（不加 --layout 重新生成 JSON 后，旧的布局已经过期）"""
+    path = layout_path(json_path)
+    if path.exists():
+        path.unlink()
+    remove_precompressed(path)
+
+
+def layout_up_to_date(json_path, compress=False):
+    """布局文件是否存在且不早于 JSON（compress 为真时还要求预压缩文件齐全）"""
+    path = layout_path(json_path)
+    if not path.exists() or os.path.getmtime(path) < os.path.getmtime(json_path):
+        return False
+    return not compress or precompressed_up_to_date(path)
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+显式栈的树遍历引擎
+思维导图的升级、ID 去重、验证等变换都建立在这里的遍历上：
+不使用递归，树的深度不受 Python 递归深度限制（缩进错乱的 PDF 可能解析出上千层的树），
+每个节点只有一次（或两次，带后序钩子时）回调，没有多参数递归调用的开销
+
+回调约定：
+- enter(node, context, index, count) -> (child_context, children)
+  先序钩子。context 是父节点返回的 child_context，index / count 是节点在兄弟中的位置和兄弟数；
+  返回传给子节点的 child_context 和需要继续遍历的子节点序列（None 或空序列表示不再深入）
+- leave(node, child_context)
+  后序钩子（可选），节点的全部子节点处理完后调用
+
+变换通常在 enter 中创建输出节点并挂到父节点的输出上（child_context 携带父节点的输出 children 列表），
+因此不需要后序钩子就能自顶向下地构建新树
+"""
+
+
+def walk(roots, enter, leave=None, context=None):
+    """按先序遍历 roots 序列中的每棵树，context 为根节点收到的上下文"""
+    if leave is not None:
+        return _walk_with_leave(roots, enter, leave, context)
+    stack = [(enumerate(roots), len(roots), context)]
+    push = stack.append
+    pop = stack.pop
+    while stack:
+        entries, count, frame_context = stack[-1]
+        for index, node in entries:
+            child_context, children = enter(node, frame_context, index, count)
+            if children:
+                # 先处理子节点，回到这一层时 enumerate 从下一个兄弟继续
+                push((enumerate(children), len(children), child_context))
+                break
+        else:
+            pop()
+
+
+def _walk_with_leave(roots, enter, leave, context):
+    """带后序钩子的 walk：栈帧额外记录子节点所属的节点，子节点处理完后对它调用 leave"""
+    stack = [(enumerate(roots), len(roots), context, None)]
+    while stack:
+        entries, count, frame_context, owner = stack[-1]
+        for index, node in entries:
+            child_context, children = enter(node, frame_context, index, count)
+            if children:
+                stack.append((enumerate(children), len(children), child_context, node))
+                break
+            leave(node, child_context)
+        else:
+            stack.pop()
+            if owner is not None:
+                leave(owner, frame_context)
+
+
+def walk_subtree(node, enter, leave=None, context=None, index=0, count=1):
+    """从单个节点开始遍历；节点自身的 index / count 由调用方给出（其子节点照常由 walk 计算）"""
+    child_context, children = enter(node, context, index, count)
+    if children:
+        walk(children, enter, leave, child_context)
+    if leave is not None:
+        leave(node, child_context)
+
+
+def join_path(link):
+    """
+    还原 (父链接, 名称) 链表表示的路径，规则与原先逐层拼接的路径字符串相同：
+    每一级为 f"{父路径}/{名称}"，父路径为空时直接取名称
+    
+    遍历时只传递链表（每个节点一个二元组），需要报告问题时才拼接字符串；
+    链表的起点可以是调用方给出的初始路径字符串
+    """
+    names = []
+    while isinstance(link, tuple):
+        link, name = link
+        names.append(name)
+    path = link
+    for name in reversed(names):
+        path = f"{path}/{name}" if path else name
+    return path
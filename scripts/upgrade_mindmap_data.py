@@ -11,6 +11,11 @@ import os
 import sys
 from typing import Dict, List, Any, Optional, Tuple
 
+from id_allocator import IdAllocator
+from json_backend import dump as dump_json
+from output_encoding import refresh_precompressed
+from tree_walk import walk, walk_subtree
+
 
 def slugify(text: str) -> str:
     """
@@ -36,37 +41,64 @@ def slugify(text: str) -> str:
     return text
 
 
-def detect_split_nodes(siblings: List[Dict[str, Any]]) -> List[Tuple[int, int]]:
+class SplitRules:
+    """
+    断行合并规则
+    
+    PDF 中过长的标题会被断成几行，解析后成为几个相邻的、没有子节点的兄弟节点。
+    从一个这样的节点开始，只要它的标题（去掉尾部空白）以 open_endings 之一结尾，
+    或后一个节点的标题（去掉开头空白）以 continuation_starts 之一开头，后一个节点就视为它的续行。
+    前缀 / 后缀在构造时整理为元组，每个标题只需一次 C 层的 endswith / startswith 判断
+    """
+    
+    __slots__ = ('open_endings', 'continuation_starts')
+    
+    def __init__(self, open_endings=('form', '('), continuation_starts=(')>', 'Polypeptide')):
+        self.open_endings = tuple(open_endings)
+        self.continuation_starts = tuple(continuation_starts)
+    
+    def opens(self, title: str) -> bool:
+        """title 作为一段的第一行时，后面的行是否一定是它的续行"""
+        return title.rstrip().endswith(self.open_endings)
+    
+    def continues(self, title: str) -> bool:
+        """title 是否是上一行的续行"""
+        return title.lstrip().startswith(self.continuation_starts)
+
+
+DEFAULT_SPLIT_RULES = SplitRules()
+
+
+def detect_split_nodes(siblings: List[Dict[str, Any]],
+                       rules: SplitRules = DEFAULT_SPLIT_RULES) -> List[Tuple[int, int]]:
     """
     检测明显断行的节点对（应该合并）
     
     返回：[(start_index, end_index), ...] 需要合并的节点范围列表
     """
+    return detect_split_runs([sibling.get('title', '') for sibling in siblings],
+                             [bool(sibling.get('children')) for sibling in siblings], rules)
+
+
+def detect_split_runs(titles: List[str], has_children: List[bool],
+                      rules: SplitRules = DEFAULT_SPLIT_RULES) -> List[Tuple[int, int]]:
+    """
+    detect_split_nodes 的判断逻辑，只依赖兄弟节点的标题和是否有子节点
+    （NodeStore 上的规范化不必为此构造节点 dict）
+    """
     merges = []
+    count = len(titles)
     i = 0
     
-    while i < len(siblings):
+    while i < count:
         # 查找连续的、无children的节点
-        if not siblings[i].get('children') and siblings[i].get('title', '').strip():
-            # 检查下一个节点是否也是无children
+        if not has_children[i] and titles[i].strip():
+            # 一段的第一行只判断一次；后续的行不能有子节点、不能为空，且满足任一规则
+            opens = rules.opens(titles[i])
             j = i + 1
-            while j < len(siblings):
-                if siblings[j].get('children'):
-                    break
-                
-                # 判断是否可能是断行：
-                # 1. 前一个节点以 "form"、"("、">" 结尾
-                # 2. 后一个节点以 ")>"、")" 开头
-                prev_title = siblings[i].get('title', '')
-                curr_title = siblings[j].get('title', '')
-                
-                # 检测断行模式
-                if (prev_title and curr_title and
-                    (prev_title.rstrip().endswith(('form', '(')) or
-                     curr_title.lstrip().startswith((')>', 'Polypeptide')))):
-                    j += 1
-                    continue
-                break
+            while (j < count and not has_children[j] and titles[j] and
+                   (opens or rules.continues(titles[j]))):
+                j += 1
             
             # 如果找到多个连续的疑似断行节点，标记为需要合并
             if j > i + 1:
@@ -104,6 +136,85 @@ def merge_split_nodes(siblings: List[Dict[str, Any]], start: int, end: int) -> D
     }
 
 
+def merge_split_siblings(siblings: List[Dict[str, Any]],
+                         rules: SplitRules = DEFAULT_SPLIT_RULES) -> List[Dict[str, Any]]:
+    """
+    返回合并断行后的兄弟节点列表：按检测出的范围顺序一次性重建新列表，不修改输入；
+    没有需要合并的节点时直接返回原列表
+    
+    （原先对每个范围在原列表上 del + insert，合并多时开销是平方级的，而且会改动调用方的树）
+    """
+    runs = detect_split_nodes(siblings, rules)
+    if not runs:
+        return siblings
+    
+    merged = []
+    position = 0
+    for start, end in runs:
+        merged.extend(siblings[position:start])
+        merged.append(merge_split_nodes(siblings, start, end))
+        position = end + 1
+    merged.extend(siblings[position:])
+    return merged
+
+
+def _upgrade_enter(used_ids: IdAllocator, split_rules: SplitRules = DEFAULT_SPLIT_RULES):
+    """
+    构造 upgrade_node 的先序钩子
+    
+    context 为 (父节点 side, 父节点 id, 本层 level, 父节点输出的 children 列表)；
+    钩子把升级后的节点追加到父节点的输出列表，返回 (子节点 context, 合并断行后的子节点)
+    """
+    def enter(node, context, index, siblings_count):
+        parent_side, parent_id, level, output = context
+        
+        # 1. title → label（原样保留）
+        label = node.get('title') or node.get('label') or ''
+        
+        # 2. 生成唯一的 id
+        node_id = node.get('id')
+        if not node_id:
+            base_id = slugify(label)
+            if not base_id:
+                base_id = f'node-{level}-{index}'
+            
+            # 先尝试 父id-base_id（有父节点时），再尝试 base_id，都已被使用时在第一个候选后加数字后缀
+            if parent_id:
+                node_id = used_ids.allocate(f"{parent_id}-{base_id}", base_id)
+            else:
+                node_id = used_ids.allocate(base_id)
+        
+        # 3. 分配 side
+        side = node.get('side')
+        if not side:
+            if level == 0:
+                # 根节点：center
+                side = 'center'
+            elif parent_side == 'center' or parent_side is None:
+                # 一级节点（父节点是 center）：按索引平分
+                side = 'left' if index < siblings_count / 2 else 'right'
+            else:
+                # 二级及以后：继承父节点
+                side = parent_side
+        
+        upgraded_children = []
+        output.append({
+            'id': node_id,
+            'label': label,
+            'side': side,
+            'children': upgraded_children
+        })
+        
+        # 4. 子节点：先合并断行（得到新列表，输入不变），再交给遍历引擎逐个升级
+        children = node.get('children', [])
+        if children:
+            children = merge_split_siblings(children, split_rules)
+        
+        return (side, node_id, level + 1, upgraded_children), children
+    
+    return enter
+
+
 def upgrade_node(
     node: Dict[str, Any],
     parent_side: Optional[str] = None,
@@ -111,10 +222,11 @@ def upgrade_node(
     index: int = 0,
     siblings_count: int = 1,
     level: int = 0,
-    used_ids: Optional[set] = None
+    used_ids: Optional[IdAllocator] = None,
+    split_rules: Optional[SplitRules] = None
 ) -> Dict[str, Any]:
     """
-    升级单个节点：
+    升级单个节点（及其全部子孙，使用显式栈遍历，深度不受递归限制）：
     - title → label
     - 生成 id（确保唯一性）
     - 分配 side
@@ -126,99 +238,23 @@ def upgrade_node(
         index: 当前节点在兄弟节点中的索引
         siblings_count: 兄弟节点总数
         level: 节点层级（0=根节点）
-        used_ids: 已使用的 ID 集合（用于确保唯一性）
+        used_ids: 已使用的 ID（IdAllocator，用于确保唯一性）
+        split_rules: 断行合并规则（默认 DEFAULT_SPLIT_RULES）
+    
+    输入节点不会被修改
     """
     if used_ids is None:
-        used_ids = set()
-    
-    # 1. title → label（原样保留）
-    label = node.get('title') or node.get('label') or ''
-    
-    # 2. 生成唯一的 id
-    node_id = node.get('id')
-    if not node_id:
-        base_id = slugify(label)
-        if not base_id:
-            base_id = f'node-{level}-{index}'
-        
-        # 尝试生成 ID：先尝试 base_id，如果有父节点则加上前缀
-        candidate_ids = []
-        if parent_id:
-            candidate_ids.append(f"{parent_id}-{base_id}")
-        candidate_ids.append(base_id)
-        
-        # 找到第一个未使用的 ID
-        node_id = None
-        for candidate in candidate_ids:
-            if candidate not in used_ids:
-                node_id = candidate
-                break
-        
-        # 如果所有候选 ID 都已被使用，添加索引后缀
-        if not node_id:
-            original_id = candidate_ids[0]
-            suffix = 1
-            while node_id is None or node_id in used_ids:
-                node_id = f"{original_id}-{suffix}"
-                suffix += 1
-        
-        used_ids.add(node_id)
-    
-    # 3. 分配 side
-    side = node.get('side')
-    if not side:
-        if level == 0:
-            # 根节点：center
-            side = 'center'
-        elif parent_side == 'center' or parent_side is None:
-            # 一级节点（父节点是 center）：按索引平分
-            side = 'left' if index < siblings_count / 2 else 'right'
-        else:
-            # 二级及以后：继承父节点
-            side = parent_side
-    
-    # 4. 处理 children（递归升级）
-    children = node.get('children', [])
-    upgraded_children = []
+        used_ids = IdAllocator()
     
-    if children:
-        # 先检测并修复断行
-        merges = detect_split_nodes(children)
-        
-        # 从后往前合并，避免索引变化问题
-        for start, end in reversed(merges):
-            merged = merge_split_nodes(children, start, end)
-            # 删除被合并的节点，插入合并后的节点
-            del children[start:end+1]
-            children.insert(start, merged)
-        
-        # 升级所有子节点
-        for idx, child in enumerate(children):
-            upgraded_child = upgrade_node(
-                child,
-                parent_side=side,
-                parent_id=node_id,
-                index=idx,
-                siblings_count=len(children),
-                level=level + 1,
-                used_ids=used_ids
-            )
-            upgraded_children.append(upgraded_child)
-    
-    # 构建升级后的节点
-    upgraded_node = {
-        'id': node_id,
-        'label': label,
-        'side': side,
-        'children': upgraded_children
-    }
-    
-    return upgraded_node
+    output = []
+    walk_subtree(node, _upgrade_enter(used_ids, split_rules or DEFAULT_SPLIT_RULES), context=(parent_side, parent_id, level, output),
+                 index=index, count=siblings_count)
+    return output[0]
 
 
-def upgrade_mindmap_data(data: Any) -> Any:
+def upgrade_mindmap_data(data: Any, split_rules: Optional[SplitRules] = None) -> Any:
     """
-    升级思维导图数据
+    升级思维导图数据（返回新数据，输入不变）
     
     支持：
     - 单个对象
@@ -230,24 +266,13 @@ def upgrade_mindmap_data(data: Any) -> Any:
         
         # 处理数组：每个元素是根节点
         upgraded = []
-        used_ids = set()
-        for idx, node in enumerate(data):
-            upgraded_node = upgrade_node(
-                node,
-                parent_side=None,
-                parent_id=None,
-                index=idx,
-                siblings_count=len(data),
-                level=0,
-                used_ids=used_ids
-            )
-            upgraded.append(upgraded_node)
-        
+        walk(data, _upgrade_enter(IdAllocator(), split_rules or DEFAULT_SPLIT_RULES), context=(None, None, 0, upgraded))
         return upgraded
     elif isinstance(data, dict):
         # 单个对象：作为根节点
-        used_ids = set()
-        return upgrade_node(data, parent_side=None, parent_id=None, index=0, siblings_count=1, level=0, used_ids=used_ids)
+        used_ids = IdAllocator()
+        return upgrade_node(data, parent_side=None, parent_id=None, index=0, siblings_count=1, level=0, used_ids=used_ids,
+                            split_rules=split_rules)
     else:
         raise ValueError(f"不支持的数据类型: {type(data)}")
 
@@ -294,7 +319,9 @@ def main():
     
     try:
         with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(upgraded_data, f, ensure_ascii=False, indent=2)
+            dump_json(upgraded_data, f)
+        if refresh_precompressed(output_file):
+            print(f"已重新生成预压缩文件 (.gz / .br)")
         print(f"✅ 升级完成！")
         print(f"   输入文件: {input_file}")
         print(f"   输出文件: {output_file}")
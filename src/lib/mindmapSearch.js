@@ -0,0 +1,90 @@
+// lib/mindmapSearch.js
+// 跨章节联想搜索：加载构建时生成的 /mindmaps/search-index.json（scripts/search_index.py），在有序词表上按前缀查询
+
+const SEARCH_INDEX_URL = '/mindmaps/search-index.json';
+const PREFIX_END = '\u{10ffff}';
+
+let indexPromise = null;
+
+// 与 search_index.tokenize 相同：连续的字母 / 数字（不含组合符号），统一小写（Python 端用 lower()，不用 casefold()）
+export function tokenize(text) {
+    return text.toLowerCase().match(/[\p{L}\p{N}]+/gu) || [];
+}
+
+// 按码位比较，与 Python 的 str 比较（也就是词表的排序方式）一致；
+// JS 的 < 按 UTF-16 码元比较，增补平面字符与 U+E000–U+FFFF 的先后顺序会不同，二分查找就会出错
+function compareCodePoints(a, b) {
+    const length = Math.min(a.length, b.length);
+    for (let i = 0; i < length; i++) {
+        const x = a.codePointAt(i);
+        const y = b.codePointAt(i);
+        if (x !== y) return x - y;
+        if (x > 0xffff) i++;
+    }
+    return a.length - b.length;
+}
+
+// 只下载一次，之后的查询都在内存中完成
+export function loadSearchIndex() {
+    if (!indexPromise) {
+        indexPromise = fetch(SEARCH_INDEX_URL)
+            .then(response => {
+                if (!response.ok) throw new Error(`Failed to load search index: ${response.status}`);
+                return response.json();
+            })
+            .catch(error => {
+                indexPromise = null;
+                throw error;
+            });
+    }
+    return indexPromise;
+}
+
+function lowerBound(terms, value, start = 0) {
+    let low = start;
+    let high = terms.length;
+    while (low < high) {
+        const mid = (low + high) >>> 1;
+        if (compareCodePoints(terms[mid], value) < 0) low = mid + 1;
+        else high = mid;
+    }
+    return low;
+}
+
+// 以 prefix 开头的词的倒排合并成 "章节:节点序号" 集合
+function prefixMatches(index, prefix) {
+    const start = lowerBound(index.terms, prefix);
+    const stop = lowerBound(index.terms, prefix + PREFIX_END, start);
+    const matches = new Set();
+    for (let i = start; i < stop; i++) {
+        const flat = index.postings[i];
+        for (let j = 0; j < flat.length; j += 2) {
+            matches.add(`${flat[j]}:${flat[j + 1]}`);
+        }
+    }
+    return matches;
+}
+
+// 每个词按前缀匹配并取交集；整个 label 以查询开头的排在前面，其次是较短的 label
+// 返回 [{ chapter, id, label }, ...]，chapter 为字符串
+export function searchMindmaps(index, query, limit = 10) {
+    const tokens = [...new Set(tokenize(query))].sort((a, b) => b.length - a.length);
+    if (tokens.length === 0) return [];
+    let matches = null;
+    for (const token of tokens) {
+        const found = prefixMatches(index, token);
+        matches = matches === null ? found : new Set([...matches].filter(key => found.has(key)));
+        if (matches.size === 0) return [];
+    }
+
+    const phrase = tokenize(query).join(' ');
+    const results = [...matches].map(key => {
+        const [chapter, position] = key.split(':').map(Number);
+        const entry = index.chapters[chapter];
+        const label = entry.labels[position];
+        return { chapter, position, id: entry.ids[position], label, prefix: tokenize(label).join(' ').startsWith(phrase) };
+    });
+    results.sort((a, b) => (b.prefix - a.prefix) || (a.label.length - b.label.length)
+        || (a.chapter - b.chapter) || (a.position - b.position));
+    return results.slice(0, limit).map(({ chapter, id, label }) => ({ chapter: String(chapter), id, label }));
+}
@@ -1,12 +1,123 @@
+import crypto from 'crypto';
 import fs from 'fs';
 import path from 'path';
 
+const MINDMAPS_DIR = path.join(process.cwd(), 'public', 'mindmaps');
+const MANIFEST_PATH = path.join(MINDMAPS_DIR, 'manifest.json');
+
+// 构建时由 pipeline 写出的章节清单（scripts/chapter_manifest.py），清单文件更新后自动重新加载
+let manifestCache = { mtimeMs: 0, data: null };
+// 章节文件内容：路径 → { mtimeMs, size, body, sha256 }，文件的 mtime 或大小变化时重新读取；清单重新加载时清空
+const bodyCache = new Map();
+
+function loadManifest() {
+    let stat;
+    try {
+        stat = fs.statSync(MANIFEST_PATH);
+    } catch (error) {
+        return null;
+    }
+    if (!manifestCache.data || manifestCache.mtimeMs !== stat.mtimeMs) {
+        manifestCache = { mtimeMs: stat.mtimeMs, data: JSON.parse(fs.readFileSync(MANIFEST_PATH, 'utf8')) };
+        bodyCache.clear();
+    }
+    return manifestCache.data;
+}
+
+// 章节文件可能在 pipeline 之外被改写（fix_duplicate_ids_in_file.py、手工编辑）而清单没有更新，
+// 所以每次请求都 stat 一次，文件变化后重新读取并计算实际内容的 SHA-256
+function readCached(filePath) {
+    const stat = fs.statSync(filePath);
+    const cached = bodyCache.get(filePath);
+    if (cached && cached.mtimeMs === stat.mtimeMs && cached.size === stat.size) {
+        return cached;
+    }
+    const body = fs.readFileSync(filePath);
+    const state = {
+        mtimeMs: stat.mtimeMs,
+        size: stat.size,
+        body,
+        sha256: crypto.createHash('sha256').update(body).digest('hex')
+    };
+    bodyCache.set(filePath, state);
+    return state;
+}
+
+// If-None-Match 中任一 ETag（忽略 W/ 前缀和编码后缀）与章节内容的 SHA-256 相同时，客户端的副本仍然有效
+function isNotModified(req, sha256) {
+    const header = req.headers['if-none-match'];
+    if (!header) return false;
+    return header.split(',').some(tag => {
+        const value = tag.trim().replace(/^W\//, '').replace(/^"|"$/g, '');
+        return value === '*' || value.replace(/-(br|gzip)$/, '') === sha256;
+    });
+}
+
+// 预压缩文件的编码和后缀，按服务端偏好排列（q 值相同时优先 br）
+const ENCODING_SUFFIXES = [['br', '.br'], ['gzip', '.gz']];
+
+// 解析 Accept-Encoding："br;q=0.8, gzip" → Map(编码 → q)，没有 q 参数时为 1，q 无法解析时按 0 处理
+function parseAcceptEncoding(req) {
+    const weights = new Map();
+    for (const part of (req.headers['accept-encoding'] || '').split(',')) {
+        const [name, ...params] = part.trim().toLowerCase().split(';');
+        if (!name) continue;
+        let q = 1;
+        for (const param of params) {
+            const [key, value] = param.trim().split('=');
+            if (key === 'q') q = Number(value);
+        }
+        weights.set(name, Number.isFinite(q) ? q : 0);
+    }
+    return weights;
+}
+
+// 在 available 中选择客户端 q 值最高的编码（没有列出的编码按 * 的 q 值，都没有时为 0；q=0 表示拒绝）
+function pickEncoding(req, available) {
+    const weights = parseAcceptEncoding(req);
+    let best = [null, ''];
+    let bestWeight = 0;
+    for (const [encoding, suffix] of ENCODING_SUFFIXES) {
+        if (!available(encoding, suffix)) continue;
+        const weight = weights.has(encoding) ? weights.get(encoding) : (weights.get('*') || 0);
+        if (weight > bestWeight) {
+            best = [encoding, suffix];
+            bestWeight = weight;
+        }
+    }
+    return best;
+}
+
+// 按 Accept-Encoding 选择 --compact 生成的预压缩文件（清单中记录了它们是否存在）
+function chooseEncoding(req, entry) {
+    return pickEncoding(req, encoding => (encoding === 'br' ? entry.brotliBytes : entry.gzipBytes) != null);
+}
+
+// 分片文件（--shard）：客户端接受对应编码且存在预压缩文件时直接返回压缩后的字节
+function sendPrecompressed(req, res, filePath) {
+    const [encoding, suffix] = pickEncoding(req, (_, suffix) => fs.existsSync(filePath + suffix));
+    if (!encoding) return false;
+    res.setHeader('Content-Type', 'application/json; charset=utf-8');
+    res.setHeader('Content-Encoding', encoding);
+    res.setHeader('Vary', 'Accept-Encoding');
+    res.status(200).send(fs.readFileSync(filePath + suffix));
+    return true;
+}
+
+// --shard 生成的分片目录 X.shards/ 中的文件：part=manifest / skeleton / shard-NNNN
+function resolvePartFile(part) {
+    if (part === 'manifest') return 'manifest.json';
+    if (part === 'skeleton') return 'skeleton.json';
+    if (/^shard-\d{4,}$/.test(part)) return `${part}.json`;
+    return null;
+}
+
 export default function handler(req, res) {
     if (req.method !== 'GET') {
         return res.status(405).json({ error: 'Method not allowed' });
     }
 
-    const { chapter, level } = req.query;
+    const { chapter, level, part } = req.query;
 
     if (!chapter || !level) {
         return res.status(400).json({ error: 'Chapter and level parameters are required' });
@@ -15,104 +126,114 @@ export default function handler(req, res) {
     try {
         const levelLower = level.toLowerCase();
         const chapterNum = chapter === 'All' ? '1' : chapter;
-        
-        // 根据 level 定义可用的章节映射
-        const asFileNameMap = {
-            '1': '1_Cell_structure.json',
-            '2': '2_Biological_molecules.json',
-            '3': '3_Enzymes.json',
-            '4': '4_Cell_membranes_and_transport.json',
-            '5': '5_The_mitotic_cell_cycle.json',
-            '6': '6_Nucleic_acids_and_protein_synthesis.json',
-            '7': '7_Transport_of_Plant.json',
-            '8': '8_Transport_in_mammals.json',
-            '9': '9_Gas_exchange.json',
-            '10': '10_Infectious_diseases.json',
-            '11': '11_Immunity.json',
-        };
-        
-        const a2FileNameMap = {
-            '12': '12_Energy_and_respiration.json',
-            '13': '13_Photosynthesis.json',
-            '14': '14_Homeostasis.json',
-            '15': '15_Control_and_coordination.json',
-            '16': '16_Inheritance.json',
-            '17': '17_Selection_and_evolution.json',
-            '18': '18_Classification_biodiversity_and_conservation.json',
-            '19': '19_Genetic_technology.json',
-        };
-        
-        // 根据 level 选择正确的文件映射
-        let fileNameMap;
-        if (levelLower === 'as') {
-            fileNameMap = asFileNameMap;
-        } else if (levelLower === 'a2') {
-            fileNameMap = a2FileNameMap;
-        } else {
+
+        if (levelLower !== 'as' && levelLower !== 'a2') {
             return res.status(400).json({ error: `Invalid level: ${level}. Must be 'as' or 'a2'` });
         }
-        
-        const fileName = fileNameMap[chapterNum];
-        if (!fileName) {
-            const validChapters = Object.keys(fileNameMap).join(', ');
-            return res.status(404).json({ 
+
+        const manifest = loadManifest();
+        if (!manifest) {
+            console.error(`Mindmap manifest not found: ${MANIFEST_PATH}`);
+            return res.status(500).json({
+                error: 'Mindmap manifest not found',
+                details: 'Run process_mindmaps_pipeline.py / convert_txt_to_mindmap.py (or scripts/chapter_manifest.py) to generate public/mindmaps/manifest.json'
+            });
+        }
+
+        // 根据清单选择章节文件（清单只列出已生成的章节）
+        const entry = manifest.chapters[chapterNum];
+        if (!entry || entry.level.toLowerCase() !== levelLower) {
+            // A2 级别的思维导图文件尚未完成
+            if (levelLower === 'a2') {
+                return res.status(404).json({
+                    error: 'Mindmap not available',
+                    message: `A2 Level Chapter ${chapter} mindmap is not yet available. Please check back later.`
+                });
+            }
+            const validChapters = Object.keys(manifest.chapters)
+                .filter(key => manifest.chapters[key].level.toLowerCase() === levelLower)
+                .join(', ');
+            return res.status(404).json({
                 error: `Chapter ${chapter} not found for ${level.toUpperCase()} level`,
                 message: `Valid chapters for ${level.toUpperCase()}: ${validChapters}`
             });
         }
-        
-        // 从 public/mindmaps/ 目录读取
-        const filePath = path.join(process.cwd(), 'public', 'mindmaps', fileName);
-        
-        // 如果文件不存在，尝试从旧路径读取（向后兼容）
-        let fileContent;
-        if (fs.existsSync(filePath)) {
-            fileContent = fs.readFileSync(filePath, 'utf8');
-        } else {
-            // 向后兼容：尝试从 output/ 目录读取
-            const fallbackPath = path.join(process.cwd(), 'output', fileName);
-            if (fs.existsSync(fallbackPath)) {
-                fileContent = fs.readFileSync(fallbackPath, 'utf8');
-            } else {
-                // 如果是 AS Chapter 1，尝试从根目录读取 cell_mindmap.json
-                if (levelLower === 'as' && chapter === '1') {
-                    const cellMindmapPath = path.join(process.cwd(), 'cell_mindmap.json');
-                    if (fs.existsSync(cellMindmapPath)) {
-                        fileContent = fs.readFileSync(cellMindmapPath, 'utf8');
-                    } else {
-                        console.error(`File not found: ${filePath}, ${fallbackPath}, ${cellMindmapPath}`);
-                        return res.status(404).json({ 
-                            error: 'Mindmap file not found',
-                            details: `The file ${fileName} does not exist for ${level.toUpperCase()} level chapter ${chapter}`
-                        });
-                    }
-                } else {
-                    // A2 级别的思维导图文件尚未完成
-                    if (levelLower === 'a2') {
-                        console.error(`A2 mindmap file not yet created: ${filePath}`);
-                        return res.status(404).json({ 
-                            error: 'Mindmap not available',
-                            message: `A2 Level Chapter ${chapter} mindmap is not yet available. Please check back later.`,
-                            details: `The file ${fileName} does not exist for A2 level chapter ${chapter}`
-                        });
-                    } else {
-                        console.error(`File not found: ${filePath}, ${fallbackPath}`);
-                        return res.status(404).json({ 
-                            error: 'Mindmap file not found',
-                            details: `The file ${fileName} does not exist for ${level.toUpperCase()} level chapter ${chapter}`
-                        });
-                    }
-                }
+
+        const filePath = path.join(MINDMAPS_DIR, entry.file);
+
+        // 预计算的布局（--layout）：按先序排列的节点坐标，客户端据此直接渲染
+        if (part === 'layout') {
+            if (!entry.layout) {
+                return res.status(404).json({
+                    error: 'Mindmap layout not found',
+                    details: `No precomputed layout for ${level.toUpperCase()} level chapter ${chapter} (build with --layout)`
+                });
             }
+            const layoutPath = path.join(MINDMAPS_DIR, entry.layout);
+            if (sendPrecompressed(req, res, layoutPath)) return;
+            res.setHeader('Content-Type', 'application/json; charset=utf-8');
+            return res.status(200).send(fs.readFileSync(layoutPath, 'utf8'));
         }
 
-        // 解析JSON
-        const jsonData = JSON.parse(fileContent);
-        
-        // 返回数据
-        res.status(200).json(jsonData);
+        // 分片：骨架、分片清单或单个分片，原样返回（展开延迟节点时按清单请求对应的分片）
+        if (part) {
+            const partFile = resolvePartFile(part);
+            if (!partFile) {
+                return res.status(400).json({ error: `Invalid part: ${part}. Must be 'layout', 'manifest', 'skeleton' or 'shard-NNNN'` });
+            }
+            const partPath = path.join(MINDMAPS_DIR, entry.file.replace(/\.json$/, '.shards'), partFile);
+            if (!fs.existsSync(partPath)) {
+                return res.status(404).json({
+                    error: 'Mindmap shard not found',
+                    details: `The ${part} file does not exist for ${level.toUpperCase()} level chapter ${chapter}`
+                });
+            }
+            if (sendPrecompressed(req, res, partPath)) return;
+            res.setHeader('Content-Type', 'application/json; charset=utf-8');
+            return res.status(200).send(fs.readFileSync(partPath, 'utf8'));
+        }
+
+        // 章节内容的 SHA-256 作为强 ETag（各编码分别加后缀），客户端副本仍有效时返回 304
+        // 文件内容与清单记录的 SHA-256 不一致时清单已过期：以文件实际内容为准，预压缩文件可能也已过期，不再使用
+        let current;
+        try {
+            current = readCached(filePath);
+        } catch (error) {
+            if (error.code !== 'ENOENT') throw error;
+            // 清单中列出的章节文件已被删除
+            console.error(`File not found: ${filePath}`);
+            return res.status(404).json({
+                error: 'Mindmap file not found',
+                details: `The file ${entry.file} does not exist for ${level.toUpperCase()} level chapter ${chapter}`
+            });
+        }
+        const [preferred, suffix] = current.sha256 === entry.sha256 ? chooseEncoding(req, entry) : [null, ''];
+        let encoding = preferred;
+        let body = current.body;
+        if (encoding) {
+            try {
+                body = readCached(filePath + suffix).body;
+            } catch (error) {
+                if (error.code !== 'ENOENT') throw error;
+                // 预压缩文件已被删除：返回未压缩的 JSON
+                encoding = null;
+            }
+        }
+        res.setHeader('ETag', `"${current.sha256}${encoding ? `-${encoding}` : ''}"`);
+        res.setHeader('Cache-Control', 'no-cache');
+        res.setHeader('Vary', 'Accept-Encoding');
+        if (isNotModified(req, current.sha256)) {
+            return res.status(304).end();
+        }
+
+        // 原样返回构建好的 JSON（或预压缩文件），不解析、不重新序列化
+        res.setHeader('Content-Type', 'application/json; charset=utf-8');
+        if (encoding) {
+            res.setHeader('Content-Encoding', encoding);
+        }
+        res.status(200).send(body);
     } catch (error) {
         console.error('Error reading mindmap file:', error);
         res.status(500).json({ error: 'Failed to read mindmap file', details: error.message });
     }
-}
\ No newline at end of file
+}